@@ -6,34 +6,131 @@ import os
 import re
 import warnings
 import json
+import io
+import locale
+import mmap
+import copy
+import collections
+import threading
+import pickle
+import hashlib
+import concurrent.futures
+import asyncio
+import time
+import weakref
+import functools
+import bisect
+import itertools
+from collections.abc import MutableMapping, MutableSequence
 
 __version__ = "0.3.1"
 
 
 wildcart_re = "[a-zA-Z0-9_.-]+"
+wildcart_chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_.-"
+identifier_segment_re = re.compile("^[a-zA-Z0-9_-]+$")
+grouper_re = re.compile("^-?(?:0x[0-9a-fA-F]+|0o[0-7]+|[0-9]+)$")
 guess_int_re = "^-?[0-9]+$"
 guess_bin_re = "^-?0b[0-1]+$"
 guess_oct_re = "^-?0o[0-7]+$"
 guess_hex_re = "^-?0x[0-9a-fA-F]+$"
 guess_float_re = "^-?[0-9]*\.[0-9]+(e[+-]?)?[0-9]+$"
+guess_re = re.compile("^(?:(None|True|False)\\Z|(-?0x[0-9a-fA-F]+)$|(-?0o[0-7]+)$|(-?0b[0-1]+)$|(-?[0-9]+)$|(-?[0-9]*\\.[0-9]+(?:e[+-]?)?[0-9]+)$)")
+guess_first_chars = frozenset("-0123456789.NTF")
+guess_kinds = (None, "constant", "int", "int", "int", "int", "float")
+guess_constants = {"None": None, "True": True, "False": False}
+column_int_re = re.compile("(?:-?[0-9]+\n)*")
+column_number_re = re.compile("(?:-?(?:[0-9]+|[0-9]*\\.[0-9]+(?:e[+-]?)?[0-9]+)\n)*")
+convert_cache_size = 4096
+matcher_cache_size = 1024
+bulk_size = 256
+line_strict_re = re.compile("^(?:([#!])(?! )| *)([a-zA-Z0-9-._]+) *([:=])(.*)$")
+line_nonstrict_re = re.compile("^(?:([#!])(?! )| *)([a-zA-Z0-9-._ ]+) *([:=])(.*)$")
+linekey_strict_re = re.compile(b"(?:([#!])(?! )| *)([a-zA-Z0-9-._]+) *[:=]")
+linekey_nonstrict_re = re.compile(b"(?:([#!])(?! )| *)([a-zA-Z0-9-._ ]+) *[:=]")
+newline_re = re.compile(b"\r\n|\r|\n")
+write_chunk_size = 2**16
+snapshot_magic = b"PYPROPS\x00"
+snapshot_version = 1
+version_counter = itertools.count(1)
 
 
 class ReadError(IOError): pass
 class StoreError(IOError): pass
 class UnsavedChangesError(BaseException): pass
 class IncludeError(Exception): pass
+class ResolveError(KeyError): pass
 class IncludeWarning(UserWarning): pass
 class MultipleDeclarationWarning(UserWarning): pass
 
 
+async def _awrite(path, text):
+    """
+    Writes text to file of given path without blocking the event loop: 
+    file is opened, written in chunks of `write_chunk_size` characters and closed in default executor.
+    """
+    loop = asyncio.get_running_loop()
+    file = await loop.run_in_executor(None, open, path, "w")
+    try:
+        for i in range(0, len(text), write_chunk_size): await loop.run_in_executor(None, file.write, text[i:i+write_chunk_size])
+    finally:
+        await loop.run_in_executor(None, file.close)
+
+
 class Reader():
     """
     This class utilizes methods for reading properties files.
     """
-    def __init__(self, path, includes=True, cast=False, strict=True):
+    def __init__(self, path, includes=True, cast=False, strict=True, lazy=False):
+        """
+        If `lazy` is passed as True only an index of properties is built during reading and 
+        values are parsed (and casted) on first access (see `LazyValues`).
+        """
         self._path = os.path.abspath(path)
-        self._includes, self._cast, self._strict = (includes, cast, strict)
+        self._includes, self._cast, self._strict, self._lazy = (includes, cast, strict, lazy)
         self._source, self._hidden, self._included, self._comments, self._properties = ([], [], [], {}, [])
+        self._parsed, self._includetree, self._files = ({}, [], [])
+        self._tokencache, self._stream, self._ranges, self._marks, self._counts = (None, None, [], [], {})
+
+    def _scan(self, path):
+        """
+        Yields tuples (line number, line) of logical lines of file of given path.
+        """
+        try:
+            file = open(path)
+        except (IOError, FileNotFoundError) as e:
+            raise ReadError(e)
+        with file:
+            yield from Engine.Tokenizer.logicallines(file, path)
+
+    def _indexed(self, path):
+        """
+        Yields tokens of file of given path for lazy reading (see `_classified()`). 
+        File is memory-mapped and only keys of properties are taken out of it: bytes before 
+        the separator are matched and values are neither decoded nor split. 
+        Tokens of properties carry span (path, offset, length, fingerprint) of their lines instead of values, 
+        fingerprint is a hash of raw bytes of the value so values can be compared without parsing them. 
+        Comments, text lines and `__include__` directives are decoded and classified as usual.
+        """
+        try:
+            file = open(path, "rb")
+        except (IOError, FileNotFoundError) as e:
+            raise ReadError(e)
+        encoding = locale.getpreferredencoding(False)
+        pattern = linekey_strict_re if self._strict else linekey_nonstrict_re
+        with file:
+            if os.fstat(file.fileno()).st_size == 0: return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                for lineno, offset, length, line in Engine.Tokenizer.rawlines(buffer, path):
+                    match = pattern.match(line)
+                    if match is not None: hidden, key = match.groups()
+                    if match is None or key.startswith(b"__include__"):
+                        kind, line, key, value = Engine.Tokenizer.classify(line.decode(encoding), self._strict)
+                        yield (kind, lineno, line, key, value, None)
+                    else:
+                        span = (path, offset, length, hash(line[match.end():].lstrip()))
+                        key = key.decode(encoding).strip()
+                        yield ("hidden" if hidden else "property", lineno, "{0}=".format(key), key, None, span)
 
     def loadf(self):
         """
@@ -42,82 +139,88 @@ class Reader():
         Lines are loaded with trailing newlines characters and preceding whitespace stripped. 
         Comments which end with backslash (`\\`) are left untouched but a warning is raised.
         """
-        try:
-            path = open(self._path)
-            file = path.readlines()
-            path.close()
-        except (IOError, FileNotFoundError) as e:
-            raise ReadError(e)
-        source = []
-        i = 0
-        while i < len(file):
-            line = file[i].lstrip()
-            while line != "" and line[-1] == "\n": line = line[:-1]
-            if line != "" and line[-1] == "\\" and line[0] in ["#", "!"]: warnings.warn("comment ending with backslash: {0}:{1}".format(self._path, i+1))
-            while line != "" and line[-1] == "\\" and line[0] not in ["#", "!"]:
-                i += 1
-                line = line[:-1]
-                while file[i] != "" and file[i][-1] == "\n": file[i] = file[i][:-1]
-                line += file[i]
-            i += 1
-            source.append(line)
-        self._source = source
+        self._source = [ line for lineno, line in self._scan(self._path) ]
 
-    def _include(self, line_number, path, prefix="", hidden=False):
+    def _includepath(self, path):
         """
-        This method is only run when a property file is being read. 
-        It will dump another file in place specified by `__include__` directive.
+        Returns path of a file to include. 
+        Relative paths are resolved against directory of the file being read.
+        Raises IncludeError when path is empty or file cannot be found.
         """
         if not os.path.isabs(path): tpath = os.path.join(os.path.split(self._path)[0], path)
         else: tpath = path
         if tpath.strip() == "": raise IncludeError("__include__ must point to a file: cannot accept empty path")
         if not os.path.isfile(tpath): raise IncludeError("__include__ file not found: {0}".format(tpath))
-        
-        fpath = open(tpath)
+        return tpath
+
+    def _includelines(self, path, prefix="", hidden=False):
+        """
+        Returns lines of file of given path prepared to be put in place of `__include__` directive.
+        """
+        fpath = open(path)
         file = fpath.readlines()
         fpath.close()
 
-        if (path, prefix, hidden) not in self._included: self._included.append( (path, prefix, hidden) )
-        
         for i, line in enumerate(file):
-            if Engine.LineParser.linehaskey(line, strict=self._strict) and prefix: line = "{0}.{1}".format(prefix, line.lstrip())
-            elif self._islinehiddenprop(line) and prefix: line = "#{0}.{1}".format(prefix, line[1:])
-            if Engine.LineParser.linehaskey(line, strict=self._strict) and hidden: line = "#{0}".format(line.lstrip())
+            kind = Engine.LineParser.classify(line, self._strict)[0]
+            if kind == "property" and prefix: line = "{0}.{1}".format(prefix, line.lstrip())
+            elif kind == "hidden" and prefix: line = "#{0}.{1}".format(prefix, line[1:])
+            if kind == "property" and hidden: line = "#{0}".format(line.lstrip())
             if line[-1] == "\n": line = line[:-1]
             file[i] = line
+        return file
 
+    def _include(self, line_number, path, prefix="", hidden=False):
+        """
+        This method is only run when a property file is being read. 
+        It will dump another file in place specified by `__include__` directive.
+        """
+        tpath = self._includepath(path)
+        file = self._includelines(tpath, prefix, hidden)
+        if (path, prefix, hidden) not in self._included: self._included.append( (path, prefix, hidden) )
         self._source = self._source[:line_number] + file + self._source[line_number+1:]
 
+    def _checkcycle(self, stack, path):
+        """
+        Raises IncludeError if file of given path is already being included (is on the stack).
+        """
+        if os.path.realpath(path) in stack: 
+            raise IncludeError("__include__ cycle: {0}".format(" -> ".join(list(stack) + [os.path.realpath(path)])))
+
+    def _expand(self, lines, stack):
+        """
+        Yields given lines with `__include__` directives replaced by lines of included files. 
+        `stack` is a tuple of real paths of files being included and is used to detect cycles.
+        """
+        for line in lines:
+            kind, key, separator, value = Engine.LineParser.classify(line)
+            directive = self._getdirective(key) if kind == "property" else None
+            if directive is None:
+                yield line
+                continue
+            prefix, hidden = directive
+            path = self._includepath(value)
+            self._checkcycle(stack, path)
+            if (value, prefix, hidden) not in self._included: self._included.append( (value, prefix, hidden) )
+            yield from self._expand(self._includelines(path, prefix, hidden), stack + (os.path.realpath(path),))
+
     def makeincludes(self):
         """
         This method runs during load and is kind of preprocessor. It will replace 
         every line which key begins with `__include__` with lines of file 
         it will try to read from the path specified in the value of the mentioned line. 
         
-        Although it may be temptating - using `for` loop in this method is not good. 
-        `for` will not "keep track" of changes in file lenghts and you will end up on overwriting previous __include__'s contents. 
-        Indexes generated by `for` will not take into account the fact that source may have been already expanded. 
-        Adding this functionality will result in unnecessary bloat so `while` stays.
+        New source is built in a single pass so every line is copied only once. 
+        Raises IncludeError when files include each other in a cycle.
         """
-        i = 0
-        while i < len(self._source):
-            key = Engine.LineParser.getlinekey(self._source[i])
-            value = Engine.LineParser.getlinevalue(self._source[i])
-            if key == "__include__": self._include(i, value)
-            elif key == "__include__.hidden": self._include(i, value, hidden=True)
-            elif key != None and key[:15] == "__include__.as.": self._include(i, value, prefix=key[15:])
-            elif key != None and key[:22] == "__include__.hidden.as.": self._include(i, value, prefix=key[22:], hidden=True)
-            i += 1
+        self._source = list(self._expand(self._source, (os.path.realpath(self._path),)))
 
     def _islinehiddenprop(self, line):
         """
         Defines if commented line is commented property or casual comment.
         Used to distinguish comments from commented properties during load.
         """
-        # a little hack to not generate too many warnings when just checking if a line is hidden property
-        if Engine.LineParser.iscomment(line) and line[1] != " ": result = Engine.LineParser.linehaskey(line[1:], strict=self._strict)
-        else: result = False
-        return result
+        return Engine.LineParser.classify(line, self._strict)[0] == "hidden"
 
     def uncoverhidden(self):
         """
@@ -126,9 +229,10 @@ class Reader():
         source = []
         hidden = []
         for line in self._source:
-            if self._islinehiddenprop(line):
+            kind, key, separator, value = Engine.LineParser.classify(line, self._strict)
+            if kind == "hidden":
                 line = line[1:]
-                hidden.append( Engine.LineParser.getlinekey(line) )
+                hidden.append(key)
             source.append(line)
         self._hidden = hidden
         self._source = source
@@ -139,27 +243,31 @@ class Reader():
         """
         properties = []
         for line in self._source:
-            if Engine.LineParser.linehaskey(line=line, strict=self._strict): properties.append(line)
+            if Engine.LineParser.classify(line, self._strict)[0] == "property": properties.append(line)
         self._properties = properties
 
     def extractcomments(self):
         """
         Extracts comments from `_source` and attaches them to properties.
-        """
-        comments = {}
-        i = 0
-        while i < len(self._source):
-            line = self._source[i]
-            if Engine.LineParser.linehaskey(line=line, strict=self._strict):
-                comment, n = ([], i-1)
-                while n >= 0 and Engine.LineParser.iscomment(self._source[n]):
-                    comment.append( self._source[n][1:].strip() )
-                    n -= 1
-                if n != i-1:
-                    comment.reverse()
-                    comments[ Engine.LineParser.getlinekey(line) ] = "\n".join(comment)
-                    self._source = self._source[:n+1] + self._source[i:]
-            i += 1
+        Spans of comment lines are recorded by their line indexes and 
+        removed from `_source` at once when all lines were scanned.
+        """
+        comments, spans, start = ({}, [], None)
+        for i, line in enumerate(self._source):
+            kind, key, separator, value = Engine.LineParser.classify(line, self._strict)
+            if kind in ["comment", "hidden"]:
+                if start is None: start = i
+                continue
+            if start is not None and kind == "property":
+                comments[key] = "\n".join([ comment[1:].strip() for comment in self._source[start:i] ])
+                spans.append( (start, i) )
+            start = None
+        source, previous = ([], 0)
+        for start, end in spans:
+            source.extend(self._source[previous:start])
+            previous = end
+        source.extend(self._source[previous:])
+        self._source = source
         self._comments = comments
 
     def splitprops(self):
@@ -168,8 +276,7 @@ class Reader():
         """
         properties = {}
         for line in self._properties:
-            key = Engine.LineParser.getlinekey(line)
-            value = Engine.LineParser.getlinevalue(line)
+            kind, key, separator, value = Engine.LineParser.classify(line)
             properties[key] = value
         self._properties = properties
     
@@ -177,17 +284,198 @@ class Reader():
         """
         This method tries to cast values of loaded properties.
         """
-        for key, value in self._properties.items():
-            self._properties[key] = Engine.Converter.convert(value)
+        if isinstance(self._cast, Schema):
+            self._schematable = self._cast.compile(self._properties)
+            self._properties = self._cast.convert(self._properties, self._schematable, guess=True)
+        else: self._properties = dict(zip(self._properties.keys(), Engine.Converter.convert_many(self._properties.values())))
     
+    def _getdirective(self, key):
+        """
+        Returns (prefix, hidden) tuple if given key is an `__include__` directive. 
+        Returns None otherwise.
+        """
+        if key == "__include__": directive = ("", False)
+        elif key == "__include__.hidden": directive = ("", True)
+        elif key[:15] == "__include__.as.": directive = (key[15:], False)
+        elif key[:22] == "__include__.hidden.as.": directive = (key[22:], True)
+        else: directive = None
+        return directive
+
+    def _classified(self, path):
+        """
+        Yields tokens (kind, line number, line, key, value, span) of file of given path 
+        (see `Engine.Tokenizer.classify()` for kinds). 
+        Span is a tuple (path, offset, length, fingerprint) locating the line of a property when reader is lazy (see `_indexed()`) and 
+        None otherwise.
+        """
+        if self._lazy:
+            yield from self._indexed(path)
+            return
+        for lineno, line in self._scan(path):
+            kind, line, key, value = Engine.Tokenizer.classify(line, self._strict)
+            yield (kind, lineno, line, key, value, None)
+
+    def _parse(self, path):
+        """
+        Returns list of tokens of file of given path. 
+        Every file is parsed only once during a read, no matter how many times it is included.
+        """
+        real = os.path.realpath(path)
+        if real not in self._parsed: self._parsed[real] = list(self._classified(path)) if self._tokencache is None else self._cachedtokens(path)
+        return self._parsed[real]
+
+    def _cachedtokens(self, path):
+        """
+        Returns list of tokens of file of given path taking it from `_tokencache` 
+        if modification time and size of the file did not change since it was parsed. 
+        `_tokencache` is a dictionary mapping real paths to tuples ((modification time, size), tokens) 
+        and is updated with files which had to be parsed. 
+        """
+        real = os.path.realpath(path)
+        try:
+            stat = os.stat(real)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+        cached = self._tokencache.get(real)
+        if stamp is not None and cached is not None and cached[0] == stamp: return cached[1]
+        tokens = list(self._classified(path))
+        if stamp is not None: self._tokencache[real] = (stamp, tokens)
+        return tokens
+
+    def _tokens(self, path, prefix="", hidden=False, stack=(), tree=None):
+        """
+        Yields tokens of file of given path with `__include__` directives expanded in place. 
+        Line numbers of tokens coming from included files are line numbers in these files. 
+
+        `prefix` and `hidden` are applied to every property found in the file (they are used for 
+        included files). 
+        `stack` is a tuple of real paths of files being included and is used to detect cycles. 
+        Every resolved directive is added to `tree` as a node: (path, prefix, hidden, children). 
+        If tokens are recorded in `_stream` (see `tokenize()`) positions of included files in it are put 
+        in `_ranges` as tuples (real path, prefix, hidden, start, end).
+        """
+        if tree is None: tree = []
+        tokens = self._parse(path) if stack or self._tokencache is not None else self._classified(path)
+        stack = stack + (os.path.realpath(path),)
+        for token in tokens:
+            kind, lineno, line, key, value, span = token
+            if kind == "property" and self._includes and not prefix and not hidden and self._getdirective(key) != None:
+                iprefix, ihidden = self._getdirective(key)
+                ipath = self._includepath(value)
+                self._checkcycle(stack, ipath)
+                if (value, iprefix, ihidden) not in self._included: self._included.append( (value, iprefix, ihidden) )
+                node = (value, iprefix, ihidden, [])
+                tree.append(node)
+                start = None if self._stream is None else len(self._stream)
+                yield from self._tokens(ipath, prefix=iprefix, hidden=ihidden, stack=stack, tree=node[3])
+                if start is not None: self._ranges.append( (os.path.realpath(ipath), iprefix, ihidden, start, len(self._stream)) )
+                continue
+            if kind in ["property", "hidden"] and (prefix or hidden):
+                if prefix: key, line = ("{0}.{1}".format(prefix, key), "{0}.{1}".format(prefix, line))
+                if hidden: kind = "hidden"
+                token = (kind, lineno, line, key, value, span)
+            yield token
+
+    @staticmethod
+    def _prefixed(token, prefix="", hidden=False):
+        """
+        Returns given token as it appears when its file is included with given prefix and hidden flag 
+        (the same is done inline by `_tokens()`).
+        """
+        kind, lineno, line, key, value, span = token
+        if kind not in ["property", "hidden"]: return token
+        if prefix: key, line = ("{0}.{1}".format(prefix, key), "{0}.{1}".format(prefix, line))
+        if hidden: kind = "hidden"
+        return (kind, lineno, line, key, value, span)
+
+    def _resolve(self, path):
+        """
+        Yields tokens of file of given path with includes resolved and 
+        builds the tree of includes (`_includetree`). 
+        Real paths of all files which were read are put in `_files`. 
+        Main file is streamed and included files are parsed once and kept until resolving is finished.
+        """
+        self._parsed, self._includetree = ({}, [])
+        try:
+            yield from self._tokens(path, tree=self._includetree)
+        finally:
+            real = os.path.realpath(path)
+            self._files = [real] + [ included for included in self._parsed if included != real ]
+            self._parsed = {}
+
+    def tokenize(self, path):
+        """
+        Reads file of given path in a single pass and fills `_source`, `_properties`, 
+        `_comments` and `_hidden` directly. 
+        When reader is lazy values are not stored: `_properties` gets only positions of lines 
+        holding them and lines of properties in `_source` carry only keys.
+        Continuation lines, hidden properties, comments and key/value splitting are 
+        handled by `Engine.Tokenizer` and `__include__` directives are expanded in place 
+        (every included file is parsed once). 
+        Comment placed just before `__include__` directive is attached to first property of included file. 
+        If `_stream` is a list every token is appended to it (it is used by incremental reload), 
+        `_marks` get 0/1 telling which tokens put their lines into `_source` and 
+        `_counts` the number of tokens defining every key. 
+        Raises IncludeError when files include each other in a cycle.
+        """
+        comment, stream, marks, counts = ([], self._stream, self._marks, self._counts)
+        for token in self._resolve(path):
+            if stream is not None: stream.append(token), marks.append(1)
+            kind, lineno, line, key, value, span = token
+            if kind == "comment":
+                comment.append(line[1:].strip())
+                self._source.append(line)
+                continue
+            if kind in ["property", "hidden"]:
+                if kind == "hidden": self._hidden.append(key)
+                if stream is not None: counts[key] = counts.get(key, 0) + 1
+                if comment:
+                    self._comments[key] = "\n".join(comment)
+                    del self._source[-len(comment):]
+                    if stream is not None: marks[-len(comment) - 1:-1] = [0] * len(comment)
+                if span is None: self._properties[key] = value
+                else: self._properties.index(key, span)
+            self._source.append(line)
+            del comment[:]
+
+    def iterprops(self, cast=None):
+        """
+        Yields tuples (key, value, comment, hidden, line number) of properties found in file to which `_path` points 
+        while the file is being scanned. 
+        Nothing is stored in the reader (except `_included`) so memory used is bounded by 
+        the size of the largest logical line (and comment attached to it). 
+        Comment is an empty string if the property has none. 
+        If `cast` is passed as True values are run through `Engine.Converter.convert()` and 
+        if it is a `Schema` values are converted according to it; 
+        it defaults to `cast` the reader was created with.
+        """
+        if cast is None: cast = self._cast
+        comment = []
+        for kind, lineno, line, key, value, span in self._resolve(self._path):
+            if kind == "comment":
+                comment.append(line[1:].strip())
+                continue
+            if kind in ["property", "hidden"]:
+                if isinstance(cast, Schema): value = cast.cast(key, value, guess=True)
+                elif cast: value = Engine.Converter.convert(value)
+                yield (key, value, "\n".join(comment), kind == "hidden", lineno)
+            del comment[:]
+
     def read(self):
-        self.loadf()
-        if self._includes: self.makeincludes()
-        self.uncoverhidden()
-        self.extractcomments()
-        self.extractprops()
-        self.splitprops()
-        if self._cast: self.castprops()
+        """
+        Reads file to which `_path` points. 
+        If process-wide cache is enabled (see `enablecache()`) and the file (and files it includes) 
+        did not change since it was read last time, results are copied from the cache.
+        """
+        cache = readcache if self._tokencache is None else None
+        if cache is not None and cache.fetch(self): return
+        stamp = cache.stamp(self) if cache is not None else None
+        self._source, self._hidden, self._included, self._comments, self._properties = ([], [], [], {}, {})
+        if self._lazy: self._properties = LazyValues(strict=self._strict, cast=self._cast)
+        self.tokenize(self._path)
+        if self._cast and not self._lazy: self.castprops()
+        if cache is not None and stamp is not None: cache.put(self, stamp)
     
     def keys(self):
         """
@@ -196,6 +484,986 @@ class Reader():
         return list(self._properties.keys())
 
 
+class ReadCache():
+    """
+    Cache of results of `Reader.read()` shared by the whole process. 
+    Entries are keyed by absolute path, modification time and size of the file and 
+    `includes`, `cast`, `strict` and `lazy` flags of the reader. 
+    Modification times and sizes of included files are remembered and checked as well. 
+    When more than `size` entries are kept least recently used ones are dropped. 
+
+    Every reader gets its own copy of cached data so modifying it does not affect the cache. 
+    Use `enablecache()` to create the cache.
+    """
+    def __init__(self, size=128):
+        self.size, self.hits, self.misses = (size, 0, 0)
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _copy(self, data):
+        """
+        Returns copy of tuple (source, properties, comments, hidden, included, includetree, files).
+        """
+        source, properties, comments, hidden, included, includetree, files = data
+        return (list(source), properties.copy(), dict(comments), list(hidden), list(included), copy.deepcopy(includetree), list(files))
+
+    def _filestamp(self, path):
+        """
+        Returns tuple (modification time, size) of file of given path.
+        """
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def stamp(self, reader):
+        """
+        Returns key under which results of given reader are kept. 
+        Returns None if the file cannot be accessed.
+        """
+        try: mtime, size = self._filestamp(reader._path)
+        except OSError: return None
+        return (reader._path, mtime, size, reader._includes, reader._cast, reader._strict, reader._lazy)
+
+    def fetch(self, reader):
+        """
+        Fills given reader with cached results. 
+        Returns True on hit and False on miss.
+        """
+        key = self.stamp(reader)
+        with self._lock:
+            entry = self._entries.get(key) if key is not None else None
+            if entry is not None:
+                data, included = entry
+                try: fresh = all([ self._filestamp(path) == stamp for path, stamp in included ])
+                except OSError: fresh = False
+                if not fresh:
+                    del self._entries[key]
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return False
+            self._entries.move_to_end(key)
+            self.hits += 1
+        reader._source, reader._properties, reader._comments, reader._hidden, reader._included, reader._includetree, reader._files = self._copy(data)
+        return True
+
+    def put(self, reader, key):
+        """
+        Puts results of given reader in the cache under given key (see `stamp()`).
+        """
+        try: included = [ (path, self._filestamp(path)) for path in reader._files[1:] ]
+        except OSError: return
+        data = self._copy( (reader._source, reader._properties, reader._comments, reader._hidden, reader._included, reader._includetree, reader._files) )
+        with self._lock:
+            self._entries[key] = (data, included)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size: self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Drops all entries and resets counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits, self.misses = (0, 0)
+
+    def stats(self):
+        """
+        Returns dictionary with number of hits, misses, entries and maximal size of the cache.
+        """
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "size": self.size}
+
+
+readcache = None
+
+def enablecache(size=128):
+    """
+    Enables process-wide cache of parsed files (see `ReadCache`) and returns it. 
+    Existing cache is dropped.
+    """
+    global readcache
+    readcache = ReadCache(size)
+    return readcache
+
+def disablecache():
+    """
+    Disables process-wide cache of parsed files.
+    """
+    global readcache
+    readcache = None
+
+
+class _ReloadState():
+    """
+    Files of `Properties` as they were at last incremental reload (see `Properties.reload()`). 
+    Besides properties, comments, hidden keys and source read from the files it keeps: 
+    `tokencache` of the reader (see `Reader._cachedtokens()`), 
+    `stream` of tokens with includes expanded, 
+    `ranges` of tokens of included files in the stream as lists [real path, prefix, hidden, start, end], 
+    `marks` telling which tokens put their lines into source and 
+    `counts` of tokens defining every key, 
+    so a changed included file can be spliced into the stream without going through tokens of other files.
+    """
+    def __init__(self, tokencache, reader):
+        self.tokencache, self.properties, self.comments = (tokencache, reader._properties, reader._comments)
+        self.hidden, self.source, self.stream = (set(reader._hidden), reader._source, reader._stream)
+        self.ranges, self.marks, self.counts = ([ list(entry) for entry in reader._ranges ], reader._marks, reader._counts)
+
+    @staticmethod
+    def scan(tokens):
+        """
+        Returns tuple (definitions, comments, hidden, marks, counts) for given tokens the way `Reader.tokenize()` reads them: 
+        last token defining every key, comments attached to keys, set of hidden keys, 
+        list of 0/1 marks telling which tokens put their lines into source (comments attached to properties do not) and 
+        number of tokens defining every key.
+        """
+        definitions, comments, hidden, marks, counts, run = ({}, {}, set(), [], {}, [])
+        for i, token in enumerate(tokens):
+            kind, key = (token[0], token[3])
+            marks.append(1)
+            if kind == "comment":
+                run.append(i)
+                continue
+            if kind in ["property", "hidden"]:
+                if kind == "hidden": hidden.add(key)
+                if run:
+                    comments[key] = "\n".join([ tokens[n][2][1:].strip() for n in run ])
+                    for n in run: marks[n] = 0
+                definitions[key] = token
+                counts[key] = counts.get(key, 0) + 1
+            run = []
+        return (definitions, comments, hidden, marks, counts)
+
+    @staticmethod
+    def describe(properties, comments, hidden, key):
+        """
+        Returns tuple (fingerprint, value, comment, hidden) describing given key. 
+        Values read lazily which are not parsed yet are described by fingerprint (see `LazyValues.span()`) and 
+        value is None, otherwise fingerprint is None.
+        """
+        span = properties.span(key) if isinstance(properties, LazyValues) else None
+        if span is not None: return (span[3], None, comments.get(key), key in hidden)
+        return (None, properties[key], comments.get(key), key in hidden)
+
+    @staticmethod
+    def changed(old, new, properties, key):
+        """
+        Returns True if descriptions of given key (see `describe()`) differ. 
+        New value is parsed from `properties` only when just one of the values is described by fingerprint.
+        """
+        if old[2:] != new[2:]: return True
+        if old[0] is not None and new[0] is not None: return old[0] != new[0]
+        if old[0] is not None: return True
+        return old[1] != (properties[key] if new[0] is not None else new[1])
+
+    def copy(self):
+        """
+        Returns copy of the state which can be spliced without modifying this one.
+        """
+        copy = _ReloadState.__new__(_ReloadState)
+        copy.tokencache, copy.properties, copy.comments = (dict(self.tokencache), self.properties.copy(), dict(self.comments))
+        copy.hidden, copy.source, copy.stream = (set(self.hidden), list(self.source), list(self.stream))
+        copy.ranges, copy.marks, copy.counts = ([ list(entry) for entry in self.ranges ], list(self.marks), dict(self.counts))
+        return copy
+
+    def splice(self, entry, tokens, touched, cast=False):
+        """
+        Replaces tokens of included file described by given entry of `ranges` with given tokens. 
+        Only the window made of these tokens and comments around them is scanned again. 
+        Description of every key defined in the window (see `describe()`) is put in `touched` 
+        unless the key is already there. 
+        Returns False if the window cannot be spliced (the file was empty or a key of the window is defined outside of it too); 
+        the state is left partially updated then.
+        """
+        stream, start, end = (self.stream, entry[3], entry[4])
+        if start == end: return False
+        low, high = (start, end)
+        while low > 0 and stream[low-1][0] == "comment": low -= 1
+        while high < len(stream) and stream[high][0] == "comment": high += 1
+        if high < len(stream): high += 1
+        window = stream[low:start] + tokens + stream[end:high]
+        olddefinitions, oldcomments, oldhidden, oldmarks, oldcounts = _ReloadState.scan(stream[low:high])
+        definitions, comments, hidden, marks, counts = _ReloadState.scan(window)
+        for key in set(oldcounts) | set(counts):
+            if self.counts.get(key, 0) != oldcounts.get(key, 0): return False
+            if key not in touched:
+                touched[key] = _ReloadState.describe(self.properties, self.comments, self.hidden, key) if key in self.properties else None
+        for key in oldcounts:
+            del self.properties[key], self.counts[key]
+            self.comments.pop(key, None)
+            self.hidden.discard(key)
+        for key, token in definitions.items():
+            value, span = token[4:]
+            if span is not None: self.properties.index(key, span)
+            elif isinstance(cast, Schema): self.properties[key] = cast.cast(key, value, guess=True)
+            elif cast: self.properties[key] = Engine.Converter.convert(value)
+            else: self.properties[key] = value
+        self.comments.update(comments)
+        self.hidden.update(hidden)
+        self.counts.update(counts)
+        first = sum(self.marks[:low])
+        self.source[first:first+sum(oldmarks)] = [ token[2] for token, mark in zip(window, marks) if mark ]
+        stream[low:high], self.marks[low:high] = (window, marks)
+        delta = len(tokens) - (end - start)
+        for other in self.ranges:
+            if other is entry: other[4] += delta
+            elif other[3] >= end: other[3], other[4] = (other[3] + delta, other[4] + delta)
+            elif other[3] <= start and other[4] >= end: other[4] += delta
+        return True
+
+
+class Watcher():
+    """
+    Polls files of watched `Properties` objects in a single background thread shared by all of them. 
+    Files are only `os.stat()`-ed and properties are reloaded incrementally (see `Properties.reload()`) 
+    only when one of files they were read from changed. 
+    Reloads and callbacks run in the thread of the watcher; callbacks get properties and changeset returned by `reload()`. 
+    Reload builds new `properties`, `propcomments` and `hidden` and swaps them in, so other threads reading them 
+    see either the old or the new state (but nothing should modify the object while it is watched). 
+    Files which cannot be reloaded (eg. they are half-written) are reported with a warning and 
+    tried again on the next poll; errors of one object never stop the thread or checks of other objects. 
+
+    Watcher keeps only weak references to watched objects. 
+    The thread is started when first object is watched and stops when no objects are left. 
+    Use `Properties.watch()` and `Properties.unwatch()` instead of calling the watcher directly.
+    """
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def add(self, properties, interval=1.0, callback=None):
+        """
+        Starts watching given properties every `interval` seconds.
+        """
+        entry = [weakref.ref(properties), interval, callback, time.monotonic() + interval, properties._filestamps()]
+        with self._lock:
+            self._entries[id(properties)] = entry
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="pyproperties-watcher", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def remove(self, properties):
+        """
+        Stops watching given properties.
+        """
+        with self._lock: self._entries.pop(id(properties), None)
+        self._wakeup.set()
+
+    def watching(self, properties):
+        """
+        Returns True if given properties are watched.
+        """
+        entry = self._entries.get(id(properties))
+        return entry is not None and entry[0]() is properties
+
+    def _check(self, entry):
+        """
+        Reloads properties of given entry if any of their files changed and calls the callback.
+        """
+        properties = entry[0]()
+        if properties is None: return
+        if properties._reloadstate is None and properties._filestamps() == entry[4]: return
+        try: changes = properties.reload(incremental=True)
+        except Exception as e:
+            warnings.warn("watched properties could not be reloaded from '{0}': {1!r}".format(properties.path, e))
+            return
+        if entry[2] is None or not any(changes.values()): return
+        try: entry[2](properties, changes)
+        except Exception as e: warnings.warn("watch callback failed for '{0}': {1!r}".format(properties.path, e))
+
+    def _run(self):
+        """
+        Main loop of the watcher thread. 
+        Errors raised while checking an object are reported with a warning and the loop goes on. 
+        If it stops for any reason the thread is forgotten so `add()` can start a new one.
+        """
+        try:
+            while True:
+                with self._lock:
+                    for key in [ key for key, entry in self._entries.items() if entry[0]() is None ]: del self._entries[key]
+                    if not self._entries:
+                        self._thread = None
+                        return
+                    now = time.monotonic()
+                    due = [ entry for entry in self._entries.values() if entry[3] <= now ]
+                    for entry in due: entry[3] = now + entry[1]
+                for entry in due:
+                    try: self._check(entry)
+                    except Exception as e: warnings.warn("watched properties could not be checked: {0!r}".format(e))
+                with self._lock:
+                    timeout = min([ entry[3] for entry in self._entries.values() ] or [now]) - time.monotonic()
+                self._wakeup.wait(max(0, timeout))
+                self._wakeup.clear()
+        finally:
+            with self._lock:
+                if self._thread is threading.current_thread(): self._thread = None
+
+
+watcher = Watcher()
+
+
+class Snapshot():
+    """
+    Helpers for binary snapshots of parsed properties (see `Properties.dump_snapshot()`). 
+    Snapshot file starts with `snapshot_magic` and a version byte followed by a pickled dictionary. 
+    Snapshots hold modification time, size and digest of every file they were read from so 
+    stale snapshots can be detected. 
+
+    **NOTE**
+    Snapshots are unpickled when they are loaded so load only snapshots you created yourself.
+    """
+    @staticmethod
+    def digest(path):
+        """
+        Returns SHA-1 digest of contents of file of given path.
+        """
+        digest = hashlib.sha1()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(2**20), b""): digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def stamps(paths):
+        """
+        Returns list of tuples (path, modification time, size, digest) of given files.
+        """
+        stamps = []
+        for path in paths:
+            stat = os.stat(path)
+            stamps.append( (path, stat.st_mtime_ns, stat.st_size, Snapshot.digest(path)) )
+        return stamps
+
+    @staticmethod
+    def isfresh(stamps):
+        """
+        Returns True if none of files described by given stamps has changed. 
+        Digest is computed only when modification time of a file changed but its size did not.
+        """
+        for path, mtime, size, digest in stamps:
+            try: stat = os.stat(path)
+            except OSError: return False
+            if (stat.st_mtime_ns, stat.st_size) == (mtime, size): continue
+            if stat.st_size != size or Snapshot.digest(path) != digest: return False
+        return True
+
+    @staticmethod
+    def dump(path, data):
+        """
+        Writes snapshot data to given path. 
+        Data is written to temporary file which then replaces target so 
+        readers never see partially written snapshot.
+        """
+        temporary = "{0}.{1}.tmp".format(path, os.getpid())
+        try:
+            with open(temporary, "wb") as file:
+                file.write(snapshot_magic + bytes([snapshot_version]))
+                pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary): os.remove(temporary)
+
+    @staticmethod
+    def load(path):
+        """
+        Returns data read from snapshot of given path. 
+        Raises ReadError if the file cannot be read, is not a snapshot or was written by different version of the format.
+        """
+        try:
+            with open(path, "rb") as file:
+                header = file.read(len(snapshot_magic) + 1)
+                data = pickle.load(file) if header == snapshot_magic + bytes([snapshot_version]) else None
+        except Exception as e:
+            raise ReadError("cannot load snapshot '{0}': {1}".format(path, e))
+        if header[:-1] != snapshot_magic: raise ReadError("not a snapshot: '{0}'".format(path))
+        if header[-1] != snapshot_version: raise ReadError("unsupported snapshot version {0}: '{1}'".format(header[-1], path))
+        return data
+
+
+def _tobool(value):
+    """
+    Converts 'True' and 'False' strings to booleans. Raises ValueError for other strings.
+    """
+    if value not in ["True", "False"]: raise ValueError("invalid literal for bool: '{0}'".format(value))
+    return value == "True"
+
+def _toint(value):
+    """
+    Converts string holding decimal, binary, octal or hexadecimal integer to int.
+    """
+    try: return int(value)
+    except ValueError: return int(value, 0)
+
+
+class Schema():
+    """
+    Declares types of properties by identifiers (see `Engine.expandidentifier()`), eg.:
+
+        pyproperties.Schema({"customer.*.postal_code": str, "numeral.float.*": float})
+
+    Type is any callable accepting a string. 
+    `int` accepts also binary, octal and hexadecimal numbers and `bool` accepts only 'True' and 'False'. 
+    When a key matches more than one identifier the first one is used. 
+    Values of keys which do not match any identifier are not converted unless `guess` is passed as True to 
+    `cast()` and `convert()`: their types are then guessed (see `Engine.Converter.convert()`). 
+    Properties read or casted with a schema always guess types of such keys.
+    All identifiers are compiled to a single pattern so finding converter of a key takes one match.
+
+    Schema can be passed as `cast` to `Reader()`, `Properties()` and `Properties.read()` or 
+    set on existing properties with `Properties.setschema()`.
+    """
+    def __init__(self, types):
+        self.types = dict(types)
+        self._converters, patterns = ({}, [])
+        for i, (identifier, type) in enumerate(self.types.items()):
+            if type is bool: converter = _tobool
+            elif type is int: converter = _toint
+            else: converter = type
+            self._converters["t{0}".format(i)] = converter
+            patterns.append("(?P<t{0}>{1})".format(i, Engine.expandidentifier(identifier)))
+        self._pattern = re.compile("|".join(patterns)) if patterns else None
+
+    def __eq__(self, other):
+        return isinstance(other, Schema) and self.types == other.types
+
+    def __hash__(self):
+        return hash(tuple(self.types.items()))
+
+    def converter(self, key):
+        """
+        Returns converter for given key or None if the key does not match any identifier.
+        """
+        match = self._pattern.match(key) if self._pattern is not None else None
+        return self._converters[match.lastgroup] if match is not None else None
+
+    def compile(self, keys):
+        """
+        Returns dictionary mapping given keys to their converters. 
+        Keys which do not match any identifier are omitted.
+        """
+        table = {}
+        for key in keys:
+            converter = self.converter(key)
+            if converter is not None: table[key] = converter
+        return table
+
+    def cast(self, key, value, table=None, guess=False):
+        """
+        Returns value of given key converted according to the schema. 
+        `table` is a dictionary returned by `compile()`; keys missing in it are looked up and added to it. 
+        If `guess` is passed as True type of value of a key not described by the schema is guessed. 
+        Raises ValueError when value cannot be converted.
+        """
+        if table is None: converter = self.converter(key)
+        elif key in table: converter = table[key]
+        else: converter = table.setdefault(key, self.converter(key))
+        if type(value) is not str: return value
+        if converter is None: return Engine.Converter.cached(value) if guess else value
+        try: return converter(value)
+        except (ValueError, TypeError) as e: raise ValueError("cannot convert value of '{0}': {1}".format(key, e))
+
+    def convert(self, values, table=None, guess=False):
+        """
+        Returns copy of given dictionary of values with strings converted according to the schema. 
+        Keys are grouped by their converters so every converter is run once over all its values. 
+        If `guess` is passed as True types of values of keys not described by the schema are guessed.
+        """
+        if table is None: table = self.compile(values)
+        converted, groups = (dict(values), {})
+        for key, converter in table.items():
+            if converter is not None and key in values and type(values[key]) is str: groups.setdefault(converter, []).append(key)
+        for converter, keys in groups.items():
+            try: converted.update(zip(keys, map(converter, [ values[key] for key in keys ])))
+            except (ValueError, TypeError):
+                for key in keys: self.cast(key, values[key], table)
+        if guess:
+            guessed = [ key for key in values if type(values[key]) is str and table.get(key) is None ]
+            converted.update(zip(guessed, Engine.Converter.convert_many([ values[key] for key in guessed ])))
+        return converted
+
+
+class TrackedValues(dict):
+    """
+    Dictionary of properties values which notices its modifications: 
+    every change gives it new `version` (numbers are taken from `version_counter` so they are unique in the process). 
+    `Properties` compare versions of their dictionaries with the ones they have seen to notice values 
+    modified directly and build their indexes again.
+    """
+    __slots__ = ("version",)
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self.version = next(version_counter)
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self.version = next(version_counter)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self.version = next(version_counter)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def pop(self, *args):
+        value = dict.pop(self, *args)
+        self.version = next(version_counter)
+        return value
+
+    def popitem(self):
+        item = dict.popitem(self)
+        self.version = next(version_counter)
+        return item
+
+    def setdefault(self, key, default=None):
+        if key not in self: self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        self.version = next(version_counter)
+
+    def clear(self):
+        dict.clear(self)
+        self.version = next(version_counter)
+
+    def copy(self):
+        return TrackedValues(self)
+
+
+class LazyValues(MutableMapping):
+    """
+    Dictionary of properties values built by lazy `Reader`. 
+    Instead of a value it holds position (path, offset, length, fingerprint) of the line carrying it and 
+    the value is parsed (and casted if requested) the first time it is accessed. 
+    Parsed values are kept so every line is parsed at most once. 
+    Every file is opened only once and its handle is shared by copies of the dictionary (see `_LazyFiles`). 
+    Modifications are noticed the same way as by `TrackedValues`.
+    
+    **NOTE**
+    Positions point into files on disk so they must not be modified while 
+    values are still not parsed.
+    """
+    def __init__(self, strict=True, cast=False):
+        self._data, self._pending, self._files = ({}, set(), _LazyFiles())
+        self.version = next(version_counter)
+        self._strict, self._cast, self._encoding = (strict, cast, locale.getpreferredencoding(False))
+
+    def index(self, key, span):
+        """
+        Sets position (path, offset, length, fingerprint) of the line holding value of given key.
+        """
+        self._data[key] = span
+        self._pending.add(key)
+
+    def span(self, key):
+        """
+        Returns position (path, offset, length, fingerprint) of the line holding value of given key 
+        or None if the value has already been parsed. 
+        Fingerprint is a hash of raw value so values can be compared without being parsed.
+        """
+        return self._data[key] if key in self._pending else None
+
+    def isloaded(self, key):
+        """
+        Returns True if value of given key has already been parsed.
+        """
+        if key not in self._data: raise KeyError(key)
+        return key not in self._pending
+
+    def _parse(self, key, span, cast):
+        """
+        Reads the line pointed by span and returns value of given key.
+        """
+        path, offset, length = span[:3]
+        raw = self._files.read(path, offset, length)
+        lines = raw.splitlines()
+        if len(lines) == 1 and lines[0][-1:] != b"\\": line = lines[0].decode(self._encoding)
+        else: lineno, line = next(Engine.Tokenizer.mappedlines(raw, path, self._encoding))
+        value = Engine.LineParser.classify(line.lstrip(), self._strict)[3]
+        if isinstance(cast, Schema): value = cast.cast(key, value, guess=True)
+        elif cast: value = Engine.Converter.convert(value)
+        return value
+
+    def peek(self, key):
+        """
+        Returns value of given key without keeping it.
+        """
+        value = self._data[key]
+        if key in self._pending: value = self._parse(key, value, cast=self._cast)
+        return value
+
+    def copy(self):
+        """
+        Returns shallow copy which shares positions of not yet parsed values.
+        """
+        copy = LazyValues(strict=self._strict, cast=self._cast)
+        copy._data, copy._pending, copy._files = (self._data.copy(), set(self._pending), self._files)
+        return copy
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        if key in self._pending:
+            value = self._parse(key, value, cast=self._cast)
+            self._data[key] = value
+            self._pending.discard(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self._pending.discard(key)
+        self.version = next(version_counter)
+
+    def __delitem__(self, key):
+        del self._data[key]
+        self._pending.discard(key)
+        self.version = next(version_counter)
+
+    def close(self):
+        """
+        Closes files values are read from. They are opened again when another value is parsed.
+        """
+        self._files.close()
+
+    def __contains__(self, key): return key in self._data
+    def __iter__(self): return iter(self._data)
+    def __len__(self): return len(self._data)
+
+
+class _LazyFiles():
+    """
+    Files which values of `LazyValues` are read from. 
+    Every file is opened once, on first read, and is kept open (and shared by copies of `LazyValues`) 
+    until the object is garbage collected. 
+    Reads are serialised by a lock because seeking and reading a shared handle is not atomic.
+    """
+    def __init__(self):
+        self._handles, self._lock = ({}, threading.Lock())
+
+    def read(self, path, offset, length):
+        """
+        Returns `length` bytes found at `offset` in file of given path.
+        """
+        with self._lock:
+            file = self._handles.get(path)
+            if file is None: file = self._handles[path] = open(path, "rb")
+            file.seek(offset)
+            return file.read(length)
+
+    def close(self):
+        """
+        Closes all opened files. They are opened again if another value is read.
+        """
+        with self._lock:
+            for file in self._handles.values(): file.close()
+            self._handles = {}
+
+    def __del__(self): self.close()
+
+
+class ResolvedView():
+    """
+    Read-only view of resolved properties returned by `Properties.resolved()`. 
+    Nothing is copied: values are read from the viewed properties, resolved (and casted if 
+    requested) when they are accessed and cached by the viewed object, so the view 
+    always reflects its current state.
+    """
+    def __init__(self, properties, cast=False):
+        self._properties, self._cast = (properties, cast)
+
+    def get(self, key):
+        """
+        Returns resolved value of given key. 
+        KeyError is raised if key is not available (not found or is hidden) or cannot be resolved.
+        """
+        return self._properties.get(key, parse=True, cast=self._cast)
+
+    def gets(self, identifier, no_expand=False):
+        """
+        Returns list of tuples containig (key, resolved value) of properties which names matched pattern given as identifier.
+        """
+        return self._properties.gets(identifier, parse=True, cast=self._cast, no_expand=no_expand)
+
+    def keys(self):
+        """
+        Returns sorted list of the non-hidden properties names.
+        """
+        return self._properties.keys()
+
+    def __getitem__(self, key): return self.get(key)
+    def __contains__(self, key): return key in self._properties.properties and key not in self._properties.hidden
+    def __iter__(self): return iter(self.keys())
+    def __len__(self): return len(self._properties._sortedkeys())
+
+
+class _TrieNode():
+    """
+    Node of `KeyTrie`: children by segment, key ending at the node (or None) and 
+    height of the subtree (it is not lowered when keys are discarded so it is an upper bound).
+    """
+    __slots__ = ("children", "key", "height")
+
+    def __init__(self):
+        self.children, self.key, self.height = ({}, None, 0)
+
+
+class KeyTrie():
+    """
+    Index of dotted keys: a tree of their segments used by `Properties` to find keys 
+    matching identifiers without testing every key. 
+    Plain keys and identifiers with a single whole-segment wildcard (eg. `customer.*.name`) are 
+    matched by walking only branches which can hold matching keys.
+    """
+    def __init__(self, keys=()):
+        self._root, self.size = (_TrieNode(), 0)
+        for key in keys: self.add(key)
+
+    def add(self, key):
+        """
+        Adds key to the index.
+        """
+        segments = key.split(".")
+        node, remaining = (self._root, len(segments))
+        for segment in segments:
+            if node.height < remaining: node.height = remaining
+            child = node.children.get(segment)
+            if child is None: child = node.children[segment] = _TrieNode()
+            node, remaining = (child, remaining - 1)
+        if node.key is None: self.size += 1
+        node.key = key
+
+    def discard(self, key):
+        """
+        Removes key from the index. Does nothing if key is not found.
+        """
+        path, node = ([], self._root)
+        for segment in key.split("."):
+            child = node.children.get(segment)
+            if child is None: return
+            path.append((node, segment))
+            node = child
+        if node.key is None: return
+        node.key = None
+        self.size -= 1
+        while path and node.key is None and not node.children:
+            node, segment = path.pop()
+            del node.children[segment]
+
+    def match(self, identifier):
+        """
+        Returns unsorted list of keys which match given identifier (see `Engine.expandidentifier()`) or 
+        None if the identifier cannot be matched by walking the tree (it has to be matched with `Engine.matcher()`).
+        """
+        segments = identifier.split(".")
+        if segments.count("*") > 1 or not all([ segment == "*" or identifier_segment_re.match(segment) for segment in segments ]): return None
+        n = segments.index("*") if "*" in segments else len(segments)
+        node = self._root
+        for segment in segments[:n]:
+            node = node.children.get(segment)
+            if node is None: return []
+        if n == len(segments): return [] if node.key is None else [node.key]
+
+        rest, found = (segments[n+1:], [])
+        depth = len(rest)
+        stack = [ (child, segment != "") for segment, child in node.children.items() if child.height >= depth and not segment.strip(wildcart_chars) ]
+        while stack:
+            node, nonempty = stack.pop()
+            if nonempty:
+                end = node
+                for segment in rest:
+                    end = end.children.get(segment)
+                    if end is None: break
+                else:
+                    if end.key is not None: found.append(end.key)
+            if node.height > depth:
+                stack.extend([ (child, True) for segment, child in node.children.items() if child.height >= depth and not segment.strip(wildcart_chars) ])
+        return found
+
+
+class GroupIndex():
+    """
+    Index of groups of properties: maps identifiers of groups (see `Engine.groupidentifier()`) 
+    to sets of keys of their members. 
+    """
+    def __init__(self, keys=()):
+        self._groups, self.size = ({}, 0)
+        for key in keys: self.add(key)
+
+    def add(self, key):
+        """
+        Adds key to the group it belongs to.
+        """
+        members = self._groups.setdefault(Engine.groupidentifier(key), set())
+        if key not in members:
+            members.add(key)
+            self.size += 1
+
+    def discard(self, key):
+        """
+        Removes key from the group it belongs to. Does nothing if key is not found.
+        """
+        identifier = Engine.groupidentifier(key)
+        members = self._groups.get(identifier)
+        if members is None or key not in members: return
+        members.remove(key)
+        self.size -= 1
+        if not members: del self._groups[identifier]
+
+    def groups(self, hidden=(), minimum=2):
+        """
+        Returns dictionary mapping identifiers of groups which have at least `minimum` members 
+        not found in `hidden` to sorted lists of these members. 
+        Groups are ordered by their first member.
+        """
+        groups = []
+        for identifier, members in self._groups.items():
+            if len(members) < minimum: continue
+            if hidden: members = [ key for key in members if key not in hidden ]
+            if len(members) >= minimum: groups.append((sorted(members), identifier))
+        groups.sort()
+        return dict([ (identifier, members) for members, identifier in groups ])
+
+
+class ValueIndex():
+    """
+    Reverse index of values: maps values to keys holding them. 
+    Hidden and non-hidden keys are kept in separate buckets. 
+    Unhashable values are kept aside and compared one by one. 
+    Every key keeps the position it got when it was first added, so keys are returned in order of insertion 
+    (the order of keys in the dictionary the index was built from).
+    """
+    def __init__(self, items=(), hidden=()):
+        self._buckets, self._entries, self._unhashable, self._positions = (({}, {}), {}, {}, itertools.count())
+        for key, value in items: self.add(key, value, key in hidden)
+        self.size = len(self._entries)
+
+    def add(self, key, value, hidden=False):
+        """
+        Sets value of given key (previous one is dropped, position of the key is kept).
+        """
+        position = self._entries[key][2] if key in self._entries else next(self._positions)
+        self.discard(key)
+        self._entries[key] = (value, hidden, position)
+        try: self._buckets[hidden].setdefault(value, {})[key] = None
+        except TypeError: self._unhashable[key] = None
+        self.size = len(self._entries)
+
+    def discard(self, key):
+        """
+        Removes key from the index. Does nothing if key is not found.
+        """
+        if key not in self._entries: return
+        value, hidden, position = self._entries.pop(key)
+        if key in self._unhashable: del self._unhashable[key]
+        else:
+            bucket = self._buckets[hidden]
+            del bucket[value][key]
+            if not bucket[value]: del bucket[value]
+        self.size = len(self._entries)
+
+    def sethidden(self, key, hidden):
+        """
+        Moves key to the bucket of hidden or non-hidden keys.
+        """
+        if key in self._entries and self._entries[key][1] != hidden: self.add(key, self._entries[key][0], hidden)
+
+    def keysof(self, value, hidden=False):
+        """
+        Returns list of hidden or non-hidden keys holding given value in order of insertion.
+        """
+        try: keys = list(self._buckets[hidden].get(value, ()))
+        except TypeError: keys = []
+        keys.extend([ key for key in self._unhashable if self._entries[key][:2] == (value, hidden) ])
+        return sorted(keys, key=lambda key: self._entries[key][2])
+
+
+class HiddenKeys(MutableSequence):
+    """
+    Keys of hidden properties: a set which remembers order of insertion.
+    Membership tests, `append()` and `remove()` take constant time.
+    It behaves like a list (it is equal to the list of the same keys, can be indexed and sliced)
+    but keys are never repeated: appending a key which is already present does nothing. 
+    Modifications are noticed the same way as by `TrackedValues`.
+    """
+    def __init__(self, keys=()):
+        self._keys, self.version = (dict.fromkeys(keys), next(version_counter))
+
+    def __contains__(self, key): return key in self._keys
+    def __iter__(self): return iter(self._keys)
+    def __reversed__(self): return reversed(list(self._keys))
+    def __len__(self): return len(self._keys)
+    def __repr__(self): return repr(list(self._keys))
+    def __reduce__(self): return (HiddenKeys, (list(self._keys),))
+
+    def __eq__(self, other):
+        if isinstance(other, (HiddenKeys, list)): return list(self._keys) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __getitem__(self, index):
+        keys = list(self._keys)[index]
+        return HiddenKeys(keys) if isinstance(index, slice) else keys
+
+    def __setitem__(self, index, key):
+        keys = list(self._keys)
+        keys[index] = key
+        self._keys, self.version = (dict.fromkeys(keys), next(version_counter))
+
+    def __delitem__(self, index):
+        keys = list(self._keys)
+        del keys[index]
+        self._keys, self.version = (dict.fromkeys(keys), next(version_counter))
+
+    def insert(self, index, key):
+        if key in self._keys: return
+        keys = list(self._keys)
+        keys.insert(index, key)
+        self._keys, self.version = (dict.fromkeys(keys), next(version_counter))
+
+    def append(self, key):
+        self._keys[key] = None
+        self.version = next(version_counter)
+
+    def remove(self, key):
+        if key not in self._keys: raise ValueError("{0!r} is not hidden".format(key))
+        del self._keys[key]
+        self.version = next(version_counter)
+
+    def clear(self):
+        self._keys.clear()
+        self.version = next(version_counter)
+
+    def copy(self):
+        return HiddenKeys(self._keys)
+
+
+class SortedKeys():
+    """
+    Sorted lists of all keys (`all`) and of non-hidden keys (`visible`) of properties.
+    Lists are updated in place when keys are added, removed, hidden or unhidden.
+    `stamp` is the generation of keys of properties the lists were made for.
+    """
+    def __init__(self, keys, hidden, stamp):
+        self.all = sorted(keys)
+        self.visible = [ key for key in self.all if key not in hidden ] if hidden else list(self.all)
+        self.stamp = stamp
+
+    def update(self, key, present, visible):
+        """
+        Inserts key to or removes it from sorted lists.
+        `present` tells if key is now found in properties, `visible` if it is not hidden.
+        """
+        for keys, member in ((self.all, present), (self.visible, present and visible)):
+            i = bisect.bisect_left(keys, key)
+            found = i < len(keys) and keys[i] == key
+            if member and not found: keys.insert(i, key)
+            elif found and not member: del keys[i]
+
+
 class Writer():
     """
     This class utilizes methods for storing properties. 
@@ -215,6 +1483,7 @@ class Writer():
         self.origin_properties, self._origin_includes = (self.properties.origin_properties, self.properties._origin_includes)
         self.origin_propcomments, self.origin_hidden = (self.properties.origin_propcomments, self.properties.origin_hidden)
         self.source = self.properties.origin_source
+        self._storedkeys, self._origin_hiddenkeys = (set(), set(self.origin_hidden))
     
     def storeprop(self, key):
         """
@@ -225,11 +1494,14 @@ class Writer():
         It will also check if the key is in `origin_properties` dict to ensure that unsaved properties 
         would not get stored.
         """
-        if key not in self.stored and key in self.origin_properties:
+        if key not in self._storedkeys and key in self.origin_properties:
+            if type(self.origin_properties) is LazyValues: value = self.origin_properties.peek(key)
+            else: value = self.origin_properties[key]
             if key in self.origin_propcomments: self.storecomment(key)
-            if key not in self.origin_hidden: self.lines.append("{0}={1}".format(key, self.origin_properties[key]))
-            else: self.lines.append("#{0}={1}".format(key, self.origin_properties[key]))
-            self.stored.append(key) 
+            if key not in self._origin_hiddenkeys: self.lines.append("{0}={1}".format(key, value))
+            else: self.lines.append("#{0}={1}".format(key, value))
+            self.stored.append(key)
+            self._storedkeys.add(key)
 
     def storeincludes(self):
         """
@@ -251,24 +1523,20 @@ class Writer():
         """
         Prepares data which came with source for storing.
         """
-        for i in range(len(self.source)):
-            if self.source[i] == "" or self.source[i].isspace():
+        for line in self.source:
+            if line == "" or line.isspace():
                 self.lines.append("")
-            elif self.source[i][0] == "#":
-                self.lines.append("{0}".format(self.source[i]))
-            elif Engine.LineParser.getlinekey(self.source[i], strict=self.properties.strict) != "":
-                self.storeprop(Engine.LineParser.getlinekey(self.source[i], strict=self.properties.strict))
+            elif line[0] == "#":
+                self.lines.append("{0}".format(line))
+            else:
+                kind, key, separator, value = Engine.LineParser.classify(line, self.properties.strict)
+                if kind == "property": self.storeprop(key)
     
     def storegroups(self):
         """
         Generates lines for groups not found in source.
         """
         if self.lines != [] and self.lines[-1] != "": self.lines.append("")
-        for identifier in self.properties.getgroups():
-            previous_len = len(self.lines)
-            keys = [ key for key in self.properties.gets(identifier) ]
-            for key in sorted(keys): self.storeprop(key)
-            if len(self.lines) > previous_len: self.lines.append("")
 
     def storesingles(self):
         """
@@ -290,7 +1558,14 @@ class Writer():
         file = open(path, "w")
         for line in self.lines: file.write("{0}\n".format(line))
         file.close()
-        self.lines, self.stored = ([], [])
+        self.lines, self.stored, self._storedkeys = ([], [], set())
+
+    async def adump(self, path):
+        """
+        Awaitable version of `dump()`: file is written in chunks without blocking the event loop.
+        """
+        await _awrite(path, "".join([ "{0}\n".format(line) for line in self.lines ]))
+        self.lines, self.stored, self._storedkeys = ([], [], set())
 
     def store(self, path="", force=False, no_dump=False, drop_source=False):
         """
@@ -319,6 +1594,14 @@ class Writer():
         finally:
             if not no_dump: self.dump(path)
 
+    async def astore(self, path="", force=False, drop_source=False):
+        """
+        Awaitable version of `store()`. 
+        Lines are generated the same way but the file is written without blocking the event loop.
+        """
+        self.store(path, force, no_dump=True, drop_source=drop_source)
+        await self.adump(path or self.properties.path)
+
 
 class Exporter:
     """
@@ -368,8 +1651,7 @@ class Exporter:
             Generates lines for groups not found in source.
             """
             for identifier in self._properties.getgroups():
-                keys = [ key for key in dict(self._properties.gets(identifier)) ]
-                for key in sorted(keys): self.storeprop(key)
+                for key in self._properties._matchkeys(identifier): self.storeprop(key)
 
         def storesingles(self):
             """
@@ -387,6 +1669,13 @@ class Exporter:
             else: file.write(self.json)
             file.close()
 
+        async def adump(self, path):
+            """
+            Awaitable version of `dump()`: file is written in chunks without blocking the event loop.
+            """
+            if type(self.json) == list: await _awrite(path, "".join([ "{0}\n".format(line) for line in self.json ]))
+            else: await _awrite(path, self.json)
+
         def store(self, path="", force=False, no_dump=False, pretty=False):
             """
             **JSON Writer version**
@@ -412,6 +1701,15 @@ class Exporter:
             self.encode(pretty=pretty)
             if not no_dump: self.dump(path)
 
+        async def astore(self, path="", force=False, pretty=False):
+            """
+            **JSON Writer version**
+            Awaitable version of `store()`. 
+            JSON is generated the same way but the file is written without blocking the event loop.
+            """
+            self.store(path, force, no_dump=True, pretty=pretty)
+            await self.adump(path or self._path)
+
 
 
 class Engine:
@@ -454,36 +1752,209 @@ class Engine:
             if re.match(re.compile(guess_hex_re), s): result = True
             return result
 
+        def guess(value):
+            """
+            Returns tuple (group, value) where group is the index of group of `guess_re` matched by 
+            given string (0 if it did not match) and value is the string converted accordingly. 
+            Strings which cannot be converted are rejected by looking at their first character before 
+            the pattern is tried.
+            """
+            if value == "" or value[0] not in guess_first_chars: return (0, value)
+            match = guess_re.match(value)
+            if match is None: return (0, value)
+            group = match.lastindex
+            if group == 1: value = guess_constants[value]
+            elif group == 2: value = int(value, 16)
+            elif group == 3: value = int(value, 8)
+            elif group == 4: value = int(value, 2)
+            elif group == 5: value = int(value)
+            else: value = float(value)
+            return (group, value)
+
         def convert(value):
             """
             Returns value with it's type converted. 
             Can convert from str to: int, float, True/False and None.
             """
-            value = str(value)
-            if value == "None": value = None
-            elif value == "True": value = True
-            elif value == "False": value = False
-            elif Engine.Converter.ishex(value): value = int(value, 16)
-            elif Engine.Converter.isoct(value): value = int(value, 8)
-            elif Engine.Converter.isbin(value): value = int(value, 2)
-            elif re.match(re.compile(guess_int_re), value): value = int(value)
-            elif re.match(re.compile(guess_float_re), value): value = float(value)
-            return value
+            return Engine.Converter.guess(str(value))[1]
+
+        @functools.lru_cache(maxsize=convert_cache_size)
+        def cached(value):
+            """
+            Returns given string converted by `convert()`. 
+            Results are kept in a least recently used cache of `convert_cache_size` strings; 
+            use `Engine.Converter.cached.cache_info()` to get its statistics.
+            """
+            return Engine.Converter.guess(value)[1]
+
+        def convert_many(values, column=False):
+            """
+            Returns list of given values with their types converted (see `convert()`). 
+
+            If `column` is passed as True one type is inferred for all values (eg. all values of a group) and 
+            every value is converted to it: values are converted only if all of them are integers, 
+            all of them are numbers (integers are then converted to floats) or all of them are the same constant type 
+            (True/False or None). 
+            Otherwise all values are returned as strings. 
+            The type is decided once, by the first value: the whole column is checked against it with a single pattern 
+            (`column_int_re`, `column_number_re`) and converted with one converter. 
+            Only if the check fails every value is guessed separately.
+            """
+            guess = Engine.Converter.guess
+            if not column: return [ guess(str(value))[1] for value in values ]
+            values = [ str(value) for value in values ]
+            if not values: return values
+            group = guess(values[0])[0]
+            if group == 0: return values
+            if group == 1:
+                if values[0] == "None" and values.count("None") == len(values): return [None] * len(values)
+                if values[0] != "None" and set(values) <= set(["True", "False"]): return [ value == "True" for value in values ]
+            elif group >= 5:
+                joined = "\n".join(values) + "\n"
+                try:
+                    if group == 5 and column_int_re.fullmatch(joined): return list(map(int, values))
+                    if column_number_re.fullmatch(joined): return list(map(float, values))
+                except ValueError: pass
+            guessed = [ guess(value) for value in values ]
+            kinds = set([ guess_kinds[group] if group != 1 else type(value) for group, value in guessed ])
+            if None in kinds or len(kinds) > 1 and kinds != set(["int", "float"]): return [ str(value) for value in values ]
+            if kinds == set(["int", "float"]): return [ float(value) for group, value in guessed ]
+            return [ value for group, value in guessed ]
+
+
+    class Tokenizer:
+        """
+        Class containig functionality for splitting source into tokens in a single pass.
+        """
+        def logicallines(file, path=""):
+            """
+            Yields tuples (line number, line) of logical lines found in given iterable of 
+            physical lines. 
+            Lines are yielded with trailing newline characters and preceding whitespace stripped and 
+            properties split into several lines are concatenated. 
+            Comments which end with backslash (`\\`) are left untouched but a warning is raised.
+            """
+            lines, lineno = (iter(file), 0)
+            for line in lines:
+                lineno += 1
+                start = lineno
+                line = line.lstrip().rstrip("\n")
+                if line != "" and line[-1] == "\\" and line[0] in ["#", "!"]: warnings.warn("comment ending with backslash: {0}:{1}".format(path, lineno))
+                while line != "" and line[-1] == "\\" and line[0] not in ["#", "!"]:
+                    line = line[:-1]
+                    try: line += next(lines).rstrip("\n")
+                    except StopIteration: break
+                    lineno += 1
+                yield (start, line)
+
+        def rawlines(buffer, path="", lineno=1):
+            """
+            Yields tuples (line number, offset, length, line) of logical lines found in given bytes-like buffer 
+            (e.g. `mmap.mmap` object). 
+            Lines are numbered from `lineno`. 
+            `offset` and `length` describe span of bytes (line endings included) taken by the logical line 
+            in the buffer and `line` holds its raw bytes with continuation lines concatenated. 
+            Boundaries of lines and trailing backslashes are found without decoding anything.
+            """
+            if buffer.find(b"\r") == -1:
+                # only '\n' line endings: lines can be cut by `readline()` of the buffer
+                if not hasattr(buffer, "readline"): buffer = io.BytesIO(buffer)
+                buffer.seek(0)
+                lines = iter(buffer.readline, b"")
+            else:
+                lines = Engine.Tokenizer._splitbuffer(buffer)
+            lineno, offset = (lineno-1, 0)
+            for line in lines:
+                lineno += 1
+                first, length = (lineno, len(line))
+                line = line.lstrip().rstrip(b"\r\n")
+                if line[-1:] == b"\\" and line[:1] in [b"#", b"!"]: warnings.warn("comment ending with backslash: {0}:{1}".format(path, lineno))
+                elif line[-1:] == b"\\":
+                    while line[-1:] == b"\\":
+                        line = line[:-1]
+                        following = next(lines, None)
+                        if following is None: break
+                        lineno += 1
+                        length += len(following)
+                        line += following.rstrip(b"\r\n")
+                yield (first, offset, length, line)
+                offset += length
+
+        def _splitbuffer(buffer):
+            """
+            Yields raw lines of given buffer. 
+            Lines may be ended with '\\r\\n', '\\r' or '\\n' and are yielded together with their line endings.
+            """
+            start = 0
+            for match in newline_re.finditer(buffer):
+                yield buffer[start:match.end()]
+                start = match.end()
+            if start < len(buffer): yield buffer[start:]
+
+        def mappedlines(buffer, path="", encoding=None):
+            """
+            Yields tuples (line number, line) of logical lines found in given bytes-like buffer 
+            (e.g. `mmap.mmap` object). 
+            Only complete logical lines are decoded. 
+            Encoding defaults to the one used by `open()`.
+            """
+            if encoding is None: encoding = locale.getpreferredencoding(False)
+            for lineno, offset, length, line in Engine.Tokenizer.rawlines(buffer, path): yield (lineno, line.decode(encoding))
+
+        def classify(line, strict=True):
+            """
+            Returns tuple (kind, line, key, value) describing given logical line. 
+            Kind is one of: 'blank', 'comment', 'hidden', 'property' or 'text'. 
+            Lines of hidden properties are returned uncovered (without leading '#' or '!'). 
+            Key and value are None for lines which do not carry a property.
+            """
+            kind, key, separator, value = Engine.LineParser.classify(line, strict)
+            if kind == "hidden": line = line[1:]
+            return (kind, line, key, value)
+
+        def tokenizelines(lines, strict=True):
+            """
+            Yields tokens found in given iterable of (line number, line) tuples of logical lines. 
+            Every token is a tuple: (kind, line number, line, key, value). 
+            See `classify()` for description of kinds.
+            """
+            for lineno, line in lines:
+                kind, line, key, value = Engine.Tokenizer.classify(line, strict)
+                yield (kind, lineno, line, key, value)
+
+        def tokenize(file, strict=True, path=""):
+            """
+            Yields tokens found in given iterable of physical lines. 
+            See `tokenizelines()` for description of tokens.
+            """
+            return Engine.Tokenizer.tokenizelines(Engine.Tokenizer.logicallines(file, path), strict)
 
 
     class LineParser:
         """
         Class containig functionality for lowest-level parsing of single lines.
         """
+        def classify(line, strict=True):
+            """
+            Returns tuple (kind, key, separator, value) describing given line. 
+            Kind is one of: 'blank', 'comment', 'hidden' (commented property), 'property' or 'text'. 
+            Key, separator and value are None for lines which do not carry a property. 
+            Line is matched against single precompiled pattern only once.
+            """
+            match = (line_strict_re if strict else line_nonstrict_re).match(line)
+            if match is not None:
+                return ("hidden" if match.group(1) else "property", match.group(2).strip(), match.group(3), match.group(4).lstrip())
+            line = line.lstrip()
+            if line == "": kind = "blank"
+            elif line[0] in ["#", "!"]: kind = "comment"
+            else: kind = "text"
+            return (kind, None, None, None)
+
         def linehaskey(line, strict=True):
             """
             Checks if the line contains a key. 
             """
-            result = False
-            if strict: match = re.match("^ *[a-zA-Z0-9-._]+ *[:=].*$", line)
-            else: match = re.match("^ *[a-zA-Z0-9-._ ]+ *[:=].*$", line)
-            if match != None: result = True
-            return result
+            return Engine.LineParser.classify(line, strict)[0] == "property"
 
         def iscomment(line):
             """
@@ -502,10 +1973,8 @@ class Engine:
             If in non-strict mode (strict passed as `False`) it will only complain and 
             do nothing else.
             """
-            if not Engine.LineParser.linehaskey(line=line, strict=strict): key = None
-            elif ":" in line[:line.find("=")]: key = line.split(":", 1)[0].strip()
-            else: key = line.split("=", 1)[0].strip()
-            return key
+            kind, key, separator, value = Engine.LineParser.classify(line, strict)
+            return key if kind == "property" else None
 
         def getlinevalue(line, strict=True):
             """
@@ -514,12 +1983,8 @@ class Engine:
             It is done this way to distinguish properties with empty value 
             from lines which do not carry a property.
             """
-            if not Engine.LineParser.linehaskey(line, strict): value = None
-            elif ":" in line[:line.find("=")]: value = line.split(":", 1)[1].lstrip()
-            else: value = line.split("=", 1)[1].lstrip()
-
-            if line != "" and line[-1] == "\n": line = line[:-1]   # striping newline while preserving newlines in value and trailing whitespace
-            return value
+            kind, key, separator, value = Engine.LineParser.classify(line, strict)
+            return value if kind == "property" else None
 
 
     def expandidentifier(identifier):
@@ -528,39 +1993,150 @@ class Engine:
         """
         return "^{0}$".format(identifier.replace(".", "\.").replace("*", wildcart_re))
 
+    def groupidentifier(key):
+        """
+        Returns identifier of the group given key belongs to: every segment of the key which 
+        is a decimal, hexadecimal or octal number is replaced with asterisk, 
+        eg. `customer.0x1f.name` -> `customer.*.name`.
+        """
+        match = grouper_re.match
+        return ".".join([ "*" if match(segment) else segment for segment in key.split(".") ])
+
+    @functools.lru_cache(maxsize=matcher_cache_size)
+    def matcher(identifier, no_expand=False):
+        """
+        Returns function which takes iterable of keys and returns list of these which match given identifier 
+        (pattern is expanded with `Engine.expandidentifier()` unless `no_expand` is passed as True). 
+        Matchers are kept in LRU cache (bounded to `matcher_cache_size` entries) so every identifier is compiled once. 
+        Plain keys and identifiers in which a single whole segment is a wildcard (`prefix.*.suffix`, `prefix.*`, `*.suffix`) 
+        are matched by comparing dotted segments directly, without regular expressions.
+        """
+        if not no_expand:
+            segments = identifier.split(".")
+            if segments.count("*") <= 1 and all([ segment == "*" or identifier_segment_re.match(segment) for segment in segments ]):
+                if "*" not in segments: return lambda keys: [ key for key in keys if key == identifier ]
+                n = segments.index("*")
+                head = "".join([ segment + "." for segment in segments[:n] ])
+                tail = "".join([ "." + segment for segment in segments[n+1:] ])
+                start, end, minimum = (len(head), len(tail), len(head) + len(tail) + 1)
+                return lambda keys: [ key for key in keys if key.startswith(head) and key.endswith(tail) and len(key) >= minimum 
+                                      and not key[start:len(key)-end].strip(wildcart_chars) ]
+            identifier = Engine.expandidentifier(identifier)
+        match = re.compile(identifier).match
+        return lambda keys: [ key for key in keys if match(key) ]
+
+    class Resolver:
+        """
+        Class containing functionality used for resolving $(reference) strings found in values. 
+        References between values form a graph which is resolved in topological order, so 
+        every value is rendered only once no matter how many values reference it.
+        """
+        reference_re = re.compile("\\$\\(([^)$]*)\\)")
+
+        def compile(value):
+            """
+            Returns template of given value: list in which literal segments are found at even 
+            and names of referenced keys at odd indices. 
+            Returns None if value is not a string or it does not contain any reference.
+            """
+            if type(value) is not str or "$(" not in value: return None
+            template = Engine.Resolver.reference_re.split(value)
+            return template if len(template) > 1 else None
+
+        def render(template, resolved):
+            """
+            Joins template replacing references with values found in `resolved` dictionary.
+            """
+            parts = template[:]
+            parts[1::2] = [ str(resolved[key]) for key in template[1::2] ]
+            return "".join(parts)
+
+        def resolve(properties, keys=None, resolved=None, templates=None, dependents=None):
+            """
+            Returns dictionary mapping given keys (every non-hidden key by default) and keys 
+            referenced by them to their resolved values. 
+            Keys are visited depth-first and each value is rendered after values it references, 
+            so the time is linear in the size of the reference graph. 
+            Values resolved before can be passed in `resolved` dictionary which is then filled 
+            and returned. 
+            Compiled templates are kept in `templates` dictionary if it is passed; when `dependents` 
+            dictionary is passed too every key whose template is compiled is added to the sets of 
+            dependents of keys it references (reverse edges of the graph). 
+            Raises ResolveError (subclass of KeyError) with the path of references when a reference 
+            cannot be resolved (key is not found or is hidden) or when references form a cycle.
+            """
+            values, hidden = properties.properties, properties.hidden
+            if resolved is None: resolved = {}
+            if keys is None: keys = [ key for key in values if key not in hidden ]
+            for root in keys:
+                if root in resolved: continue
+                stack, visiting, key = [], set(), root
+                while True:
+                    if key is not None:
+                        if key not in values or key in hidden:
+                            path = " -> ".join([ entry[0] for entry in stack ] + [key])
+                            raise ResolveError("unresolved reference: {0}: '{1}' is not available in {2}".format(path, key, properties))
+                        if templates is None: template = Engine.Resolver.compile(values[key])
+                        elif key in templates: template = templates[key]
+                        else:
+                            template = templates[key] = Engine.Resolver.compile(values[key])
+                            if template is not None and dependents is not None:
+                                for ref in template[1::2]: dependents.setdefault(ref, set()).add(key)
+                        if template is None: resolved[key] = values[key]
+                        else:
+                            stack.append([key, template, 1])
+                            visiting.add(key)
+                    if not stack: break
+                    entry, key = stack[-1], None
+                    while entry[2] < len(entry[1]):
+                        ref = entry[1][entry[2]]
+                        entry[2] += 2
+                        if ref in resolved: continue
+                        if ref in visiting:
+                            path = " -> ".join([ entry[0] for entry in stack ] + [ref])
+                            raise ResolveError("reference cycle: {0}".format(path))
+                        key = ref
+                        break
+                    if key is None:
+                        stack.pop()
+                        visiting.discard(entry[0])
+                        resolved[entry[0]] = Engine.Resolver.render(entry[1], resolved)
+            return resolved
+
+
     def parsevalue(properties, value):
         """
         This method searches for every $(reference) string in given value and 
-        replaces it with value of corresponding property. 
-        """
-        if type(value) == str:
-            while "$(" in value and ")" in value:
-                a = value.find("$(")
-                b = value[a:].find(")")
-                key = value[a+2: a+b]
-                if a == -1 or b == -1: break
-                value = value.replace("$({0})".format(key), str(properties.get(key)))
-        return value
+        replaces it with value of corresponding property (references are resolved recursively). 
+        Raises ResolveError (subclass of KeyError) when reference cannot be resolved or references form a cycle.
+        """
+        template = Engine.Resolver.compile(value)
+        if template is None: return value
+        return Engine.Resolver.render(template, Engine.Resolver.resolve(properties, template[1::2]))
 
     def parse(properties, cast=False):
         """
         Returns parsed properties which means every $(reference) in values 
         is resolved.
-        Raises KeyError when reference cannot be resolved.
+        Raises KeyError when reference cannot be resolved (ResolveError, also for cycles of references).
         If `cast` is passed as True then every value is run through `Engine.convert()`.
         """
+        properties._checkchanged()
         parsed = Properties()
         parsed.merge(properties)
-        for key in properties.keys(): parsed.set(key, parsed.get(key, parse=True))
-        if cast:
-            for key in properties.keys(): parsed.set(key, parsed.get(key, cast=True))
+        if properties.getschema() is not None: parsed.setschema(properties.getschema())
+        resolved = Engine.Resolver.resolve(properties, None, properties._resolved, properties._templates, properties._dependents)
+        for key in properties.keys():
+            value = resolved[key]
+            if cast and type(value) == str: value = parsed._castvalue(key, value)
+            parsed.set(key, value)
         return parsed
 
 class Properties():
     """
     This class provides methods for working with properties files. 
     """
-    def __init__(self, path="", cast=False, no_read=False, no_includes=False, strict=True):
+    def __init__(self, path="", cast=False, no_read=False, no_includes=False, strict=True, lazy=False):
         """
         If you give a path as an argument it will be loaded and processed as properties file. 
         If you call Properties() without an argument created object will be "blank" - in this case you will have to call 
@@ -570,16 +2146,46 @@ class Properties():
 
         To create a blank instance with path specified you can run:
             pyproperties.Properties("/home/user/some/path/foo.properties", no_read=True)
+
+        You can pass `lazy` as True to parse values only when they are accessed for the first time.
         """
         if type(path) == Reader:
             self.blank(path=path._path, strict=strict)
             self._feed(path)
         elif path.strip() and not no_read: 
-            self.read(path, cast, no_includes, strict)
+            self.read(path, cast, no_includes, strict, lazy)
         else: 
             self.blank(path, strict)
         self.save()
 
+    @property
+    def properties(self):
+        """
+        Dictionary of values of properties (`TrackedValues`, or `LazyValues` when read lazily). 
+        Plain dictionaries assigned to it are copied into `TrackedValues`. 
+        Modifying it directly is noticed by indexes and caches (see `invalidate()`).
+        """
+        return self._values
+
+    @properties.setter
+    def properties(self, values):
+        if not isinstance(values, (TrackedValues, LazyValues)): values = TrackedValues(values)
+        self._values = values
+
+    @property
+    def hidden(self):
+        """
+        Keys of hidden properties (`HiddenKeys`). 
+        Lists assigned to it are copied into `HiddenKeys`. 
+        Modifying it directly is noticed by indexes and caches (see `invalidate()`).
+        """
+        return self._hiddenkeys
+
+    @hidden.setter
+    def hidden(self, keys):
+        if not isinstance(keys, HiddenKeys): keys = HiddenKeys(keys)
+        self._hiddenkeys = keys
+
     def _notavailable(self, key):
         """
         Raises KeyError which will tell user that the property is not available eg. 
@@ -599,9 +2205,9 @@ class Properties():
         for line in props.origin_source:
             if line == "": lines.append(line)
             elif line[0] in ["#", "!"] or line.isspace(): lines.append(line)
-            elif Engine.LineParser.linehaskey(line, strict=self.strict) and not prefix: lines.append(line)
-            elif Engine.LineParser.linehaskey(line, strict=self.strict) and prefix: lines.append("{0}.{1}".format(prefix, line))
-            else: pass
+            elif Engine.LineParser.classify(line, self.strict)[0] != "property": pass
+            elif not prefix: lines.append(line)
+            else: lines.append("{0}.{1}".format(prefix, line))
         if self.source: self.source.append("")
         self.source.extend(lines)
         
@@ -610,11 +2216,21 @@ class Properties():
         Reads passed `Reader` object and tries to extract properties data out of it. 
         Designed to use with native `Reader` objects but will accept any properly crafted object.
         """
-        self.properties = reader._properties
-        self.hidden = reader._hidden
-        self.propcomments = reader._comments
-        self._includes = reader._included
-        self.source = reader._source
+        data = (reader._source, reader._properties, reader._comments, reader._hidden, reader._included, getattr(reader, "_files", []))
+        flags = (getattr(reader, "_includes", True), getattr(reader, "_cast", False), getattr(reader, "_lazy", False))
+        self._fill(data, flags, getattr(reader, "_schematable", None))
+
+    def _fill(self, data, flags, schematable=None):
+        """
+        Fills the object with data read by `Reader`: tuple (source, properties, comments, hidden, included, files). 
+        `flags` is a tuple (includes, cast, lazy) the data was read with; 
+        `schematable` is passed to `setschema()` when `cast` is a `Schema`.
+        """
+        source, self.properties, self.propcomments, hidden, self._includes, files = data
+        self.hidden, self.source, self._files = (HiddenKeys(hidden), source, list(files))
+        if isinstance(flags[1], Schema): self.setschema(flags[1], schematable)
+        self.invalidate()
+        self._readflags = tuple(flags)
 
     def setstrict(self, strict):
         """
@@ -637,27 +2253,209 @@ class Properties():
         self.source, self.origin_source = ([], [])
         self.properties, self.origin_properties = ({}, {})
         self.propcomments, self.origin_propcomments = ({}, {})
-        self.hidden, self.origin_hidden = ([], [])
+        self.hidden, self.origin_hidden = (HiddenKeys(), [])
         self._includes, self._origin_includes, self._includes_stored = ([], [], [])
+        self._files, self._readflags, self._reloadstate = ([], (True, False, False), None)
+        self._castcache, self._parsecache, self._cachehits, self._cachemisses = ({}, {}, 0, 0)
+        self._resolved, self._templates, self._dependents = ({}, {}, {})
+        self._trie, self._groupindex, self._valueindex, self._castindex = (None, None, None, None)
+        self._keyview, self._generation = (None, 0)
+        self._schema, self._schematable = (None, {})
+        self._sawchanges()
         self.unsaved = False
     
-    def read(self, path="", cast=False, no_includes=False, strict=True):
+    def read(self, path="", cast=False, no_includes=False, strict=True, lazy=False):
         """
         You can pass `cast` as True to tell pyproperties that it should guess the type of the property 
         and convert it accordingly.
+        If `lazy` is passed as True only an index of properties is built and 
+        values are parsed (and casted) when they are accessed for the first time.
         """
         self.blank(path=path, strict=strict)
-        reader = Reader(path=self.path, includes=not no_includes, cast=cast, strict=strict)
+        reader = Reader(path=self.path, includes=not no_includes, cast=cast, strict=strict, lazy=lazy)
         reader.read()
         self._feed(reader)
         
-    def reload(self):
+    @classmethod
+    async def aread(cls, path, cast=False, no_includes=False, strict=True, lazy=False):
+        """
+        Awaitable counterpart of `Properties(path)`: returns properties read from given path. 
+        File (and files it includes) is read and parsed in default executor so the event loop is not blocked. 
+        Parameters have the same meaning as in `read()`.
+        """
+        properties = cls(path, no_read=True, strict=strict)
+        reader = Reader(path=properties.path, includes=not no_includes, cast=cast, strict=strict, lazy=lazy)
+        await asyncio.get_running_loop().run_in_executor(None, reader.read)
+        properties._feed(reader)
+        properties.save()
+        return properties
+
+    def reload(self, incremental=False):
         """
         Reloads properties from `self.path`. Parser mode for reloading will be taken from `self.strict`.
+
+        If `incremental` is passed as True the main file and files it includes are checked and 
+        only those which changed since last incremental reload are parsed again. 
+        Only properties, comments and hidden flags which changed in files are applied to the object 
+        (other changes made in the object are kept) and a dictionary with sorted lists of 
+        `added`, `removed` and `modified` keys is returned. 
+        First incremental reload parses every file and compares them with the saved state of the object. 
+        When only included files changed their tokens are spliced into tokens kept from previous reload (see `_ReloadState`). 
+        Reading flags (`includes`, `cast` and `lazy`) are the ones properties were read with.
         """
+        if incremental: return self._reloadchanged()
         self.read(self.path, strict=self.strict)
         self.unsaved = True
 
+    def _filestamps(self):
+        """
+        Returns list of tuples (modification time, size) of files properties were read from. 
+        Files which cannot be accessed are represented by None.
+        """
+        stamps = []
+        for path in self._files:
+            try:
+                stat = os.stat(path)
+                stamps.append( (stat.st_mtime_ns, stat.st_size) )
+            except OSError:
+                stamps.append(None)
+        return stamps
+
+    def watch(self, interval=1.0, callback=None):
+        """
+        Starts watching files these properties were read from (see `Watcher`). 
+        Every `interval` seconds files are checked and if any of them changed (since `watch()` was called) 
+        properties are reloaded incrementally. 
+        If `callback` is given it is called with properties and the changeset returned by `reload()` 
+        every time something changed. 
+        One background thread serves all watched objects.
+        """
+        watcher.add(self, interval, callback)
+
+    def unwatch(self):
+        """
+        Stops watching files these properties were read from.
+        """
+        watcher.remove(self)
+
+    def _fileschanged(self):
+        """
+        Returns True if any of files properties were read from changed since they were parsed for incremental reload.
+        """
+        tokencache = self._reloadstate.tokencache
+        for path in self._files:
+            try: stat = os.stat(path)
+            except OSError: return True
+            if path not in tokencache or tokencache[path][0] != (stat.st_mtime_ns, stat.st_size): return True
+        return False
+
+    def _reloadchanged(self):
+        """
+        Performs incremental reload (see `reload()`). 
+        `_reloadstate` holds state of files (`_ReloadState`) as they were at last incremental reload. 
+        When only included files (without `__include__` directives of their own) changed, their tokens are 
+        spliced into the saved stream of tokens and only keys defined around them are compared (see `_splicechanged()`). 
+        Otherwise all files are read again (unchanged ones are taken from the token cache) and all keys are compared.
+        """
+        changes = {"added": [], "removed": [], "modified": []}
+        self._checkchanged()
+        describe, changed = (_ReloadState.describe, _ReloadState.changed)
+        state = self._reloadstate
+        if state is not None and not self._fileschanged(): return changes
+        spliced = None if state is None else self._splicechanged(state)
+        if spliced is not None:
+            new, touched = spliced
+            for key, old in touched.items():
+                if key not in new.properties:
+                    if old is not None: changes["removed"].append(key)
+                elif old is None: changes["added"].append(key)
+                elif changed(old, describe(new.properties, new.comments, new.hidden, key), new.properties, key): changes["modified"].append(key)
+            refreshed = [ key for key in touched if key in new.properties ]
+        else:
+            if state is None: tokencache, old = ({}, (self.origin_properties, self.origin_propcomments, set(self.origin_hidden)))
+            else: tokencache, old = (state.tokencache, (state.properties, state.comments, state.hidden))
+            includes, cast, lazy = self._readflags
+            reader = Reader(path=self.path, includes=includes, cast=cast, strict=self.strict, lazy=lazy)
+            reader._tokencache, reader._stream = (dict(tokencache), [])   # cache is kept only when reading succeeds
+            reader.read()
+            for path in [ path for path in reader._tokencache if path not in reader._files ]: del reader._tokencache[path]
+            new = _ReloadState(reader._tokencache, reader)
+            oldprops, oldcomments, oldhidden = old
+            lazy = isinstance(oldprops, LazyValues) or isinstance(new.properties, LazyValues)
+            for key in new.properties:
+                if key not in oldprops: changes["added"].append(key)
+                elif not lazy:
+                    if oldprops[key] != new.properties[key] or oldcomments.get(key) != new.comments.get(key) or (key in oldhidden) != (key in new.hidden):
+                        changes["modified"].append(key)
+                elif changed(describe(oldprops, oldcomments, oldhidden, key), describe(new.properties, new.comments, new.hidden, key), new.properties, key):
+                    changes["modified"].append(key)
+            for key in oldprops:
+                if key not in new.properties: changes["removed"].append(key)
+            refreshed = new.properties
+        self._reloadstate = new
+
+        # changes are applied to copies which are then swapped in, so other threads never see half-applied reload
+        newprops, newcomments, newhidden = (new.properties, new.comments, new.hidden)
+        properties, comments, hidden = (self.properties.copy(), dict(self.propcomments), HiddenKeys(self.hidden))
+        lazy = isinstance(properties, LazyValues) and isinstance(newprops, LazyValues)
+        for key in changes["removed"]:
+            if key in properties: del properties[key]
+            if key in comments: del comments[key]
+            if key in hidden: hidden.remove(key)
+        for key in changes["added"] + changes["modified"]:
+            span = newprops.span(key) if lazy else None
+            if span is not None: properties.index(key, span)
+            else: properties[key] = newprops[key]
+            if key in newcomments: comments[key] = newcomments[key]
+            elif key in comments: del comments[key]
+            if key in newhidden and key not in hidden: hidden.append(key)
+            if key not in newhidden and key in hidden: hidden.remove(key)
+        if lazy:
+            # positions of values which are not parsed yet may have moved, files may have been replaced
+            properties.close()
+            for key in refreshed:
+                span = newprops.span(key)
+                if span is not None and key in properties and not properties.isloaded(key): properties.index(key, span)
+        self.properties, self.propcomments, self.hidden = (properties, comments, hidden)
+        self.source = new.source
+        if spliced is None: self._includes, self._files = (reader._included, reader._files)
+        self._dropindexes()
+        for kind in changes:
+            for key in changes[kind]: self._invalidate(key)
+        self._sawchanges()
+        for kind in changes: changes[kind].sort()
+        if any(changes.values()): self.unsaved = True
+        return changes
+
+    def _splicechanged(self, state):
+        """
+        Returns tuple (new state, touched keys) of incremental reload which splices tokens of changed files 
+        into copy of given state (see `_ReloadState.splice()`) or None if it cannot be done: 
+        main file changed or is missing, a changed file has or had `__include__` directives or 
+        its keys are defined in other files too. 
+        Touched keys are mapped to their descriptions from given state (None for keys which were not defined).
+        """
+        includes, cast, lazy = self._readflags
+        main, changed = (os.path.realpath(self.path), [])
+        for path in self._files:
+            try: stat = os.stat(path)
+            except OSError: return None
+            cached = state.tokencache.get(path)
+            if cached is None: return None
+            if cached[0] != (stat.st_mtime_ns, stat.st_size): changed.append(path)
+        if main in changed: return None
+        new, touched = (state.copy(), {})
+        reader = Reader(path=self.path, includes=includes, cast=cast, strict=self.strict, lazy=lazy)
+        reader._tokencache = new.tokencache
+        for path in changed:
+            tokens = reader._cachedtokens(path)
+            directives = [ token for token in state.tokencache[path][1] + tokens if token[0] == "property" and reader._getdirective(token[3]) is not None ]
+            entries = [ entry for entry in new.ranges if entry[0] == path ]
+            if directives or not entries: return None
+            for entry in entries:
+                if not new.splice(entry, [ Reader._prefixed(token, entry[1], entry[2]) for token in tokens ], touched, cast): return None
+        return (new, touched)
+
     def refresh(self, overwrite=True):
         """
         Refreshes from file. Missing values are added.
@@ -720,6 +2518,7 @@ class Properties():
         for key in props.origin_hidden:
             if prefix: key = "{0}.{1}".format(prefix, key)
             if key not in self.hidden and key in completed: self.hide(key)
+        self._invalidate()
         self.unsaved = True
 
     def update(self, props, prefix=""):
@@ -751,6 +2550,7 @@ class Properties():
         for key in props.origin_hidden:
             if prefix: key = "{0}.{1}".format(prefix, key)
             if key in updated: self.hide(key)
+        self._invalidate()
         self.unsaved = True
 
     def merge(self, properties):
@@ -763,6 +2563,7 @@ class Properties():
         self.complete(properties)
         self.update(properties)
         self._appendsrc(properties)
+        self._invalidate()
         self.unsaved = True
 
     def parse(self, cast=False):
@@ -771,13 +2572,19 @@ class Properties():
         """
         return Engine.parse(self, cast=cast)
 
+    def resolved(self, cast=False):
+        """
+        Returns read-only `ResolvedView` of these properties. 
+        Unlike `parse()` it does not copy anything: values are resolved (and casted if `cast` is 
+        passed as True) when they are accessed. 
+        """
+        return ResolvedView(self, cast=cast)
+
     def save(self):
         """
         Saves changes made in object's variables.
         """
-        saved = {}
-        for key, value in self.properties.items(): saved[key] = value
-        self.origin_properties = saved
+        self.origin_properties = self.properties.copy()
         saved = {}
         for key, value in self.propcomments.items(): saved[key] = value
         self.origin_propcomments = saved
@@ -791,15 +2598,14 @@ class Properties():
         Drops changes made in properties object by reverting it's variables
         to the state in which they were during last save().
         """
-        reverted = {}
-        for key, value in self.origin_properties.items(): reverted[key] = value
-        self.properties = reverted
+        self.properties = self.origin_properties.copy()
         reverted = {}
         for key, value in self.origin_propcomments.items(): reverted[key] = value
         self.propcomments = reverted
         self.source = [ line for line in self.origin_source ]
-        self.hidden = [ key for key in self.origin_hidden ]
+        self.hidden = HiddenKeys(self.origin_hidden)
         self._includes = [ key for key in self._origin_includes ]
+        self.invalidate()
         self.unsaved = False
 
     def store(self, path="", force=False, no_dump=False, drop_source=False):
@@ -816,6 +2622,69 @@ class Properties():
         """
         writer = Writer(self)
         writer.store(path, force, no_dump, drop_source)
+
+    async def astore(self, path="", force=False, drop_source=False):
+        """
+        Awaitable version of `store()`: file is written without blocking the event loop.
+        """
+        writer = Writer(self)
+        await writer.astore(path, force, drop_source)
+
+    def dump_snapshot(self, path):
+        """
+        Writes binary snapshot of properties, comments, hidden keys, includes and source to given path. 
+        Snapshot remembers modification times, sizes and digests of files properties were read from 
+        so `load_snapshot()` can tell if it is stale.
+        """
+        data = {
+                "path": self.path,
+                "strict": self.strict,
+                "readflags": self._readflags[:2],
+                "files": Snapshot.stamps(self._files),
+                "properties": dict(self.properties),
+                "comments": dict(self.propcomments),
+                "hidden": list(self.hidden),
+                "includes": list(self._includes),
+                "source": list(self.source),
+                }
+        Snapshot.dump(path, data)
+
+    @classmethod
+    def load_snapshot(cls, path, source="", cast=False, no_includes=False, strict=True, refresh=True):
+        """
+        Returns properties loaded from snapshot written by `dump_snapshot()`. 
+        If any of files the snapshot was made of has changed properties are read from the text file again 
+        (with the same parameters) and, if `refresh` is True, snapshot is rewritten. 
+
+        If `source` is given it is read (using `cast`, `no_includes` and `strict`) when snapshot cannot be loaded 
+        (eg. it does not exist yet) or was made of different file or with different parameters. 
+        Otherwise ReadError is raised when snapshot cannot be loaded.
+        """
+        try: data = Snapshot.load(path)
+        except ReadError:
+            if not source: raise
+            data = None
+        if data is not None and not source:
+            source, strict = (data["path"], data["strict"])
+            no_includes, cast = (not data["readflags"][0], data["readflags"][1])
+        stale = data is None or not Snapshot.isfresh(data["files"])
+        if not stale:
+            samefile = os.path.realpath(os.path.expanduser(source)) == os.path.realpath(data["path"])
+            stale = not samefile or (data["strict"], data["readflags"]) != (strict, (not no_includes, cast))
+        if stale:
+            properties = cls(source, cast=cast, no_includes=no_includes, strict=strict)
+            if refresh:
+                try: properties.dump_snapshot(path)
+                except OSError: pass
+            return properties
+        properties = cls(data["path"], no_read=True, strict=data["strict"])
+        properties.properties, properties.propcomments = (data["properties"], data["comments"])
+        properties.hidden, properties._includes, properties.source = (HiddenKeys(data["hidden"]), data["includes"], data["source"])
+        properties._files = [ stamp[0] for stamp in data["files"] ]
+        properties._readflags = tuple(data["readflags"]) + (False,)
+        properties.invalidate()
+        properties.save()
+        return properties
         
     def get(self, key, parse=False, cast=False):
         """
@@ -824,12 +2693,139 @@ class Properties():
         KeyError is raised if key is not available (not found or is hidden).
         """
         if key not in self.properties or key in self.hidden: self._notavailable(key)
-        
+        if not parse and not cast: return self.properties[key]
+
+        self._checkchanged()
+        if parse: cache = self._parsecache if cast else self._resolved
+        else: cache = self._castcache
+        if key in cache:
+            self._cachehits += 1
+            return cache[key]
+        self._cachemisses += 1
         value = self.properties[key]
-        if parse: value = Engine.parsevalue(self, value)
-        if cast and type(value) == str: value = Engine.Converter.convert(value)
+        if parse: value = Engine.Resolver.resolve(self, [key], self._resolved, self._templates, self._dependents)[key]
+        if cast and type(value) == str: value = self._castvalue(key, value)
+        cache[key] = value
         return value
 
+    def get_many(self, keys, parse=False, cast=False):
+        """
+        Returns dictionary mapping given keys to their values (the same as returned by `get()`). 
+        KeyError is raised before anything is parsed if any of keys is not available. 
+        Keys which were not parsed yet are resolved together.
+        """
+        keys = list(keys)
+        for key in keys:
+            if key not in self.properties or key in self.hidden: self._notavailable(key)
+        if not parse and not cast: return dict([ (key, self.properties[key]) for key in keys ])
+
+        self._checkchanged()
+        if parse: cache = self._parsecache if cast else self._resolved
+        else: cache = self._castcache
+        missing = list(dict.fromkeys([ key for key in keys if key not in cache ]))
+        self._cachehits += len(keys) - len(missing)
+        self._cachemisses += len(missing)
+        if parse and missing: resolved = Engine.Resolver.resolve(self, missing, self._resolved, self._templates, self._dependents)
+        for key in missing:
+            value = resolved[key] if parse else self.properties[key]
+            if cast and type(value) == str: value = self._castvalue(key, value)
+            cache[key] = value
+        return dict([ (key, cache[key]) for key in keys ])
+
+    def _castvalue(self, key, value):
+        """
+        Converts value of given key according to schema set with `setschema()` or 
+        guesses its type if no schema was set or the key is not described by it.
+        """
+        if self._schema is not None: return self._schema.cast(key, value, self._schematable, guess=True)
+        return Engine.Converter.cached(value)
+
+    def setschema(self, schema, table=None):
+        """
+        Sets `Schema` used to convert values returned by `get()` and `gets()` with `cast` passed as True. 
+        Schema is compiled to a table mapping keys to converters once (`table` can be passed if it was already compiled); 
+        keys set later are added to it when they are converted for the first time. 
+        Keys not described by the schema have their types guessed. 
+        Pass None to remove schema.
+        """
+        self._schema = schema
+        self._schematable = {} if schema is None else (table if table is not None else schema.compile(self.properties))
+        self._castindex = None
+        self._invalidate()
+
+    def getschema(self):
+        """
+        Returns `Schema` set with `setschema()` or None.
+        """
+        return self._schema
+
+    def castall(self):
+        """
+        Returns dictionary of all non-hidden properties with values converted according to schema 
+        set with `setschema()` in a single pass (values of keys not described by the schema have their types guessed). 
+        """
+        hidden = self.hidden
+        values = dict([ (key, value) for key, value in self.properties.items() if key not in hidden ])
+        if self._schema is None: return dict(zip(values.keys(), Engine.Converter.convert_many(values.values())))
+        for key in values:
+            if key not in self._schematable: self._schematable[key] = self._schema.converter(key)
+        return self._schema.convert(values, self._schematable, guess=True)
+
+    def _invalidate(self, key=None):
+        """
+        Drops cached casted and parsed values (see `get()`). 
+        If key is given only values of this key and parsed values of keys which 
+        reference it are dropped (also compiled template of the key) and list of keys 
+        which were resolved before is returned. 
+        """
+        if key is None:
+            for cache in (self._castcache, self._parsecache, self._resolved, self._templates, self._dependents): cache.clear()
+            return []
+        self._castcache.pop(key, None)
+        template = self._templates.pop(key, None)
+        if template is not None:
+            for ref in template[1::2]:
+                if ref in self._dependents: self._dependents[ref].discard(key)
+        return self._unresolve(key)
+
+    def _unresolve(self, key):
+        """
+        Drops parsed values of given key and of every key which references it directly or 
+        through other keys. Returns list of keys whose resolved values were dropped. 
+        Keys which are not resolved are not followed: a value is resolved only 
+        after every value it references was resolved.
+        """
+        dropped, stack = [], [key]
+        while stack:
+            key = stack.pop()
+            self._parsecache.pop(key, None)
+            if key not in self._resolved: continue
+            del self._resolved[key]
+            dropped.append(key)
+            stack.extend(self._dependents.get(key, ()))
+        return dropped
+
+    def _rerender(self, keys):
+        """
+        Resolves again given keys (usually the ones returned by `_invalidate()`) so 
+        parsing them with `get()` is a lookup. 
+        Keys which cannot be resolved any more are left to be reported by `get()`.
+        """
+        for key in keys:
+            if key in self._resolved or key not in self.properties or key in self.hidden: continue
+            try: Engine.Resolver.resolve(self, [key], self._resolved, self._templates, self._dependents)
+            except ResolveError: pass
+
+    def cachestats(self):
+        """
+        Returns dictionary with number of hits and misses and number of entries of the cache of 
+        casted and parsed values of these properties and statistics of the cache of converted strings 
+        shared by all properties (see `Engine.Converter.cached()`).
+        """
+        info = Engine.Converter.cached.cache_info()
+        return {"hits": self._cachehits, "misses": self._cachemisses, "entries": len(self._castcache) + len(self._parsecache) + len(self._resolved), 
+                "converter": {"hits": info.hits, "misses": info.misses, "entries": info.currsize, "size": info.maxsize}}
+
     def gets(self, identifier, parse=False, cast=False, no_expand=False):
         """
         Returns list of tuples containig (key, value) of properties which names matched pattern given as identifier.
@@ -837,25 +2833,190 @@ class Properties():
         If `cast` is set to True values will be casted before returning.
         """
         if type(identifier) is not str: raise TypeError("key must be 'str' but was '{0}'".format(str(type(identifier))[8:-2]))
-        if not no_expand: identifier = Engine.expandidentifier(identifier)
-        
-        matched = []
-        for key in self.keys():
-            if re.match(identifier, key): matched.append( (key, self.get(key, parse=parse, cast=cast)) )
-        return matched
+        return [ (key, self.get(key, parse=parse, cast=cast)) for key in self._matchkeys(identifier, no_expand=no_expand) ]
+
+    def _matchkeys(self, identifier, hidden=False, no_expand=False):
+        """
+        Returns sorted list of keys which match pattern given as identifier. 
+        Keys are looked up in the index of dotted keys (see `KeyTrie`) when the identifier allows it, 
+        otherwise every key is tested with `Engine.matcher()`. 
+        Values are not touched so properties read lazily are not parsed.
+        """
+        keys = None if no_expand else self._keytrie().match(identifier)
+        if keys is None: return Engine.matcher(identifier, no_expand)(self._sortedkeys(hidden))
+        if not hidden and self.hidden:
+            keys = [ key for key in keys if key not in self.hidden ]
+        return sorted(keys)
+
+    def _keytrie(self):
+        """
+        Returns index of dotted keys (`KeyTrie`). 
+        It is kept up to date by methods of `Properties` and built again when it was dropped (see `invalidate()`).
+        """
+        self._checkchanged()
+        if self._trie is None: self._trie = KeyTrie(self.properties)
+        return self._trie
+
+    def _groups(self):
+        """
+        Returns list of identifiers of groups (see `getgroups()`) ordered by their first non-hidden member. 
+        Candidates are read from the index of groups (see `GroupIndex`) which is kept up to date by methods of `Properties` 
+        and built again when it was dropped (see `invalidate()`). 
+        Identifier with two or more non-hidden members in the index is a group; identifier with a single one is a group 
+        only if it matches some other non-hidden key too (eg. `'customer.*.name'` matches `'customer.vip.name'`).
+        """
+        self._checkchanged()
+        if self._groupindex is None: self._groupindex = GroupIndex(self.properties)
+        groups = []
+        for identifier, members in self._groupindex.groups(self.hidden, minimum=1).items():
+            if len(members) > 1 or ("*" in identifier and len(self._matchkeys(identifier)) > 1): groups.append(identifier)
+        return groups
+
+    def invalidate(self):
+        """
+        Drops indexes of keys, groups and values, sorted lists of keys and cached parsed and casted values 
+        (they are built again when needed). 
+        Changes made directly to `properties` and `hidden` are noticed without calling it; 
+        it is needed only when a value was modified in place (eg. a list kept as value was appended to).
+        """
+        self._dropindexes()
+        self._invalidate()
+        self._sawchanges()
+
+    def _checkchanged(self):
+        """
+        Calls `invalidate()` if `properties` or `hidden` were modified (or replaced) since 
+        methods of `Properties` saw them last time (see `_sawchanges()`).
+        """
+        if (self._values.version, self._hiddenkeys.version) != self._seen: self.invalidate()
+
+    def _sawchanges(self):
+        """
+        Remembers versions of `properties` and `hidden`. 
+        Methods modifying them call `_checkchanged()` first and this method when indexes were updated.
+        """
+        self._seen = (self._values.version, self._hiddenkeys.version)
+
+    def _dropindexes(self):
+        """
+        Drops indexes of keys, groups and values and sorted lists of keys (they are built again when needed).
+        """
+        self._trie, self._groupindex, self._valueindex, self._castindex = (None, None, None, None)
+        self._keyview = None
+        self._generation += 1
+
+    def _indexvalue(self, key, value):
+        """
+        Updates value of given key in reverse indexes of values.
+        """
+        if self._valueindex is not None: self._valueindex.add(key, value, key in self.hidden)
+        if self._castindex is not None: self._castindex.add(key, self._indexedcast(key, value), key in self.hidden)
+
+    def _indexedcast(self, key, value):
+        """
+        Returns casted value of given key for the reverse index (values which cannot be converted according 
+        to schema are indexed as they are).
+        """
+        if type(value) is not str: return value
+        try: return self._castvalue(key, value)
+        except ValueError: return value
+
+    def _indexhidden(self, key, hidden):
+        """
+        Moves key between hidden and non-hidden buckets of reverse indexes of values.
+        """
+        for index in (self._valueindex, self._castindex):
+            if index is not None: index.sethidden(key, hidden)
+        self._keyschanged(key)
+
+    def _index(self, key):
+        """
+        Adds new key to indexes and sorted lists of keys and to index of groups.
+        """
+        if self._trie is not None: self._trie.add(key)
+        if self._groupindex is not None: self._groupindex.add(key)
+        self._keyschanged(key)
+
+    def _unindex(self, key):
+        """
+        Removes key from indexes of keys, groups and values and from sorted lists of keys.
+        """
+        for index in (self._trie, self._groupindex, self._valueindex, self._castindex):
+            if index is not None: index.discard(key)
+        self._keyschanged(key)
+
+    def _keyschanged(self, key):
+        """
+        Increments generation of keys and updates sorted lists of keys after given key was 
+        added, removed, hidden or unhidden. 
+        Must be called after `properties` and `hidden` were modified.
+        """
+        view, self._generation = (self._keyview, self._generation + 1)
+        if view is None: return
+        if view.stamp != self._generation - 1: 
+            self._keyview = None
+            return
+        view.update(key, key in self.properties, key not in self.hidden)
+        view.stamp = self._generation
+
+    def _sortedkeys(self, hidden=False):
+        """
+        Returns sorted list of non-hidden keys (or of every key if `hidden` is passed as True) 
+        which must not be modified. 
+        Lists are reused as long as generation of keys they were made for is current 
+        (it is incremented by every change made by methods of `Properties` and by `invalidate()`).
+        """
+        self._checkchanged()
+        if self._keyview is None or self._keyview.stamp != self._generation: 
+            self._keyview = SortedKeys(self.properties, self.hidden, self._generation)
+        return self._keyview.all if hidden else self._keyview.visible
 
     def set(self, key, value=""):
         """
         Sets key to value. 
         Raises TypeError if key is not if `str` type.
         """
+        self._checkkey(key)
+        self._rerender(self._setone(key, value))
+        self.unsaved = True
+
+    def set_many(self, mapping):
+        """
+        Sets many keys at once: `mapping` is a dictionary (or an iterable of (key, value) pairs). 
+        Every key is checked before anything is set (TypeError is raised the same as by `set()`). 
+        Keys referencing changed keys are rendered again once, after every value was set.
+        """
+        items = list(mapping.items()) if hasattr(mapping, "items") else list(mapping)
+        for key, value in items: self._checkkey(key)
+        if len(items) > bulk_size: self._keyview = None   # sorting keys once is cheaper than many insertions
+        dropped = []
+        for key, value in items: dropped.extend(self._setone(key, value))
+        self._rerender(dropped)
+        if items: self.unsaved = True
+
+    def _checkkey(self, key):
+        """
+        Raises TypeError if key is not of `str` type or contains space.
+        """
         if type(key) is not str: raise TypeError("key must be 'str' but was '{0}'".format(str(type(key))[8:-2]))
         if " " in key: raise TypeError("key must not contain space")
+
+    def _setone(self, key, value):
+        """
+        Sets key to value and updates indexes. 
+        Returns list of keys whose resolved values were dropped (see `_invalidate()`).
+        """
+        self._checkchanged()
+        added = key not in self.properties
         self.properties[key] = value
+        if added: self._index(key)
+        self._indexvalue(key, value)
+        dropped = self._invalidate(key)
+        self._sawchanges()
         if key in self.hidden:
             self.unhide(key)
             self.rmcomment(key)
-        self.unsaved = True
+        return dropped
 
     def sets(self, identifier, *values, **kwargs):
         """
@@ -870,15 +3031,11 @@ class Properties():
         """
         if kwargs: warnings.warn("**kwargs will be removed in version 0.3.1: refactor your code: use set() with names already converted to string", DeprecationWarning)
 
-        keys = []
         _kwargs = {}
         for key, value in kwargs.items(): _kwargs[key.replace("_DOT_", ".")] = value
         kwargs = _kwargs
         
-        identifier = re.compile(Engine.expandidentifier(identifier))
-        for key in self.keys():
-            if re.match(identifier, key): keys.append(key)
-        keys.sort()
+        keys = self._matchkeys(identifier)
         i = 0
         for key in keys:
             try: value = values[i]
@@ -913,21 +3070,37 @@ class Properties():
         This method removes specified property from interal dictionary. 
         Removed property will be not saved using store(). 
         """
+        self._removeone(key)
+        self.unsaved = True
+
+    def remove_many(self, keys):
+        """
+        Removes many properties at once. 
+        Keys which are not found are ignored, the same as by `remove()`.
+        """
+        keys = list(keys)
+        if len(keys) > bulk_size: self._keyview = None   # sorting keys once is cheaper than many deletions
+        for key in keys: self._removeone(key)
+        if keys: self.unsaved = True
+
+    def _removeone(self, key):
+        """
+        Removes property of given key, its comment and hidden flag and updates indexes.
+        """
+        self._checkchanged()
         if key in self.properties: self.properties.pop(key)
         if key in self.propcomments: self.propcomments.pop(key)
         if key in self.hidden: self.hidden.remove(key)
-        self.unsaved = True
+        self._unindex(key)
+        self._invalidate(key)
+        self._sawchanges()
 
     def removes(self, identifier):
         """
         This method removes properties matching given pattern from interal dictionary. 
         Removed properties will be not saved using store().
         """
-        to_remove = []
-        identifier = re.compile(Engine.expandidentifier(identifier))
-        for key in self.properties.keys():
-            if re.match(identifier, key): to_remove.append(key)
-        for key in to_remove: self.remove(key)
+        self.remove_many(self._matchkeys(identifier, hidden=True))
 
     def pop(self, key, cast=False):
         """
@@ -936,8 +3109,12 @@ class Properties():
         """
         if key not in self.properties or key in self.hidden: self._notavailable(key)
 
+        self._checkchanged()
         prop = self.properties.pop(key)
-        if cast: prop = convert(prop)
+        self._unindex(key)
+        self._invalidate(key)
+        self._sawchanges()
+        if cast and type(prop) == str: prop = self._castvalue(key, prop)
         self.unsaved = True
         return prop
 
@@ -956,11 +3133,7 @@ class Properties():
         If `hidden` is passed as `True` returns sorted list 
         of including names of hidden properties.
         """
-        keys = []
-        for key in list(self.properties.keys()):
-            if key not in self.hidden: keys.append(key)
-            elif key in self.hidden and hidden == True: keys.append(key)
-        return sorted(keys)
+        return list(self._sortedkeys(hidden == True))
 
     def values(self, hidden=False):
         """
@@ -977,18 +3150,34 @@ class Properties():
                 self.hide(key)
         return values
 
-    def getkeysof(self, value, no_hidden=True):
+    def getkeysof(self, value, no_hidden=True, cast=False):
         """
         Returns list of keys containing given value. 
         Returns empty list if no key was matched. 
-        If `no_hidden` was passed as `False` includes also 
-        commented properties.
+        If `no_hidden` was passed as `False` only 
+        commented properties are matched.
+        If `cast` is passed as True values are compared after conversion (as returned by `get()` with `cast`), 
+        eg. `getkeysof(8080, cast=True)`.
+
+        Keys are looked up in reverse index of values (`ValueIndex`) which is built by the first call 
+        and then updated when properties are set, removed, hidden or unhidden.
+        """
+        return self._valueindexof(cast).keysof(value, hidden=not no_hidden)
+
+    def _valueindexof(self, cast=False):
         """
-        keys = []
-        for propkey, propvalue in self.properties.items():
-            if value == propvalue and propkey not in self.hidden and no_hidden: keys.append(propkey)
-            elif value == propvalue and propkey in self.hidden and not no_hidden: keys.append(propkey)
-        return keys
+        Returns reverse index of values (or of casted values if `cast` is passed as True). 
+        Index is kept up to date by methods of `Properties` and built again when it was dropped (see `invalidate()`).
+        """
+        self._checkchanged()
+        index = self._castindex if cast else self._valueindex
+        if index is None:
+            items = self.properties.items()
+            if cast: items = [ (key, self._indexedcast(key, value)) for key, value in items ]
+            index = ValueIndex(items, self.hidden)
+            if cast: self._castindex = index
+            else: self._valueindex = index
+        return index
 
     def getgroups(self):
         """
@@ -1011,29 +3200,20 @@ class Properties():
         will not form a group although `gets('person.*')` will return 
         list of length greater than two.
 
-        This is because only digits are considered 'groupers'.
+        This is because only digits are considered 'groupers' (see `Engine.groupidentifier()`). 
+        Groups are read from index updated when properties are set or removed.
         """
-        names = [ key.split(".") for key in self.keys() ]
-        groups = []
-        for key in names:
-            identifier = ""
-            for word in key:
-                if Engine.Converter.ishex(word) or Engine.Converter.isoct(word) or re.match(re.compile(guess_int_re), word):
-                    word = "*"
-                identifier = "{}.{}".format(identifier, word)
-            identifier = identifier[1:]
-            if identifier not in groups and len(self.gets(identifier)) > 1: groups.append(identifier)
-        return groups
+        return self._groups()
 
     def getsingles(self):
         """
         Returns list of properties which do not belong to any group.
         """
-        groups = self.getgroups()
+        groups = set(self._groups())
+        inner, end = (re.compile("\\.[0-9]+\\."), re.compile("\\.[0-9]+$"))
         singles = []
-        for key in self.keys():
-            key = re.sub(re.compile("\.[0-9]+\."), ".*.", key)
-            key = re.sub(re.compile("\.[0-9]+$"), ".*", key)
+        for key in self._sortedkeys():
+            key = end.sub(".*", inner.sub(".*.", key))
             if key not in groups: singles.append(key)
         return singles
 
@@ -1099,33 +3279,36 @@ class Properties():
         KeyError is raised if key is not available (not found or is hidden).
         """
         if key not in self.properties or key in self.hidden: self._notavailable(key)
+        self._checkchanged()
         if key not in self.hidden: self.hidden.append(key)
+        self._indexhidden(key, True)
+        self._unresolve(key)
+        self._sawchanges()
         self.unsaved = True
         
     def hides(self, identifier):
         """
         Hides every property which key will match given identifier. 
         """
-        identifier = Engine.expandidentifier(identifier)
-        for key in self.keys():
-            if re.match(identifier, key): self.hide(key)
+        for key in self._matchkeys(identifier): self.hide(key)
 
     def unhide(self, key):
         """
         Remove property from `hidden` list to make it available for modifing. 
         Does not raise any errors when key is not found.
         """
+        self._checkchanged()
         if key in self.hidden: self.hidden.remove(key)
+        self._indexhidden(key, False)
+        self._unresolve(key)
+        self._sawchanges()
         self.unsaved = True
 
     def unhides(self, identifier):
         """
         Unhides every property which key will match given identifier.
         """
-        identifier = Engine.expandidentifier(identifier)
-        to_unhide = []
-        for i in range(len(self.hidden)):
-            if re.match(identifier, self.hidden[i]): to_unhide.append(self.hidden[i])
+        to_unhide = Engine.matcher(identifier)(self.hidden)
         for key in to_unhide: self.unhide(key)
 
     def addinclude(self, path, prefix="", hidden=False):
@@ -1181,3 +3364,66 @@ class Properties():
         Returns list of tuples containg information about `includes` of this properties.
         """
         return self._includes
+
+
+def _loadone(task):
+    """
+    Reads single file for `load_many()`. 
+    Returns tuple (data, schematable, error) where data is a tuple (source, properties, comments, hidden, included, files) 
+    filled by `Reader.read()` (see `Properties._fill()`) or None if reading failed with `error`.
+    """
+    path, includes, cast, strict = task
+    reader = Reader(path, includes=includes, cast=cast, strict=strict)
+    try: reader.read()
+    except Exception as e: return (None, None, e)
+    data = (reader._source, reader._properties, reader._comments, reader._hidden, reader._included, reader._files)
+    return (data, getattr(reader, "_schematable", None), None)
+
+def load_many(paths, workers=None, executor="process", cast=False, no_includes=False, strict=True):
+    """
+    Reads many files in a pool of `workers` (defaults to number of CPUs) 
+    processes (`executor="process"`) or threads (`executor="thread"`). 
+    `cast`, `no_includes` and `strict` have the same meaning as in `Properties()`.
+
+    Returns tuple (properties, errors) where `properties` is a list of `Properties` objects in order of `paths` and 
+    `errors` is a list of tuples (path, exception) of files which could not be read. 
+    Files which raised an exception (eg. ReadError, IncludeError or ValueError of values not matching schema) 
+    are represented by None in `properties` and do not abort reading of other files.
+    """
+    paths = list(paths)
+    if executor == "process": factory = concurrent.futures.ProcessPoolExecutor
+    elif executor == "thread": factory = concurrent.futures.ThreadPoolExecutor
+    else: raise ValueError("invalid executor: '{0}': expected 'process' or 'thread'".format(executor))
+    if workers is None: workers = os.cpu_count() or 1
+    tasks = [ (os.path.expanduser(path.strip()), not no_includes, cast, strict) for path in paths ]
+    chunksize = max(1, len(tasks) // (workers * 4))
+    properties, errors = ([], [])
+    with factory(max_workers=workers) as pool:
+        for path, (data, schematable, error) in zip(paths, pool.map(_loadone, tasks, chunksize=chunksize)):
+            if error is not None:
+                properties.append(None)
+                errors.append( (path, error) )
+                continue
+            loaded = Properties(path, no_read=True, strict=strict)
+            loaded._fill(data, (not no_includes, cast, False), schematable)
+            loaded.save()
+            properties.append(loaded)
+    return (properties, errors)
+
+async def aload_many(paths, limit=16, cast=False, no_includes=False, strict=True):
+    """
+    Awaitable counterpart of `load_many()`: reads files with `Properties.aread()` 
+    keeping at most `limit` of them being read at the same time. 
+    Returns tuple (properties, errors) just like `load_many()` (files which raised an exception are None).
+    """
+    semaphore = asyncio.Semaphore(limit)
+    async def load(path):
+        async with semaphore:
+            try: return (await Properties.aread(path, cast=cast, no_includes=no_includes, strict=strict), None)
+            except Exception as e: return (None, e)
+    properties, errors = ([], [])
+    paths = list(paths)
+    for path, (loaded, error) in zip(paths, await asyncio.gather(*[ load(path) for path in paths ])):
+        properties.append(loaded)
+        if error is not None: errors.append( (path, error) )
+    return (properties, errors)
@@ -0,0 +1,708 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks for pyproperties.
+
+Run from top directory of the repository:
+
+    python3 ./tests/benchmark.py [name ...]
+
+If no names are given every benchmark is run.
+"""
+
+import os
+import re
+import shutil
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules import pyproperties
+
+
+def generate(path, n=20000):
+    """
+    Writes properties file of (roughly) `n` lines to given path.
+    File contains comments, hidden properties, groups and continuation lines.
+    """
+    file = open(path, "w")
+    for i in range(n // 5):
+        file.write("#   comment of customer {0}\n".format(i))
+        file.write("customer.{0}.name=Customer {0}\n".format(i))
+        file.write("#customer.{0}.phone=+48 500 {0}\n".format(i))
+        file.write("customer.{0}.address=Long \\\n    Street {0}\n".format(i))
+    file.close()
+
+
+def report(name, before, after):
+    print("{0:<32} before: {1:>8.3f}s    after: {2:>8.3f}s    speedup: {3:>6.2f}x".format(name, before, after, before/after))
+
+
+def legacy_linehaskey(line, strict=True):
+    result = False
+    if strict: match = re.match("^ *[a-zA-Z0-9-._]+ *[:=].*$", line)
+    else: match = re.match("^ *[a-zA-Z0-9-._ ]+ *[:=].*$", line)
+    if match != None: result = True
+    return result
+
+
+def legacy_iscomment(line):
+    line = line.strip()
+    return line != "" and line[0] in ["#", "!"]
+
+
+def legacy_getlinekey(line, strict=True):
+    if not legacy_linehaskey(line=line, strict=strict): key = None
+    elif ":" in line[:line.find("=")]: key = line.split(":", 1)[0].strip()
+    else: key = line.split("=", 1)[0].strip()
+    return key
+
+
+def legacy_getlinevalue(line, strict=True):
+    if not legacy_linehaskey(line, strict): value = None
+    elif ":" in line[:line.find("=")]: value = line.split(":", 1)[1].lstrip()
+    else: value = line.split("=", 1)[1].lstrip()
+    return value
+
+
+class LegacyReader():
+    """
+    Frozen copy of `Reader` (and the `Engine.LineParser` functions it used) as of release 0.3.1, 
+    before the single-pass tokenizer was introduced. 
+    It must not call anything from `pyproperties` so later changes of the module do not make "before" numbers faster.
+    """
+    def __init__(self, path, includes=True, strict=True):
+        self._path = os.path.abspath(path)
+        self._includes, self._strict = (includes, strict)
+        self._source, self._hidden, self._included, self._comments, self._properties = ([], [], [], {}, [])
+
+    def loadf(self):
+        path = open(self._path)
+        file = path.readlines()
+        path.close()
+        source = []
+        i = 0
+        while i < len(file):
+            line = file[i].lstrip()
+            while line != "" and line[-1] == "\n": line = line[:-1]
+            while line != "" and line[-1] == "\\" and line[0] not in ["#", "!"]:
+                i += 1
+                line = line[:-1]
+                while file[i] != "" and file[i][-1] == "\n": file[i] = file[i][:-1]
+                line += file[i]
+            i += 1
+            source.append(line)
+        self._source = source
+
+    def _include(self, line_number, path, prefix="", hidden=False):
+        if not os.path.isabs(path): tpath = os.path.join(os.path.split(self._path)[0], path)
+        else: tpath = path
+        fpath = open(tpath)
+        file = fpath.readlines()
+        fpath.close()
+        if (path, prefix, hidden) not in self._included: self._included.append( (path, prefix, hidden) )
+        for i, line in enumerate(file):
+            if legacy_linehaskey(line, strict=self._strict) and prefix: line = "{0}.{1}".format(prefix, line.lstrip())
+            elif self._islinehiddenprop(line) and prefix: line = "#{0}.{1}".format(prefix, line[1:])
+            if legacy_linehaskey(line, strict=self._strict) and hidden: line = "#{0}".format(line.lstrip())
+            if line[-1] == "\n": line = line[:-1]
+            file[i] = line
+        self._source = self._source[:line_number] + file + self._source[line_number+1:]
+
+    def makeincludes(self):
+        i = 0
+        while i < len(self._source):
+            key = legacy_getlinekey(self._source[i])
+            value = legacy_getlinevalue(self._source[i])
+            if key == "__include__": self._include(i, value)
+            elif key == "__include__.hidden": self._include(i, value, hidden=True)
+            elif key != None and key[:15] == "__include__.as.": self._include(i, value, prefix=key[15:])
+            elif key != None and key[:22] == "__include__.hidden.as.": self._include(i, value, prefix=key[22:], hidden=True)
+            i += 1
+
+    def _islinehiddenprop(self, line):
+        if legacy_iscomment(line) and line[1] != " ": result = legacy_linehaskey(line[1:], strict=self._strict)
+        else: result = False
+        return result
+
+    def uncoverhidden(self):
+        source = []
+        hidden = []
+        for line in self._source:
+            if self._islinehiddenprop(line):
+                line = line[1:]
+                hidden.append( legacy_getlinekey(line) )
+            source.append(line)
+        self._hidden = hidden
+        self._source = source
+
+    def extractprops(self):
+        properties = []
+        for line in self._source:
+            if legacy_linehaskey(line=line, strict=self._strict): properties.append(line)
+        self._properties = properties
+
+    def extractcomments(self):
+        comments = {}
+        i = 0
+        while i < len(self._source):
+            line = self._source[i]
+            if legacy_linehaskey(line=line, strict=self._strict):
+                comment, n = ([], i-1)
+                while n >= 0 and legacy_iscomment(self._source[n]):
+                    comment.append( self._source[n][1:].strip() )
+                    n -= 1
+                if n != i-1:
+                    comment.reverse()
+                    comments[ legacy_getlinekey(line) ] = "\n".join(comment)
+                    self._source = self._source[:n+1] + self._source[i:]
+            i += 1
+        self._comments = comments
+
+    def splitprops(self):
+        properties = {}
+        for line in self._properties:
+            key = legacy_getlinekey(line)
+            value = legacy_getlinevalue(line)
+            properties[key] = value
+        self._properties = properties
+
+    def read(self):
+        self.loadf()
+        if self._includes: self.makeincludes()
+        self.uncoverhidden()
+        self.extractcomments()
+        self.extractprops()
+        self.splitprops()
+
+
+def legacy_classify(line, strict=True):
+    """
+    Classifies line the way `Reader` step methods did before `Engine.LineParser.classify()` was introduced: 
+    uncompiled patterns matched by `linehaskey()`, `getlinekey()` and `getlinevalue()` separately.
+    """
+    stripped = line.strip()
+    if stripped == "": return ("blank", None, None, None)
+    if stripped[0] in ["#", "!"]:
+        if line[1:2] != " " and legacy_linehaskey(line[1:], strict): return ("hidden", None, None, None)
+        return ("comment", None, None, None)
+    if not legacy_linehaskey(line, strict): return ("text", None, None, None)
+    key = line.split(":", 1)[0].strip() if legacy_linehaskey(line, strict) and ":" in line[:line.find("=")] else line.split("=", 1)[0].strip()
+    value = line.split(":", 1)[1].lstrip() if legacy_linehaskey(line, strict) and ":" in line[:line.find("=")] else line.split("=", 1)[1].lstrip()
+    return ("property", key, None, value)
+
+
+def bench_classify(directory):
+    path = os.path.join(directory, "classify.properties")
+    generate(path, n=100000)
+    lines = [ line for lineno, line in pyproperties.Engine.Tokenizer.logicallines(open(path)) ]
+    before = min(timeit.repeat(lambda: [ legacy_classify(line) for line in lines ], number=1, repeat=3))
+    after = min(timeit.repeat(lambda: [ pyproperties.Engine.LineParser.classify(line) for line in lines ], number=1, repeat=3))
+    report("LineParser.classify", before, after)
+    print("{0:<32} before: {1:>8.0f}/s    after: {2:>8.0f}/s".format("LineParser.classify lines", len(lines)/before, len(lines)/after))
+
+
+def legacy_convert(value):
+    """
+    Converts value the way `Engine.Converter.convert()` did before `guess_re` was introduced: 
+    patterns compiled and tried one after another for every value.
+    """
+    value = str(value)
+    if value == "None": value = None
+    elif value == "True": value = True
+    elif value == "False": value = False
+    elif re.match(re.compile(pyproperties.guess_hex_re), value): value = int(value, 16)
+    elif re.match(re.compile(pyproperties.guess_oct_re), value): value = int(value, 8)
+    elif re.match(re.compile(pyproperties.guess_bin_re), value): value = int(value, 2)
+    elif re.match(re.compile(pyproperties.guess_int_re), value): value = int(value)
+    elif re.match(re.compile(pyproperties.guess_float_re), value): value = float(value)
+    return value
+
+
+def bench_convert(directory):
+    samples = ["Customer 1", "+48 500 1", "1024", "-0x1f", "3.14", "True", "None", "Long Street 12", "0o17", "6.02e23"]
+    values = samples * 20000
+    before = min(timeit.repeat(lambda: [ legacy_convert(value) for value in values ], number=1, repeat=3))
+    after = min(timeit.repeat(lambda: pyproperties.Engine.Converter.convert_many(values), number=1, repeat=3))
+    report("Converter.convert_many", before, after)
+    columns = [
+            ("int", [ str(i - 100000) for i in range(200000) ]),
+            ("float", [ "{0}.{1:02d}".format(i, i % 100) for i in range(200000) ]),
+            ("mixed", values),
+            ]
+    for name, column in columns:
+        before = min(timeit.repeat(lambda: [ legacy_convert(value) for value in column ], number=1, repeat=3))
+        after = min(timeit.repeat(lambda: pyproperties.Engine.Converter.convert_many(column, column=True), number=1, repeat=3))
+        report("convert_many (column, {0})".format(name), before, after)
+
+
+def bench_get_cast(directory):
+    path = os.path.join(directory, "get_cast.properties")
+    file = open(path, "w")
+    for i in range(100): file.write("server.{0}.port={1}\nserver.{0}.timeout=0.{1}5\n".format(i, 8000 + i))
+    file.close()
+    properties = pyproperties.Properties(path)
+    keys = [ key for key in properties.keys() ] * 1000
+    before = min(timeit.repeat(lambda: [ legacy_convert(properties.properties[key]) for key in keys ], number=1, repeat=3))
+    after = min(timeit.repeat(lambda: [ properties.get(key, cast=True) for key in keys ], number=1, repeat=3))
+    report("200k get(cast=True)", before, after)
+
+
+def bench_schema(directory):
+    path = os.path.join(directory, "schema.properties")
+    file = open(path, "w")
+    for i in range(20000):
+        file.write("server.{0}.port={1}\nserver.{0}.timeout=.{1}\nserver.{0}.name=Server {0}\nserver.{0}.phone=-{0}\n".format(i, 8000 + i))
+    file.close()
+    schema = pyproperties.Schema({"server.*.port": int, "server.*.timeout": float, "server.*.name": str, "server.*.phone": str})
+    properties = pyproperties.Properties(path)
+    keys = properties.keys()
+    before = min(timeit.repeat(lambda: dict([ (key, legacy_convert(properties.properties[key])) for key in keys ]), number=1, repeat=3))
+    def run():
+        properties.setschema(schema)
+        properties.castall()
+    after = min(timeit.repeat(run, number=1, repeat=3))
+    report("castall() (schema, 80k keys)", before, after)
+
+
+def bench_read(directory):
+    path = os.path.join(directory, "read.properties")
+    generate(path)
+    before = min(timeit.repeat(lambda: LegacyReader(path).read(), number=1, repeat=3))
+    after = min(timeit.repeat(lambda: pyproperties.Reader(path).read(), number=1, repeat=3))
+    report("Reader.read", before, after)
+
+
+def bench_extractcomments(directory):
+    path = os.path.join(directory, "extractcomments.properties")
+    generate(path)
+    legacy, reader = (LegacyReader(path), pyproperties.Reader(path))
+    legacy.loadf()
+    source = legacy._source
+    def run(reader):
+        reader._source = list(source)
+        reader.extractcomments()
+    before = min(timeit.repeat(lambda: run(legacy), number=1, repeat=3))
+    after = min(timeit.repeat(lambda: run(reader), number=1, repeat=3))
+    report("Reader.extractcomments", before, after)
+
+
+def peak(function):
+    """
+    Returns peak size (in MiB) of memory allocated by Python while running given function.
+    """
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def bench_lazy(directory):
+    path = os.path.join(directory, "lazy.properties")
+    generate(path, n=200000)
+    keys = [ "customer.{0}.name".format(i) for i in range(0, 40000, 100) ]
+    def run(lazy):
+        properties = pyproperties.Properties(path, cast=True, lazy=lazy)
+        for key in keys: properties.get(key)
+    before = min(timeit.repeat(lambda: run(False), number=1, repeat=3))
+    after = min(timeit.repeat(lambda: run(True), number=1, repeat=3))
+    report("Properties(lazy) + 400 get()", before, after)
+    eager, lazy = (pyproperties.Properties(path, cast=True), pyproperties.Properties(path, cast=True, lazy=True))
+    before = min(timeit.repeat(lambda: pyproperties.Writer(eager).store(no_dump=True), number=1, repeat=3))
+    after = min(timeit.repeat(lambda: pyproperties.Writer(lazy).store(no_dump=True), number=1, repeat=3))
+    report("Writer.store (lazy)", before, after)
+
+
+def bench_iterprops(directory):
+    path = os.path.join(directory, "iterprops.properties")
+    generate(path, n=200000)
+    def filtered():
+        reader = pyproperties.Reader(path)
+        reader.read()
+        return [ key for key in reader._properties if key.endswith(".name") ]
+    def streamed():
+        return [ key for key, value, comment, hidden, lineno in pyproperties.Reader(path).iterprops() if key.endswith(".name") ]
+    before = min(timeit.repeat(filtered, number=1, repeat=3))
+    after = min(timeit.repeat(streamed, number=1, repeat=3))
+    report("Reader.iterprops", before, after)
+    before, after = (peak(filtered), peak(streamed))
+    print("{0:<32} before: {1:>7.1f}MiB    after: {2:>7.1f}MiB".format("Reader.iterprops peak memory", before, after))
+
+
+def bench_include(directory):
+    base = os.path.join(directory, "base.properties")
+    path = os.path.join(directory, "include.properties")
+    generate(base, n=500)
+    file = open(path, "w")
+    for i in range(50): file.write("__include__.as.tenant{0}=base.properties\n".format(i))
+    file.close()
+    before = min(timeit.repeat(lambda: LegacyReader(path).read(), number=1, repeat=3))
+    after = min(timeit.repeat(lambda: pyproperties.Reader(path).read(), number=1, repeat=3))
+    report("Reader.read (50 includes)", before, after)
+
+
+def bench_cache(directory):
+    path = os.path.join(directory, "cache.properties")
+    generate(path, n=5000)
+    def run():
+        for i in range(100): pyproperties.Properties(path)
+    before = min(timeit.repeat(run, number=1, repeat=3))
+    pyproperties.enablecache()
+    after = min(timeit.repeat(run, number=1, repeat=3))
+    pyproperties.disablecache()
+    report("100x Properties() (cache)", before, after)
+
+
+def bench_snapshot(directory):
+    path = os.path.join(directory, "snapshot.properties")
+    snapshot = os.path.join(directory, "snapshot.snapshot")
+    generate(path, n=200000)
+    pyproperties.Properties(path).dump_snapshot(snapshot)
+    before = min(timeit.repeat(lambda: pyproperties.Properties(path), number=1, repeat=3))
+    after = min(timeit.repeat(lambda: pyproperties.Properties.load_snapshot(snapshot), number=1, repeat=3))
+    report("Properties.load_snapshot", before, after)
+
+
+def bench_load_many(directory):
+    paths = [ os.path.join(directory, "tenant{0}.properties".format(i)) for i in range(200) ]
+    generate(paths[0], n=2000)
+    for path in paths[1:]: shutil.copy(paths[0], path)
+    before = min(timeit.repeat(lambda: [ pyproperties.Properties(path) for path in paths ], number=1, repeat=3))
+    after = min(timeit.repeat(lambda: pyproperties.load_many(paths), number=1, repeat=3))
+    report("load_many ({0} processes)".format(os.cpu_count()), before, after)
+
+
+def bench_reload(directory):
+    paths = [ os.path.join(directory, "reload{0}.properties".format(i)) for i in range(50) ]
+    path = os.path.join(directory, "reload.properties")
+    for included in paths: generate(included, n=2000)
+    file = open(path, "w")
+    for i, included in enumerate(paths): file.write("__include__.as.tenant{0}={1}\n".format(i, os.path.basename(included)))
+    file.close()
+    properties = pyproperties.Properties(path)
+    properties.reload(incremental=True)
+    def touch():
+        stat = os.stat(paths[0])
+        file = open(paths[0], "a")
+        file.write("x=x\n")
+        file.close()
+        os.utime(paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    def full():
+        touch()
+        properties.reload()
+    def incremental():
+        touch()
+        properties.reload(incremental=True)
+    before = min(timeit.repeat(full, number=1, repeat=3))
+    properties.reload(incremental=True)
+    after = min(timeit.repeat(incremental, number=1, repeat=3))
+    report("reload (1 of 50 includes changed)", before, after)
+    before = min(timeit.repeat(properties.reload, number=1, repeat=3))
+    after = min(timeit.repeat(lambda: properties.reload(incremental=True), number=1, repeat=3))
+    report("reload (nothing changed)", before, after)
+
+
+def legacy_parsevalue(properties, value):
+    if type(value) == str:
+        while "$(" in value and ")" in value:
+            a = value.find("$(")
+            b = value[a:].find(")")
+            key = value[a+2: a+b]
+            if a == -1 or b == -1: break
+            value = value.replace("$({0})".format(key), str(properties.get(key)))
+    return value
+
+
+def references(n, chain=False):
+    properties = pyproperties.Properties()
+    properties.set("key.0", "0")
+    for i in range(1, n): properties.set("key.{0}".format(i), "$(key.{0})".format(i-1) if chain else "$(key.{0}).$(key.{1})".format(i // 2, i % 7 if i > 7 else 0))
+    return properties
+
+
+def bench_resolve(directory):
+    for chain in (False, True):
+        properties = references(2000, chain)
+        before = min(timeit.repeat(lambda: [ legacy_parsevalue(properties, properties.get(key)) for key in properties.keys() ], number=1, repeat=3))
+        after = min(timeit.repeat(lambda: pyproperties.Engine.Resolver.resolve(properties), number=1, repeat=3))
+        report("resolve (2000 keys, {0})".format("chain" if chain else "tree"), before, after)
+    for n in (10000, 100000):
+        for chain in (False, True):
+            properties = references(n, chain)
+            elapsed = min(timeit.repeat(lambda: pyproperties.Engine.Resolver.resolve(properties), number=1, repeat=3))
+            print("{0:<32} {1:>8.3f}s".format("resolve ({0} keys, {1})".format(n, "chain" if chain else "tree"), elapsed))
+
+
+def bench_rerender(directory):
+    properties = pyproperties.Properties()
+    for i in range(100): properties.set("host.{0}".format(i), "host{0}.example.com".format(i))
+    for i in range(100000): properties.set("url.{0}".format(i), "http://$(host.{0}):8080/$(host.{1})/".format(i % 100, (i * 7) % 100))
+    keys = properties.keys()
+    properties.parse()
+    def update(incremental):
+        properties.set("host.0", "other.example.com")
+        if not incremental: properties._invalidate()
+        return [ properties.get(key, parse=True) for key in keys ]
+    before = min(timeit.repeat(lambda: update(False), number=1, repeat=3))
+    after = min(timeit.repeat(lambda: update(True), number=1, repeat=3))
+    report("set() + parse (100k keys)", before, after)
+
+
+def bench_resolved(directory):
+    path = os.path.join(directory, "resolved.properties")
+    generate(path, n=50000)
+    properties = pyproperties.Properties(path)
+    for i in range(0, 10000, 2): properties.set("label.{0}".format(i), "$(customer.{0}.name), $(customer.{0}.address)".format(i))
+    keys = [ "label.{0}".format(i) for i in range(0, 10000, 100) ]
+    def parse():
+        parsed = pyproperties.Engine.parse(properties, cast=True)
+        for key in keys: parsed.get(key)
+    def view():
+        properties._invalidate()
+        resolved = properties.resolved(cast=True)
+        for key in keys: resolved.get(key)
+    before = min(timeit.repeat(parse, number=1, repeat=3))
+    after = min(timeit.repeat(view, number=1, repeat=3))
+    report("parse() vs resolved() + 100 get()", before, after)
+    print("{0:<32} before: {1:>7.1f}MiB    after: {2:>7.1f}MiB".format("peak memory", peak(parse), peak(view)))
+
+
+def legacy_gets(properties, identifier):
+    identifier = pyproperties.Engine.expandidentifier(identifier)
+    return [ (key, properties.get(key)) for key in properties.keys() if re.match(identifier, key) ]
+
+
+def legacy_sets(properties, identifier, value):
+    identifier = re.compile(pyproperties.Engine.expandidentifier(identifier))
+    for key in [ key for key in properties.keys() if re.match(identifier, key) ]: properties.set(key, value)
+
+
+def legacy_removes(properties, identifier):
+    identifier = re.compile(pyproperties.Engine.expandidentifier(identifier))
+    for key in [ key for key in properties.properties.keys() if re.match(identifier, key) ]: properties.remove(key)
+
+
+def legacy_hides(properties, identifier):
+    identifier = pyproperties.Engine.expandidentifier(identifier)
+    for key in properties.keys():
+        if re.match(identifier, key): properties.hide(key)
+
+
+def legacy_unhides(properties, identifier):
+    identifier = pyproperties.Engine.expandidentifier(identifier)
+    for key in [ key for key in properties.hidden if re.match(identifier, key) ]: properties.unhide(key)
+
+
+def legacy_getgroups(properties):
+    groups = []
+    for key in [ key.split(".") for key in properties.keys() ]:
+        identifier = ""
+        for word in key:
+            if pyproperties.Engine.Converter.ishex(word) or pyproperties.Engine.Converter.isoct(word) or re.match(re.compile(pyproperties.guess_int_re), word):
+                word = "*"
+            identifier = "{}.{}".format(identifier, word)
+        identifier = identifier[1:]
+        if identifier not in groups and len(legacy_gets(properties, identifier)) > 1: groups.append(identifier)
+    return groups
+
+
+def customers(n):
+    properties = pyproperties.Properties()
+    for i in range(n // 4):
+        for field in ("name", "email", "phone", "address"): properties.set("customer.{0}.{1}".format(i, field), "{0} {1}".format(field, i))
+    return properties
+
+
+def bench_matcher(directory):
+    properties = customers(100000)
+    apis = [
+            ("gets", lambda: legacy_gets(properties, "customer.*.name"), lambda: properties.gets("customer.*.name")),
+            ("sets", lambda: legacy_sets(properties, "customer.1.*", "x"), lambda: properties.sets("customer.1.*", "x")),
+            ("removes", lambda: (legacy_removes(properties, "customer.2.*"), properties.set("customer.2.name", "x")), 
+                        lambda: (properties.removes("customer.2.*"), properties.set("customer.2.name", "x"))),
+            ("hides", lambda: legacy_hides(properties, "customer.3.*"), lambda: properties.hides("customer.3.*")),
+            ]
+    for name, legacy, current in apis:
+        before = min(timeit.repeat(legacy, number=1, repeat=5))
+        after = min(timeit.repeat(current, number=1, repeat=5))
+        report("{0} (100k keys)".format(name), before, after)
+    hidden = customers(100000)
+    hidden.hidden = [ key for key in hidden.properties if not key.endswith(".name") ]
+    before = min(timeit.repeat(lambda: (legacy_unhides(hidden, "customer.3.*"), hidden.hidden.append("customer.3.phone")), number=1, repeat=5))
+    after = min(timeit.repeat(lambda: (hidden.unhides("customer.3.*"), hidden.hidden.append("customer.3.phone")), number=1, repeat=5))
+    report("unhides (75k hidden keys)", before, after)
+    before = min(timeit.repeat(lambda: legacy_getgroups(properties), number=1, repeat=3))
+    after = min(timeit.repeat(properties.getgroups, number=1, repeat=3))
+    report("getgroups (100k keys)", before, after)
+
+
+def bench_trie(directory):
+    properties = customers(100000)
+    for i in range(25000): properties.set("order.{0}.total".format(i), str(i))
+    properties.gets("customer.0.name")
+    for identifier in ("customer.7.*", "order.*.total", "customer.*.name"):
+        before = min(timeit.repeat(lambda: [ (key, properties.get(key)) for key in pyproperties.Engine.matcher(identifier)(properties.keys()) ], number=1, repeat=5))
+        after = min(timeit.repeat(lambda: properties.gets(identifier), number=1, repeat=5))
+        report("gets {0} (125k keys)".format(identifier), before, after)
+    before = min(timeit.repeat(lambda: [ properties.set(key, "x") for key in pyproperties.Engine.matcher("customer.9.*")(properties.keys()) ], number=1, repeat=5))
+    after = min(timeit.repeat(lambda: properties.sets("customer.9.*", "x"), number=1, repeat=5))
+    report("sets customer.9.* (125k keys)", before, after)
+
+
+def legacy_getsingles(properties):
+    groups = legacy_getgroups(properties)
+    singles = []
+    for key in properties.keys():
+        key = re.sub(re.compile("\\.[0-9]+\\."), ".*.", key)
+        key = re.sub(re.compile("\\.[0-9]+$"), ".*", key)
+        if key not in groups: singles.append(key)
+    return singles
+
+
+def bench_groups(directory):
+    properties = customers(100000)
+    for i in range(1000): properties.set("setting.{0}".format(i), str(i) if i % 2 else "x")
+    for i in range(200): properties.set("single{0}.value".format(i), str(i))
+    properties.getgroups()
+    before = min(timeit.repeat(lambda: legacy_getgroups(properties), number=1, repeat=1))
+    after = min(timeit.repeat(properties.getgroups, number=1, repeat=3))
+    report("getgroups (101k keys)", before, after)
+    before = min(timeit.repeat(lambda: legacy_getsingles(properties), number=1, repeat=1))
+    after = min(timeit.repeat(properties.getsingles, number=1, repeat=3))
+    report("getsingles (101k keys)", before, after)
+    def storegroups(legacy):
+        exporter = pyproperties.Exporter.JSON(properties)
+        if not legacy: return exporter.storegroups()
+        for identifier in legacy_getgroups(properties):
+            for key in sorted(dict(legacy_gets(properties, identifier))): exporter.storeprop(key)
+    before = min(timeit.repeat(lambda: storegroups(True), number=1, repeat=1))
+    after = min(timeit.repeat(lambda: storegroups(False), number=1, repeat=1))
+    report("Exporter.JSON.storegroups (101k keys)", before, after)
+
+
+def legacy_getkeysof(properties, value, no_hidden=True):
+    keys = []
+    for propkey, propvalue in properties.properties.items():
+        if value == propvalue and propkey not in properties.hidden and no_hidden: keys.append(propkey)
+        elif value == propvalue and propkey in properties.hidden and not no_hidden: keys.append(propkey)
+    return keys
+
+
+def bench_getkeysof(directory):
+    properties = customers(100000)
+    for i in range(1000): properties.set("service.{0}.port".format(i), str(8000 + i % 50))
+    hosts = [ "name {0}".format(i) for i in range(0, 25000, 250) ]
+    before = min(timeit.repeat(lambda: [ legacy_getkeysof(properties, host) for host in hosts ], number=1, repeat=3))
+    build = min(timeit.repeat(lambda: (properties._dropindexes(), properties.getkeysof(hosts[0])), number=1, repeat=3))
+    after = min(timeit.repeat(lambda: [ properties.getkeysof(host) for host in hosts ], number=1, repeat=3))
+    report("100 x getkeysof (101k keys)", before, after)
+    print("{0:<32} {1:>8.3f}s".format("building value index", build))
+    before = min(timeit.repeat(lambda: [ [ key for key in properties.keys() if properties.get(key, cast=True) == port ] for port in range(8000, 8050) ], number=1, repeat=3))
+    after = min(timeit.repeat(lambda: [ properties.getkeysof(port, cast=True) for port in range(8000, 8050) ], number=1, repeat=3))
+    report("50 x getkeysof(cast=True)", before, after)
+
+
+def legacy_keys(properties, hidden=False):
+    keys = []
+    for key in list(properties.properties.keys()):
+        if key not in properties.hidden: keys.append(key)
+        elif key in properties.hidden and hidden == True: keys.append(key)
+    return sorted(keys)
+
+
+def bench_keys(directory):
+    properties = customers(100000)
+    properties.hides("customer.*.phone")
+    listed = customers(100000)
+    listed.hidden = list(properties.hidden)
+    names = [ "customer.{0}.name".format(i) for i in range(0, 25000, 25) ]
+    before = min(timeit.repeat(lambda: [ listed.get(key) for key in names ], number=1, repeat=3))
+    after = min(timeit.repeat(lambda: [ properties.get(key) for key in names ], number=1, repeat=3))
+    report("1000 x get (25k hidden keys)", before, after)
+    before = min(timeit.repeat(lambda: [ legacy_keys(properties) for i in range(20) ], number=1, repeat=3))
+    after = min(timeit.repeat(lambda: [ properties.keys() for i in range(20) ], number=1, repeat=3))
+    report("20 x keys (100k keys)", before, after)
+    def interleaved(keys):
+        for i in range(20):
+            properties.set("extra.{0}".format(i), "value")
+            keys(properties)
+        properties.removes("extra.*")
+    before = min(timeit.repeat(lambda: interleaved(legacy_keys), number=1, repeat=3))
+    after = min(timeit.repeat(lambda: interleaved(pyproperties.Properties.keys), number=1, repeat=3))
+    report("20 x set + keys (100k keys)", before, after)
+
+
+def bench_bulk(directory):
+    overrides = dict([ ("customer.{0}.email".format(i), "new {0}".format(i)) for i in range(0, 50000, 2) ])
+    overrides.update([ ("extra.{0}".format(i), "$(customer.{0}.name)".format(i)) for i in range(25000) ])
+    def apply(bulk):
+        properties = customers(100000)
+        properties.keys()
+        start = timeit.default_timer()
+        if bulk: properties.set_many(overrides)
+        else:
+            for key, value in overrides.items(): properties.set(key, value)
+        return timeit.default_timer() - start
+    before = min([ apply(False) for i in range(3) ])
+    after = min([ apply(True) for i in range(3) ])
+    report("set_many (50k keys into 100k)", before, after)
+    properties = customers(100000)
+    properties.set_many(overrides)
+    keys = list(overrides)
+    def read(bulk):
+        properties._invalidate()
+        start = timeit.default_timer()
+        if bulk: properties.get_many(keys, parse=True)
+        else: [ properties.get(key, parse=True) for key in keys ]
+        return timeit.default_timer() - start
+    before = min([ read(False) for i in range(3) ])
+    after = min([ read(True) for i in range(3) ])
+    report("get_many(parse=True) (50k keys)", before, after)
+    def remove(bulk):
+        properties = customers(100000)
+        properties.keys()
+        start = timeit.default_timer()
+        if bulk: properties.remove_many(keys[:25000])
+        else:
+            for key in keys[:25000]: properties.remove(key)
+        return timeit.default_timer() - start
+    before = min([ remove(False) for i in range(3) ])
+    after = min([ remove(True) for i in range(3) ])
+    report("remove_many (25k of 100k keys)", before, after)
+
+
+benchmarks = [
+        ("classify", bench_classify),
+        ("convert", bench_convert),
+        ("get_cast", bench_get_cast),
+        ("schema", bench_schema),
+        ("read", bench_read),
+        ("extractcomments", bench_extractcomments),
+        ("lazy", bench_lazy),
+        ("iterprops", bench_iterprops),
+        ("include", bench_include),
+        ("cache", bench_cache),
+        ("snapshot", bench_snapshot),
+        ("load_many", bench_load_many),
+        ("reload", bench_reload),
+        ("resolve", bench_resolve),
+        ("rerender", bench_rerender),
+        ("resolved", bench_resolved),
+        ("matcher", bench_matcher),
+        ("trie", bench_trie),
+        ("groups", bench_groups),
+        ("getkeysof", bench_getkeysof),
+        ("keys", bench_keys),
+        ("bulk", bench_bulk),
+        ]
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:]
+    with tempfile.TemporaryDirectory() as directory:
+        for name, benchmark in benchmarks:
+            if not names or name in names: benchmark(directory)
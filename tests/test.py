@@ -4,6 +4,13 @@ import unittest
 import re
 import os
 import sys
+import shutil
+import tempfile
+import asyncio
+import time
+import gc
+import threading
+import warnings
 
 from modules import pyproperties
 
@@ -134,6 +141,27 @@ class ReaderTest(unittest.TestCase):
         self.assertEqual(comments, reader._comments)
         self.assertEqual(lines, reader._source)
 
+    def testExtractCommentsOfAdjacentProperties(self):
+        """
+        Method tested: `Reader.extractcomments()`
+        Test if `extractcomments()` attaches comments to properties placed directly one after another.
+        """
+        comments =  {
+                    "foo":"first",
+                    "bar":"second",
+                    "baz":"",
+                    }
+        lines = [
+                "foo=Foo",
+                "bar=Bar",
+                "baz=Baz",
+                ]
+        reader = pyproperties.Reader(path="./data/properties/reader_test/foo.adjacent.properties")
+        reader.loadf()
+        reader.extractcomments()
+        self.assertEqual(comments, reader._comments)
+        self.assertEqual(lines, reader._source)
+
     def testUncoverHiddenProperties(self):
         """
         Method tested: `Reader.uncoverhidden()`
@@ -283,6 +311,370 @@ class ReaderTest(unittest.TestCase):
         self.assertEqual(hidden, reader._hidden)
         self.assertEqual(comments, reader._comments)
     
+    def testReadAdjacentComments(self):
+        """
+        Method tested: `Reader.read()`
+        Test if `read()` attaches comments to properties placed directly one after another.
+        """
+        reader = pyproperties.Reader(path="./data/properties/reader_test/foo.adjacent.properties")
+        reader.read()
+        lines = [
+                "foo=Foo",
+                "bar=Bar",
+                "baz=Baz",
+                ]
+        comments =  {
+                    "foo":"first",
+                    "bar":"second",
+                    "baz":"",
+                    }
+        self.assertEqual(lines, reader._source)
+        self.assertEqual(comments, reader._comments)
+
+
+    def testMappedLines(self):
+        """
+        Method tested: `Engine.Tokenizer.mappedlines()`
+        Test if lines found in raw bytes (used by lazy reading) are the same as lines of text file.
+        """
+        paths = [
+                "./data/properties/foo.properties",
+                "./data/properties/reader_test/foo.commented.properties",
+                "./data/properties/reader_test/foo.splitted.properties",
+                "./data/properties/reader_test/foo.hidden.commented.properties",
+                "./data/properties/include_test/test.commented.prefix.properties",
+                ]
+        for path in paths:
+            with open(path) as file: text = list(pyproperties.Engine.Tokenizer.logicallines(file, path))
+            with open(path, "rb") as file: mapped = list(pyproperties.Engine.Tokenizer.mappedlines(file.read(), path))
+            self.assertEqual(text, mapped)
+
+    def testIterProps(self):
+        """
+        Method tested: `Reader.iterprops()`
+        Test if `iterprops()` yields records of properties in order in which they appear in file.
+        """
+        records = [
+                ("foo", "Foo", "this is\na comment", True, 3),
+                ("bar", "Bar", "this is\nanother comment", True, 7),
+                ]
+        reader = pyproperties.Reader(path="./data/properties/reader_test/foo.hidden.commented.properties")
+        self.assertEqual(records, list(reader.iterprops()))
+
+    def testIterPropsCasted(self):
+        reader = pyproperties.Reader(path="./data/properties/foo.properties")
+        records = dict([ (key, value) for key, value, comment, hidden, lineno in reader.iterprops(cast=True) ])
+        self.assertEqual(3.14, records["numeral.float.0"])
+        self.assertEqual(3, records["numeral.int"])
+
+    def testIterPropsGivesSameResultsAsRead(self):
+        paths = [
+                "./data/properties/foo.properties",
+                "./data/properties/bar.properties",
+                "./data/properties/include_test/test.commented.prefix.properties",
+                ]
+        for path in paths:
+            reader = pyproperties.Reader(path=path)
+            reader.read()
+            properties, comments, hidden = ({}, {}, [])
+            for key, value, comment, ishidden, lineno in pyproperties.Reader(path=path).iterprops():
+                properties[key] = value
+                if comment: comments[key] = comment
+                if ishidden: hidden.append(key)
+            self.assertEqual(reader._properties, properties)
+            self.assertEqual(reader._comments, comments)
+            self.assertEqual(reader._hidden, hidden)
+
+class TokenizerTest(unittest.TestCase):
+    def testLogicalLines(self):
+        """
+        Method tested: `Engine.Tokenizer.logicallines()`
+        Test if `logicallines()` concatenates splitted lines and reports their starting line numbers.
+        """
+        physical = ["foo=Dura Lex \\\n", "    Sed Lex\n", "\n", "  bar=Bar\n", "baz=Baz \\"]
+        lines = [
+                (1, "foo=Dura Lex     Sed Lex"),
+                (3, ""),
+                (4, "bar=Bar"),
+                (5, "baz=Baz "),
+                ]
+        self.assertEqual(lines, list(pyproperties.Engine.Tokenizer.logicallines(physical)))
+
+    def testMappedLines(self):
+        """
+        Method tested: `Engine.Tokenizer.mappedlines()`
+        Test if `mappedlines()` finds the same logical lines in raw bytes as `logicallines()` in text.
+        """
+        buffer = b"foo=Dura Lex \\\r\n    Sed Lex\r\n\r  bar=B\xc3\xa4r\nbaz=Baz \\"
+        lines = [
+                (1, "foo=Dura Lex     Sed Lex"),
+                (3, ""),
+                (4, "bar=B\u00e4r"),
+                (5, "baz=Baz "),
+                ]
+        self.assertEqual(lines, list(pyproperties.Engine.Tokenizer.mappedlines(buffer, encoding="utf-8")))
+
+    def testTokenize(self):
+        """
+        Method tested: `Engine.Tokenizer.tokenize()`
+        Test if `tokenize()` correctly classifies lines.
+        """
+        physical = ["#   comment\n", "foo = Foo\n", "\n", "#bar:Bar\n", "#\n", "not a property\n"]
+        tokens = [
+                ("comment", 1, "#   comment", None, None),
+                ("property", 2, "foo = Foo", "foo", "Foo"),
+                ("blank", 3, "", None, None),
+                ("hidden", 4, "bar:Bar", "bar", "Bar"),
+                ("comment", 5, "#", None, None),
+                ("text", 6, "not a property", None, None),
+                ]
+        self.assertEqual(tokens, list(pyproperties.Engine.Tokenizer.tokenize(physical)))
+
+    def testTokenizeNonStrict(self):
+        """
+        Method tested: `Engine.Tokenizer.tokenize()`
+        Test if `tokenize()` accepts keys containing whitespace in non-strict mode.
+        """
+        physical = ["some thing = not valid", "#some thing=hidden"]
+        tokens = [
+                ("property", 1, "some thing = not valid", "some thing", "not valid"),
+                ("hidden", 2, "some thing=hidden", "some thing", "hidden"),
+                ]
+        self.assertEqual(tokens, list(pyproperties.Engine.Tokenizer.tokenize(physical, strict=False)))
+
+
+
+class ReadCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = pyproperties.enablecache(size=2)
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "foo.properties")
+        shutil.copy("./data/properties/foo.properties", self.path)
+
+    def tearDown(self):
+        pyproperties.disablecache()
+        shutil.rmtree(self.directory)
+
+    def testCacheHit(self):
+        first = pyproperties.Properties(self.path)
+        second = pyproperties.Properties(self.path)
+        self.assertEqual({"hits": 1, "misses": 1, "entries": 1, "size": 2}, self.cache.stats())
+        self.assertEqual(first.properties, second.properties)
+        self.assertEqual(first.source, second.source)
+
+    def testCachedDataIsIndependent(self):
+        first = pyproperties.Properties(self.path)
+        first.set("numeral.int", "4")
+        first.hide("person.name")
+        second = pyproperties.Properties(self.path)
+        self.assertEqual("3", second.get("numeral.int"))
+        self.assertEqual("X", second.get("person.name"))
+
+    def testCacheFlagsArePartOfKey(self):
+        pyproperties.Properties(self.path)
+        casted = pyproperties.Properties(self.path, cast=True)
+        self.assertEqual(3, casted.get("numeral.int"))
+        self.assertEqual(0, self.cache.hits)
+
+    def testModifiedFileIsReadAgain(self):
+        pyproperties.Properties(self.path)
+        with open(self.path, "a") as file: file.write("new=New\n")
+        self.assertEqual("New", pyproperties.Properties(self.path).get("new"))
+        self.assertEqual(0, self.cache.hits)
+
+    def testModifiedIncludeIsReadAgain(self):
+        main = os.path.join(self.directory, "main.properties")
+        with open(main, "w") as file: file.write("__include__=foo.properties\n")
+        pyproperties.Properties(main)
+        stat = os.stat(self.path)
+        with open(self.path, "a") as file: file.write("new=New\n")
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual("New", pyproperties.Properties(main).get("new"))
+        self.assertEqual(0, self.cache.hits)
+
+    def testLeastRecentlyUsedEntryIsDropped(self):
+        paths = [ os.path.join(self.directory, "{0}.properties".format(name)) for name in ["a", "b"] ]
+        for path in paths: shutil.copy(self.path, path)
+        pyproperties.Properties(self.path)
+        pyproperties.Properties(paths[0])
+        pyproperties.Properties(self.path)
+        pyproperties.Properties(paths[1])
+        self.assertEqual(2, self.cache.stats()["entries"])
+        pyproperties.Properties(self.path)
+        pyproperties.Properties(paths[0])
+        self.assertEqual(2, self.cache.hits)
+        self.assertEqual(4, self.cache.misses)
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "foo.properties")
+        self.snapshot = os.path.join(self.directory, "foo.snapshot")
+        shutil.copy("./data/properties/foo.properties", self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def modify(self, path, line):
+        stat = os.stat(path)
+        with open(path, "a") as file: file.write(line)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def testLoadSnapshot(self):
+        properties = pyproperties.Properties(self.path, cast=True)
+        properties.dump_snapshot(self.snapshot)
+        loaded = pyproperties.Properties.load_snapshot(self.snapshot)
+        self.assertEqual(properties.properties, loaded.properties)
+        self.assertEqual(properties.propcomments, loaded.propcomments)
+        self.assertEqual(properties.hidden, loaded.hidden)
+        self.assertEqual(properties.source, loaded.source)
+        self.assertEqual(properties.path, loaded.path)
+        self.assertEqual(3, loaded.get("numeral.int"))
+        self.assertFalse(loaded.unsaved)
+
+    def testLoadSnapshotKeepsIncludes(self):
+        properties = pyproperties.Properties("./data/properties/include_test/test.properties")
+        properties.dump_snapshot(self.snapshot)
+        loaded = pyproperties.Properties.load_snapshot(self.snapshot)
+        self.assertEqual(properties.listincludes(), loaded.listincludes())
+        self.assertEqual(properties.properties, loaded.properties)
+
+    def testStaleSnapshotIsReadAgain(self):
+        pyproperties.Properties(self.path).dump_snapshot(self.snapshot)
+        self.modify(self.path, "new=New\n")
+        self.assertEqual("New", pyproperties.Properties.load_snapshot(self.snapshot).get("new"))
+        self.assertEqual("New", pyproperties.Snapshot.load(self.snapshot)["properties"]["new"])
+
+    def testStaleIncludeIsReadAgain(self):
+        main = os.path.join(self.directory, "main.properties")
+        with open(main, "w") as file: file.write("__include__=foo.properties\n")
+        pyproperties.Properties(main).dump_snapshot(self.snapshot)
+        self.modify(self.path, "new=New\n")
+        self.assertEqual("New", pyproperties.Properties.load_snapshot(self.snapshot).get("new"))
+
+    def testTouchedFileWithSameContentsIsNotStale(self):
+        pyproperties.Properties(self.path).dump_snapshot(self.snapshot)
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertTrue(pyproperties.Snapshot.isfresh(pyproperties.Snapshot.load(self.snapshot)["files"]))
+
+    def testSnapshotIsCreatedFromSource(self):
+        properties = pyproperties.Properties.load_snapshot(self.snapshot, source=self.path, cast=True)
+        self.assertEqual(3, properties.get("numeral.int"))
+        self.assertTrue(os.path.isfile(self.snapshot))
+        self.assertEqual(3, pyproperties.Properties.load_snapshot(self.snapshot).get("numeral.int"))
+
+    def testSnapshotOfDifferentParametersIsStale(self):
+        pyproperties.Properties(self.path).dump_snapshot(self.snapshot)
+        self.assertEqual(3, pyproperties.Properties.load_snapshot(self.snapshot, source=self.path, cast=True).get("numeral.int"))
+
+    def testLoadSnapshotRaisesReadErrorWhenNotASnapshot(self):
+        self.assertRaises(pyproperties.ReadError, pyproperties.Properties.load_snapshot, self.path)
+        self.assertRaises(pyproperties.ReadError, pyproperties.Properties.load_snapshot, self.snapshot)
+
+    def testLoadSnapshotRaisesReadErrorOnVersionMismatch(self):
+        pyproperties.Properties(self.path).dump_snapshot(self.snapshot)
+        with open(self.snapshot, "r+b") as file:
+            file.seek(len(pyproperties.snapshot_magic))
+            file.write(bytes([pyproperties.snapshot_version + 1]))
+        self.assertRaises(pyproperties.ReadError, pyproperties.Properties.load_snapshot, self.snapshot)
+        self.assertEqual("3", pyproperties.Properties.load_snapshot(self.snapshot, source=self.path).get("numeral.int"))
+
+
+class LoadManyTest(unittest.TestCase):
+    paths = ["./data/properties/foo.properties", "./data/properties/nonexistent.properties", 
+             "./data/properties/include_test/test_error.properties", "./data/properties/include_test/test.properties"]
+
+    def check(self, executor):
+        properties, errors = pyproperties.load_many(self.paths, workers=2, executor=executor, cast=True)
+        self.assertEqual(4, len(properties))
+        for i in [0, 3]:
+            expected = pyproperties.Properties(self.paths[i], cast=True)
+            self.assertEqual(expected.properties, properties[i].properties)
+            self.assertEqual(expected.propcomments, properties[i].propcomments)
+            self.assertEqual(expected.hidden, properties[i].hidden)
+            self.assertEqual(expected.listincludes(), properties[i].listincludes())
+            self.assertEqual(expected.path, properties[i].path)
+            self.assertFalse(properties[i].unsaved)
+        self.assertEqual(None, properties[1])
+        self.assertEqual(None, properties[2])
+        self.assertEqual([self.paths[1], self.paths[2]], [ path for path, error in errors ])
+        self.assertEqual(pyproperties.ReadError, type(errors[0][1]))
+        self.assertEqual(pyproperties.IncludeError, type(errors[1][1]))
+
+    def testLoadManyProcesses(self):
+        self.check("process")
+
+    def testLoadManyThreads(self):
+        self.check("thread")
+
+    def testLoadManyReportsAnyError(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "port.properties")
+            with open(path, "w") as file: file.write("port=http\n")
+            schema = pyproperties.Schema({"port": int})
+            for executor in ["process", "thread"]:
+                properties, errors = pyproperties.load_many([path, self.paths[0]], workers=2, executor=executor, cast=schema)
+                self.assertEqual(None, properties[0])
+                self.assertEqual([path], [ path for path, error in errors ])
+                self.assertEqual(ValueError, type(errors[0][1]))
+                self.assertEqual(pyproperties.Properties(self.paths[0], cast=schema).properties, properties[1].properties)
+            properties, errors = asyncio.run(pyproperties.aload_many([path], cast=schema))
+            self.assertEqual([None], properties)
+            self.assertEqual(ValueError, type(errors[0][1]))
+        finally:
+            shutil.rmtree(directory)
+
+    def testLoadManyRaisesValueErrorOnInvalidExecutor(self):
+        self.assertRaises(ValueError, pyproperties.load_many, self.paths, executor="fiber")
+
+
+class AsyncTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.write_chunk_size = pyproperties.write_chunk_size
+        pyproperties.write_chunk_size = 16
+
+    def tearDown(self):
+        pyproperties.write_chunk_size = self.write_chunk_size
+        shutil.rmtree(self.directory)
+
+    def testAread(self):
+        path = "./data/properties/include_test/test.properties"
+        properties = asyncio.run(pyproperties.Properties.aread(path, cast=True))
+        expected = pyproperties.Properties(path, cast=True)
+        self.assertEqual(expected.properties, properties.properties)
+        self.assertEqual(expected.propcomments, properties.propcomments)
+        self.assertEqual(expected.listincludes(), properties.listincludes())
+        self.assertEqual(expected.path, properties.path)
+        self.assertFalse(properties.unsaved)
+
+    def testAreadRaisesReadErrorWhenFileNotFound(self):
+        self.assertRaises(pyproperties.ReadError, asyncio.run, pyproperties.Properties.aread("./data/properties/nonexistent.properties"))
+
+    def testAstore(self):
+        properties = pyproperties.Properties("./data/properties/foo.properties")
+        path, expected = (os.path.join(self.directory, "async.properties"), os.path.join(self.directory, "sync.properties"))
+        asyncio.run(properties.astore(path))
+        properties.store(expected)
+        with open(expected) as stored, open(path) as astored: self.assertEqual(stored.read(), astored.read())
+
+    def testExporterAstore(self):
+        properties = pyproperties.Properties("./data/properties/bar.properties")
+        path, expected = (os.path.join(self.directory, "async.json"), os.path.join(self.directory, "sync.json"))
+        asyncio.run(pyproperties.Exporter.JSON(properties).astore(path, pretty=True))
+        pyproperties.Exporter.JSON(properties).store(expected, pretty=True)
+        with open(expected) as stored, open(path) as astored: self.assertEqual(stored.read(), astored.read())
+
+    def testAloadMany(self):
+        paths = ["./data/properties/foo.properties", "./data/properties/nonexistent.properties", "./data/properties/bar.properties"]
+        properties, errors = asyncio.run(pyproperties.aload_many(paths, limit=2))
+        self.assertEqual(pyproperties.Properties(paths[0]).properties, properties[0].properties)
+        self.assertEqual(pyproperties.Properties(paths[2]).properties, properties[2].properties)
+        self.assertEqual(None, properties[1])
+        self.assertEqual([paths[1]], [ path for path, error in errors ])
+
 
 class ReaderIncludeTest(unittest.TestCase):
     def testIncludeRaisesIncludeErrorWhenFileNotFound(self):
@@ -368,6 +760,51 @@ class ReaderIncludeTest(unittest.TestCase):
         self.assertEqual(test.get('foo'), desired.get('foo'))
 
 
+    def testIncludeCycleRaisesIncludeError(self):
+        """
+        Method tested: `Reader.read()`
+        Tests if raises IncludeError when files include each other.
+        """
+        reader = pyproperties.Reader("./data/properties/include_test/cycle.a.properties")
+        self.assertRaises(pyproperties.IncludeError, reader.read)
+        reader = pyproperties.Reader("./data/properties/include_test/cycle.a.properties")
+        reader.loadf()
+        self.assertRaises(pyproperties.IncludeError, reader.makeincludes)
+
+    def testIncludeSameFileTwice(self):
+        """
+        Method tested: `Reader.read()`
+        Tests if file included several times is parsed once.
+        """
+        class CountingReader(pyproperties.Reader):
+            scanned = []
+            def _scan(self, path):
+                self.scanned.append(os.path.split(path)[1])
+                return pyproperties.Reader._scan(self, path)
+        reader = CountingReader("./data/properties/include_test/twice.properties")
+        reader.read()
+        self.assertEqual(["twice.properties", "foo.properties"], reader.scanned)
+        self.assertEqual("Foo", reader._properties["first.some.value"])
+        self.assertEqual("Foo", reader._properties["second.some.value"])
+        self.assertEqual(["first.commented.property", "second.some.value", "second.hello", "second.commented.property"], reader._hidden)
+        self.assertEqual([("foo.properties", "first", False, []), ("foo.properties", "second", True, [])], reader._includetree)
+
+    def testMakeIncludesMatchesRead(self):
+        """
+        Method tested: `Reader.makeincludes()`
+        Tests if preprocessing includes gives the same source as reading.
+        """
+        for path in ["./data/properties/include_test/test.properties", "./data/properties/include_test/twice.properties"]:
+            preprocessed = pyproperties.Reader(path)
+            preprocessed.loadf()
+            preprocessed.makeincludes()
+            preprocessed.uncoverhidden()
+            preprocessed.extractcomments()
+            reader = pyproperties.Reader(path)
+            reader.read()
+            self.assertEqual(reader._source, preprocessed._source)
+            self.assertEqual(reader._included, preprocessed._included)
+
 class PropertiesIncludeTests(unittest.TestCase):
     def testSetIncludeRaisesIncludeErrorWhenPathEmpty(self):
         p = pyproperties.Properties()
@@ -994,6 +1431,51 @@ class ParselineTest(unittest.TestCase):
         self.assertEqual("Hello World! Happy 7th day of week! Did you know that Pi is 3.14159?", foo.get("greeting", parse=True, cast=False))
 
 
+    def testClassifyKinds(self):
+        classify = pyproperties.Engine.LineParser.classify
+        self.assertEqual(("blank", None, None, None), classify(""))
+        self.assertEqual(("blank", None, None, None), classify("   "))
+        self.assertEqual(("comment", None, None, None), classify("# some comment"))
+        self.assertEqual(("comment", None, None, None), classify("! key=value"))
+        self.assertEqual(("hidden", "key", "=", "value"), classify("#key=value"))
+        self.assertEqual(("hidden", "key", ":", "value"), classify("!key:value"))
+        self.assertEqual(("property", "key", "=", "value"), classify("key=value"))
+        self.assertEqual(("text", None, None, None), classify("no separator here"))
+
+    def testClassifySeparatorAndValue(self):
+        classify = pyproperties.Engine.LineParser.classify
+        self.assertEqual(("property", "key", ":", "value "), classify("  key : value "))
+        self.assertEqual(("property", "key", "=", "a=b:c"), classify("key=a=b:c"))
+        self.assertEqual(("property", "key", "=", ""), classify("key="))
+
+    def testClassifyStrictAndNonStrict(self):
+        classify = pyproperties.Engine.LineParser.classify
+        self.assertEqual(("text", None, None, None), classify("some key=value"))
+        self.assertEqual(("property", "some key", "=", "value"), classify("some key=value", strict=False))
+        self.assertEqual(("hidden", "some key", ":", "value"), classify("#some key:value", strict=False))
+
+    def testClassifyLoneCommentCharacter(self):
+        classify = pyproperties.Engine.LineParser.classify
+        self.assertEqual(("comment", None, None, None), classify("#"))
+        self.assertEqual(("comment", None, None, None), classify("!"))
+        self.assertTrue(pyproperties.Engine.LineParser.iscomment("#"))
+        self.assertIsNone(pyproperties.Engine.LineParser.getlinekey("#"))
+
+    def testReadFileWithLoneCommentCharacter(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "lone.properties")
+            with open(path, "w") as file: file.write("#\n!\nkey=value\n")
+            self.assertEqual({"key": "value"}, pyproperties.Properties(path).properties)
+        finally:
+            shutil.rmtree(directory)
+
+    def testGetLineValueDropsNewline(self):
+        self.assertEqual("v", pyproperties.Engine.LineParser.getlinevalue("k=v\n"))
+        self.assertEqual("k", pyproperties.Engine.LineParser.getlinekey("k=v\n"))
+        self.assertIsNone(pyproperties.Engine.LineParser.getlinevalue("#k=v\n"))
+
+
 class ParseTest(unittest.TestCase):
     def testParse(self):
         bar = pyproperties.Properties(foo_path.replace("foo", "bar"))
@@ -1037,6 +1519,149 @@ class ParseTest(unittest.TestCase):
         self.assertEqual(pyproperties.Properties, type(pbar))
 
 
+class ResolveTest(unittest.TestCase):
+    def testResolveChain(self):
+        foo = pyproperties.Properties()
+        foo.set("key.0", "0")
+        for i in range(1, 5000): foo.set("key.{0}".format(i), "$(key.{0})".format(i-1))
+        self.assertEqual("0", foo.get("key.4999", parse=True))
+        self.assertEqual("0", pyproperties.Engine.parse(foo).get("key.2500"))
+
+    def testResolveSharedReferences(self):
+        foo = pyproperties.Properties()
+        foo.set("host", "localhost")
+        foo.set("port", 8080)
+        foo.set("url", "http://$(host):$(port)/")
+        foo.set("urls", "$(url) $(url)")
+        resolved = pyproperties.Engine.Resolver.resolve(foo)
+        self.assertEqual("http://localhost:8080/ http://localhost:8080/", resolved["urls"])
+        self.assertEqual(8080, resolved["port"])
+
+    def testResolveCycle(self):
+        foo = pyproperties.Properties()
+        foo.set("a", "$(b)")
+        foo.set("b", "x$(c)")
+        foo.set("c", "$(a)")
+        with self.assertRaises(pyproperties.ResolveError) as context: foo.get("a", parse=True)
+        self.assertIn("a -> b -> c -> a", str(context.exception))
+        self.assertRaises(KeyError, pyproperties.Engine.parse, foo)
+
+    def testResolveSelfReference(self):
+        foo = pyproperties.Properties()
+        foo.set("a", "$(a)")
+        self.assertRaises(pyproperties.ResolveError, foo.get, "a", parse=True)
+
+    def testResolveDanglingReference(self):
+        foo = pyproperties.Properties()
+        foo.set("a", "$(b)")
+        foo.set("b", "$(c)")
+        with self.assertRaises(KeyError) as context: foo.get("a", parse=True)
+        self.assertIn("a -> b -> c", str(context.exception))
+
+    def testResolveHiddenReference(self):
+        foo = pyproperties.Properties()
+        foo.set("a", "$(b)")
+        foo.set("b", "b")
+        self.assertEqual("b", foo.get("a", parse=True))
+        foo.hide("b")
+        self.assertRaises(pyproperties.ResolveError, foo.get, "a", parse=True)
+
+    def testResolveUnterminatedReference(self):
+        foo = pyproperties.Properties()
+        foo.set("a", "$(b")
+        foo.set("b", ") $(")
+        self.assertEqual("$(b", foo.get("a", parse=True))
+        self.assertEqual(") $(", foo.get("b", parse=True))
+
+
+class IncrementalResolveTest(unittest.TestCase):
+    def setUp(self):
+        self.foo = pyproperties.Properties()
+        self.foo.set("host", "localhost")
+        self.foo.set("port", "8080")
+        self.foo.set("url", "http://$(host):$(port)/")
+        self.foo.set("api", "$(url)api")
+        self.foo.set("name", "$(host)")
+        for key in ["url", "api", "name"]: self.foo.get(key, parse=True)
+
+    def testSetRerendersDependents(self):
+        self.foo.set("port", "9090")
+        hits = self.foo.cachestats()["hits"]
+        self.assertEqual("http://localhost:9090/api", self.foo.get("api", parse=True))
+        self.assertEqual("localhost", self.foo.get("name", parse=True))
+        self.assertEqual(hits + 2, self.foo.cachestats()["hits"])
+
+    def testSetDropsOnlyDependents(self):
+        self.foo.set("port", "9090")
+        self.assertEqual("localhost", self.foo._resolved["name"])
+        self.assertEqual({"url"}, self.foo._dependents["port"])
+        self.assertEqual(9090, self.foo.get("port", parse=True, cast=True))
+
+    def testSetChangesReferences(self):
+        self.foo.set("url", "http://$(name)/")
+        self.assertEqual("http://localhost/api", self.foo.get("api", parse=True))
+        self.foo.set("port", "1")
+        self.assertEqual("http://localhost/api", self.foo.get("api", parse=True))
+        self.foo.set("host", "example.com")
+        self.assertEqual("http://example.com/api", self.foo.get("api", parse=True))
+
+    def testSetCreatingCycle(self):
+        self.foo.set("host", "$(api)")
+        self.assertRaises(pyproperties.ResolveError, self.foo.get, "api", parse=True)
+        self.foo.set("host", "localhost")
+        self.assertEqual("http://localhost:8080/api", self.foo.get("api", parse=True))
+
+    def testRemoveAndHide(self):
+        self.foo.remove("port")
+        self.assertRaises(KeyError, self.foo.get, "api", parse=True)
+        self.assertEqual("localhost", self.foo.get("name", parse=True))
+        self.foo.set("port", "80")
+        self.foo.hide("host")
+        self.assertRaises(KeyError, self.foo.get, "name", parse=True)
+        self.foo.unhide("host")
+        self.assertEqual("http://localhost:80/api", self.foo.get("api", parse=True))
+
+
+class ResolvedViewTest(unittest.TestCase):
+    def setUp(self):
+        self.foo = pyproperties.Properties()
+        self.foo.set("host", "localhost")
+        self.foo.set("port", "8080")
+        self.foo.set("url", "http://$(host):$(port)/")
+        self.foo.set("secret", "x")
+        self.foo.hide("secret")
+
+    def testGet(self):
+        view = self.foo.resolved()
+        self.assertEqual("http://localhost:8080/", view.get("url"))
+        self.assertEqual("8080", view["port"])
+        self.assertRaises(KeyError, view.get, "secret")
+
+    def testGetCasted(self):
+        view = self.foo.resolved(cast=True)
+        self.assertEqual(8080, view.get("port"))
+        self.assertEqual([("host", "localhost"), ("port", 8080)], view.gets("[hp]*"))
+
+    def testKeys(self):
+        view = self.foo.resolved()
+        self.assertEqual(["host", "port", "url"], view.keys())
+        self.assertEqual(3, len(view))
+        self.assertIn("url", view)
+        self.assertNotIn("secret", view)
+
+    def testViewSharesStorage(self):
+        view = self.foo.resolved()
+        self.assertEqual("http://localhost:8080/", view.get("url"))
+        self.foo.set("host", "example.com")
+        self.assertEqual("http://example.com:8080/", view.get("url"))
+        self.assertIs(self.foo.properties, view._properties.properties)
+
+    def testViewIsReadOnly(self):
+        view = self.foo.resolved()
+        for name in ["set", "sets", "remove", "pop", "hide"]: self.assertFalse(hasattr(view, name))
+        with self.assertRaises(TypeError): view["url"] = "value"
+
+
 class ConvertTest(unittest.TestCase):
     def testIntegerConversion(self):
         examples = [("3", 3),
@@ -1108,6 +1733,32 @@ class ConvertTest(unittest.TestCase):
     def testNoneConversion(self):
         self.assertEqual(pyproperties.Engine.Converter.convert("None"), None)
 
+    def testValuesWhichAreNotConverted(self):
+        for s in ["", "foo", " 3", "3 ", "0.5", "1_000", "0b12", "0o8", "None\n", "-"]:
+            self.assertEqual(s, pyproperties.Engine.Converter.convert(s))
+
+    def testConvertMany(self):
+        values = ["3", "-0b110101001", "0o26", "-0xa2", "3.14", "6.02e-23", "True", "False", "None", "foo", "", 7]
+        self.assertEqual([ pyproperties.Engine.Converter.convert(value) for value in values ], pyproperties.Engine.Converter.convert_many(values))
+
+    def testConvertManyColumn(self):
+        convert_many = pyproperties.Engine.Converter.convert_many
+        self.assertEqual([1, 16, -2], convert_many(["1", "0x10", "-0b10"], column=True))
+        self.assertEqual([1.0, 3.14], convert_many(["1", "3.14"], column=True))
+        self.assertEqual([True, False], convert_many(["True", "False"], column=True))
+        self.assertEqual(["1", "foo"], convert_many(["1", "foo"], column=True))
+        self.assertEqual(["True", "1"], convert_many(["True", "1"], column=True))
+        self.assertEqual([], convert_many([], column=True))
+
+    def testConvertManyColumnFallsBackWhenFirstValueDoesNotFit(self):
+        convert_many = pyproperties.Engine.Converter.convert_many
+        self.assertEqual([2, 3, 4], convert_many(["2", "3", 4], column=True))
+        self.assertEqual([2.0, 3.14, 4.0], convert_many(["2", "3.14", "4"], column=True))
+        self.assertEqual([3.14, 16.0], convert_many(["3.14", "0x10"], column=True))
+        self.assertEqual(["2", "1\n2"], convert_many(["2", "1\n2"], column=True))
+        self.assertEqual(["None", "None\n"], convert_many(["None", "None\n"], column=True))
+        self.assertEqual(["foo", "1"], convert_many(["foo", "1"], column=True))
+
 
 class BlankTest(unittest.TestCase):
     def testBlank(self):
@@ -1204,11 +1855,126 @@ class ReadFromPropertiesTest(unittest.TestCase):
         self.assertEqual(test.keys(), keys)
 
 
+
+class LazyReadTest(unittest.TestCase):
+    def testLazyValuesAreParsedOnFirstAccess(self):
+        lazy = pyproperties.Properties("./data/properties/foo.properties", lazy=True)
+        self.assertEqual(pyproperties.LazyValues, type(lazy.properties))
+        self.assertFalse(lazy.properties.isloaded("numeral.int"))
+        self.assertEqual("3", lazy.get("numeral.int"))
+        self.assertTrue(lazy.properties.isloaded("numeral.int"))
+        self.assertFalse(lazy.properties.isloaded("numeral.float.0"))
+
+    def testLazyReadGivesSameValues(self):
+        paths = [
+                "./data/properties/foo.properties",
+                "./data/properties/bar.properties",
+                "./data/properties/reader_test/foo.splitted.properties",
+                "./data/properties/include_test/test.commented.prefix.properties",
+                ]
+        for path in paths:
+            for cast in [False, True]:
+                eager = pyproperties.Properties(path, cast=cast)
+                lazy = pyproperties.Properties(path, cast=cast, lazy=True)
+                self.assertEqual(eager.keys(hidden=True), lazy.keys(hidden=True))
+                self.assertEqual(eager.properties, dict(lazy.properties))
+                self.assertEqual(eager.propcomments, lazy.propcomments)
+                self.assertEqual(eager.hidden, lazy.hidden)
+
+    def testLazyStore(self):
+        eager = pyproperties.Properties("./data/properties/foo.properties", cast=True)
+        lazy = pyproperties.Properties("./data/properties/foo.properties", cast=True, lazy=True)
+        lazy.set("numeral.int", 4)
+        eager.set("numeral.int", 4)
+        lazy.save()
+        eager.save()
+        ewriter, lwriter = (pyproperties.Writer(eager), pyproperties.Writer(lazy))
+        ewriter.store(no_dump=True)
+        lwriter.store(no_dump=True)
+        self.assertEqual(ewriter.lines, lwriter.lines)
+        self.assertFalse(lazy.properties.isloaded("numeral.float.0"))
+        self.assertFalse(lazy.origin_properties.isloaded("numeral.float.0"))
+
+    def testLazyReadOfWindowsLineEndings(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "crlf.properties")
+            with open(path, "wb") as file: file.write(b"#   comment\r\nkey.0=a \\\r\n  b\r\n#key.1=c\r\nkey.2 : d\r\n")
+            eager, lazy = (pyproperties.Properties(path), pyproperties.Properties(path, lazy=True))
+            self.assertEqual(eager.properties, dict(lazy.properties))
+            self.assertEqual(eager.propcomments, lazy.propcomments)
+            self.assertEqual(eager.hidden, lazy.hidden)
+        finally:
+            shutil.rmtree(directory)
+
+    def testFileIsOpenedOnceForValues(self):
+        lazy = pyproperties.Properties("./data/properties/foo.properties", lazy=True)
+        opened = []
+        pyproperties.open = lambda *args, **kwargs: opened.append(args[0]) or open(*args, **kwargs)
+        try:
+            for key in lazy.keys(): lazy.get(key)
+        finally:
+            del pyproperties.open
+        self.assertEqual([os.path.abspath("./data/properties/foo.properties")], opened)
+
 class KeyAndValuesGetterTest(unittest.TestCase):
     def testGetKeysOf(self):
         foo = pyproperties.Properties("./data/properties/foo.properties")
         self.assertEqual(["literal.string.0", "literal.string.1"], sorted(foo.getkeysof("Hello World!")))
     
+    def testGetKeysOfHidden(self):
+        foo = pyproperties.Properties()
+        foo.set("a", "localhost")
+        foo.set("b", "localhost")
+        foo.set("c", "example.com")
+        foo.hide("b")
+        self.assertEqual(["a"], foo.getkeysof("localhost"))
+        self.assertEqual(["b"], foo.getkeysof("localhost", no_hidden=False))
+        self.assertEqual([], foo.getkeysof("example.com", no_hidden=False))
+        foo.unhide("b")
+        foo.set("a", "example.com")
+        self.assertEqual(["b"], foo.getkeysof("localhost"))
+        self.assertEqual(["a", "c"], sorted(foo.getkeysof("example.com")))
+        foo.remove("c")
+        foo.pop("b")
+        self.assertEqual([], foo.getkeysof("localhost"))
+        self.assertEqual(["a"], foo.getkeysof("example.com"))
+
+    def testGetKeysOfCasted(self):
+        foo = pyproperties.Properties()
+        foo.set("http.port", "8080")
+        foo.set("proxy.port", 8080)
+        foo.set("name", "8080th")
+        self.assertEqual(["proxy.port"], foo.getkeysof(8080))
+        self.assertEqual(["http.port", "proxy.port"], sorted(foo.getkeysof(8080, cast=True)))
+        foo.set("http.port", "80")
+        self.assertEqual(["http.port"], foo.getkeysof(80, cast=True))
+        foo.setschema(pyproperties.Schema({"http.port": str}))
+        self.assertEqual(["http.port"], foo.getkeysof("80", cast=True))
+
+    def testGetKeysOfKeepsOrderOfProperties(self):
+        foo = pyproperties.Properties()
+        for key in ["c", "a", "b", "d"]: foo.set(key, "x" if key != "d" else "y")
+        self.assertEqual(["c", "a", "b"], foo.getkeysof("x"))
+        foo.set("a", "y")
+        foo.set("a", "x")
+        foo.hide("b")
+        foo.hide("c")
+        foo.unhide("c")
+        self.assertEqual(["c", "a"], foo.getkeysof("x"))
+        self.assertEqual(["b"], foo.getkeysof("x", no_hidden=False))
+        foo.remove("c")
+        foo.set("c", "x")
+        self.assertEqual(["a", "c"], foo.getkeysof("x"))
+        self.assertEqual([ key for key in foo.properties if foo.properties[key] == "x" and key not in foo.hidden ], foo.getkeysof("x"))
+
+    def testGetKeysOfUnhashable(self):
+        foo = pyproperties.Properties()
+        foo.set("a", [1, 2])
+        foo.set("b", "x")
+        self.assertEqual(["a"], foo.getkeysof([1, 2]))
+        self.assertEqual([], foo.getkeysof([1]))
+
     def testKeys(self):
         foo = pyproperties.Properties()
         foo.set("foo")
@@ -1239,6 +2005,137 @@ class KeyAndValuesGetterTest(unittest.TestCase):
         self.assertEqual(["Bar"], foo.values())
         self.assertListEqual(["Bar", "Foo"], foo.values(hidden=True))
 
+    def testKeysFollowChanges(self):
+        foo = pyproperties.Properties()
+        for key in ["c", "a", "e"]: foo.set(key)
+        keys = foo.keys()
+        keys.append("z")
+        self.assertEqual(["a", "c", "e"], foo.keys())
+        foo.set("b")
+        foo.hide("c")
+        foo.remove("e")
+        self.assertEqual(["a", "b"], foo.keys())
+        self.assertEqual(["a", "b", "c"], foo.keys(hidden=True))
+        foo.unhide("c")
+        foo.pop("a")
+        self.assertEqual(["b", "c"], foo.keys())
+        foo.properties["d"] = "D"
+        self.assertEqual(["b", "c", "d"], foo.keys())
+        foo.hidden.append("b")
+        self.assertEqual(["c", "d"], foo.keys())
+
+    def testDirectEditIsNoticed(self):
+        foo = pyproperties.Properties()
+        foo.set("a.0", "x")
+        foo.set("b", "y")
+        self.assertEqual(["a.0", "b"], foo.keys())
+        self.assertEqual(["a.0"], foo.getkeysof("x"))
+        self.assertEqual("x", foo.get("a.0", cast=True))
+        del foo.properties["a.0"]
+        foo.properties["a.1"] = "z"
+        self.assertEqual(["a.1", "b"], foo.keys())
+        self.assertEqual([("a.1", "z")], foo.gets("a.*"))
+        self.assertEqual([], foo.getkeysof("x"))
+        self.assertEqual(["a.1"], foo.getkeysof("z"))
+        self.assertEqual(["a.*", "b"], foo.getsingles())
+        foo.properties = {"c": "x"}
+        self.assertEqual(["c"], foo.getkeysof("x"))
+        foo.set("d", "x")
+        self.assertEqual(["c", "d"], foo.getkeysof("x"))
+
+    def testInvalidateAfterValueModifiedInPlace(self):
+        foo = pyproperties.Properties()
+        foo.set("a", [1])
+        self.assertEqual(["a"], foo.getkeysof([1]))
+        foo.properties["a"].append(2)
+        foo.invalidate()
+        self.assertEqual(["a"], foo.getkeysof([1, 2]))
+
+
+class HiddenKeysTest(unittest.TestCase):
+    def testBehavesLikeList(self):
+        hidden = pyproperties.HiddenKeys(["b", "a", "b"])
+        hidden.append("c")
+        hidden.append("a")
+        self.assertEqual(["b", "a", "c"], hidden)
+        self.assertEqual(hidden, ["b", "a", "c"])
+        self.assertEqual("c", hidden[-1])
+        self.assertEqual(["a", "c"], hidden[1:])
+        self.assertIn("a", hidden)
+        hidden.remove("a")
+        self.assertNotIn("a", hidden)
+        self.assertRaises(ValueError, hidden.remove, "a")
+        self.assertEqual(["b", "c"], hidden)
+
+    def testPropertiesKeepHiddenKeys(self):
+        foo = pyproperties.Properties("./data/properties/reader_test/foo.hidden.properties")
+        self.assertIsInstance(foo.hidden, pyproperties.HiddenKeys)
+        foo.unhide("foo")
+        foo.save()
+        foo.hide("foo")
+        foo.revert()
+        self.assertIsInstance(foo.hidden, pyproperties.HiddenKeys)
+        self.assertEqual(["bar"], foo.hidden)
+
+
+class MatcherTest(unittest.TestCase):
+    def testMatcherAgreesWithExpandedIdentifier(self):
+        keys = ["a", "a.b", "a.b.c", "a.0.c", "a.0.1.c", "a.", ".c", "a b.c", "x-y.0", "ab.c"]
+        identifiers = ["a", "a.b", "a.*", "*.c", "a.*.c", "*", "a.*.*", "[ab].*", "x-y.*", "a.*c"]
+        for identifier in identifiers:
+            expected = [ key for key in keys if re.match(pyproperties.Engine.expandidentifier(identifier), key) ]
+            self.assertEqual(expected, pyproperties.Engine.matcher(identifier)(keys), identifier)
+
+    def testMatcherIsCached(self):
+        self.assertIs(pyproperties.Engine.matcher("customer.*.name"), pyproperties.Engine.matcher("customer.*.name"))
+
+    def testMatcherNoExpand(self):
+        self.assertEqual(["a.1"], pyproperties.Engine.matcher("^a\\.[0-9]$", no_expand=True)(["a.1", "a.b"]))
+
+
+class KeyTrieTest(unittest.TestCase):
+    def setUp(self):
+        self.keys = ["customer.0.name", "customer.0.email", "customer.1.name", "customer.1.x.name", "customer", "order.0.name", "a..name"]
+        self.trie = pyproperties.KeyTrie(self.keys)
+
+    def testMatch(self):
+        for identifier in ["customer.*.name", "customer.*", "*.name", "*", "customer", "customer.0.name", "nothing.*", "a.*.name"]:
+            expected = [ key for key in self.keys if re.match(pyproperties.Engine.expandidentifier(identifier), key) ]
+            self.assertEqual(sorted(expected), sorted(self.trie.match(identifier)), identifier)
+
+    def testMatchNotWalkable(self):
+        self.assertIsNone(self.trie.match("customer.*.*"))
+        self.assertIsNone(self.trie.match("cust*.0.name"))
+        self.assertIsNone(self.trie.match("[co].*"))
+
+    def testDiscard(self):
+        self.trie.discard("customer.1.x.name")
+        self.trie.discard("not.there")
+        self.assertEqual(["customer.0.name", "customer.1.name"], sorted(self.trie.match("customer.*.name")))
+        self.assertEqual(len(self.keys) - 1, self.trie.size)
+
+    def testPropertiesKeepIndexUpToDate(self):
+        foo = pyproperties.Properties()
+        for key in self.keys: foo.set(key, "value")
+        self.assertEqual(["customer.0.name", "customer.1.name", "customer.1.x.name"], [ key for key, value in foo.gets("customer.*.name") ])
+        foo.remove("customer.0.name")
+        foo.pop("customer.1.x.name")
+        foo.set("customer.2.name", "value")
+        self.assertEqual(["customer.1.name", "customer.2.name"], [ key for key, value in foo.gets("customer.*.name") ])
+        foo.hide("customer.1.name")
+        self.assertEqual(["customer.2.name"], [ key for key, value in foo.gets("customer.*.name") ])
+        foo.save()
+        foo.set("customer.3.name", "value")
+        foo.revert()
+        self.assertEqual(["customer.2.name"], [ key for key, value in foo.gets("customer.*.name") ])
+
+    def testIndexFollowsDirectEdits(self):
+        foo = pyproperties.Properties()
+        foo.set("a.0", "x")
+        self.assertEqual([("a.0", "x")], foo.gets("a.*"))
+        foo.properties["a.1"] = "y"
+        self.assertEqual([("a.0", "x"), ("a.1", "y")], foo.gets("a.*"))
+
 
 class GetterTest(unittest.TestCase):
     def testGet(self):
@@ -1249,6 +2146,23 @@ class GetterTest(unittest.TestCase):
         foo = pyproperties.Properties(foo_path)
         self.assertRaises(KeyError, foo.get, "foo")
 
+    def testGetMany(self):
+        foo = pyproperties.Properties()
+        foo.set_many({"host": "localhost", "port": "8080", "url": "http://$(host):$(port)/"})
+        self.assertEqual({"url": "http://$(host):$(port)/", "port": "8080"}, foo.get_many(["url", "port"]))
+        self.assertEqual({"url": "http://localhost:8080/", "port": "8080"}, foo.get_many(["url", "port"], parse=True))
+        self.assertEqual({"port": 8080, "host": "localhost"}, foo.get_many(["port", "host"], cast=True))
+        self.assertEqual(foo.get("url", parse=True, cast=True), foo.get_many(["url"], parse=True, cast=True)["url"])
+        foo.set("port", "80")
+        self.assertEqual({"url": "http://localhost:80/"}, foo.get_many(["url"], parse=True))
+
+    def testGetManyRaisesErrorBeforeParsing(self):
+        foo = pyproperties.Properties()
+        foo.set_many({"a": "$(b)", "b": "B", "c": "C"})
+        foo.hide("c")
+        self.assertRaises(KeyError, foo.get_many, ["a", "c"], parse=True)
+        self.assertNotIn("a", foo._resolved)
+
     def testGetCastedInteger(self):
         foo = pyproperties.Properties()
         foo.set("two", "2")
@@ -1319,6 +2233,141 @@ class GetterTest(unittest.TestCase):
         self.assertRaises(TypeError, foo.gets, 0)
 
 
+class ValueCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.foo = pyproperties.Properties(foo_path)
+
+    def testCastedValueIsCached(self):
+        self.assertEqual(3, self.foo.get("numeral.int", cast=True))
+        self.assertEqual(3, self.foo.get("numeral.int", cast=True))
+        stats = self.foo.cachestats()
+        self.assertEqual((1, 1, 1), (stats["hits"], stats["misses"], stats["entries"]))
+        self.assertEqual(set(["hits", "misses", "entries", "size"]), set(stats["converter"]))
+
+    def testSetInvalidatesCastedValue(self):
+        self.foo.get("numeral.int", cast=True)
+        self.foo.set("numeral.int", "4")
+        self.assertEqual(4, self.foo.get("numeral.int", cast=True))
+
+    def testSetInvalidatesParsedValues(self):
+        self.foo.set("ref", "$(numeral.int)")
+        self.assertEqual(3, self.foo.get("ref", parse=True, cast=True))
+        self.assertEqual("3", self.foo.get("ref", parse=True))
+        self.foo.set("numeral.int", "5")
+        self.assertEqual(5, self.foo.get("ref", parse=True, cast=True))
+        self.assertEqual("5", self.foo.get("ref", parse=True))
+
+    def testRemoveAndPopInvalidateCastedValue(self):
+        self.foo.get("numeral.int", cast=True)
+        self.foo.remove("numeral.int")
+        self.assertRaises(KeyError, self.foo.get, "numeral.int", cast=True)
+        self.foo.set("numeral.int", "6")
+        self.assertEqual(6, self.foo.pop("numeral.int", cast=True))
+        self.assertRaises(KeyError, self.foo.get, "numeral.int", cast=True)
+
+    def testRevertInvalidatesCastedValue(self):
+        self.foo.set("numeral.int", "7")
+        self.assertEqual(7, self.foo.get("numeral.int", cast=True))
+        self.foo.revert()
+        self.assertEqual(3, self.foo.get("numeral.int", cast=True))
+
+    def testMergeUpdateAndCompleteInvalidateCastedValues(self):
+        self.foo.get("numeral.int", cast=True)
+        other = pyproperties.Properties()
+        other.set("numeral.int", "8")
+        other.set("new", "9")
+        other.save()
+        self.foo.update(other)
+        self.assertEqual(8, self.foo.get("numeral.int", cast=True))
+        self.foo.complete(other)
+        self.assertEqual(9, self.foo.get("new", cast=True))
+        self.foo.set("numeral.int", "1")
+        self.foo.get("numeral.int", cast=True)
+        self.foo.merge(other)
+        self.assertEqual(8, self.foo.get("numeral.int", cast=True))
+
+    def testHiddenPropertyIsNotServedFromCache(self):
+        self.foo.get("numeral.int", cast=True)
+        self.foo.hide("numeral.int")
+        self.assertRaises(KeyError, self.foo.get, "numeral.int", cast=True)
+
+
+class SchemaTest(unittest.TestCase):
+    def setUp(self):
+        self.schema = pyproperties.Schema({"numeral.float.*": float, "numeral.int": str, "customer.*.postal_code": str, "flag.*": bool, "hex.*": int})
+
+    def testCompile(self):
+        table = self.schema.compile(["numeral.float.0", "numeral.int", "person.name", "hex.a"])
+        self.assertEqual(set(["numeral.float.0", "numeral.int", "hex.a"]), set(table))
+        self.assertEqual(float, table["numeral.float.0"])
+
+    def testConvert(self):
+        values = {"numeral.float.0": "3.14", "numeral.float.1": ".14", "numeral.int": "3", "flag.a": "True", "flag.b": "False", "hex.a": "0x10", "other": "3"}
+        self.assertEqual({"numeral.float.0": 3.14, "numeral.float.1": 0.14, "numeral.int": "3", "flag.a": True, "flag.b": False, "hex.a": 16, "other": "3"}, 
+                         self.schema.convert(values))
+
+    def testConvertRaisesValueErrorWithKey(self):
+        with self.assertRaisesRegex(ValueError, "flag.a"): self.schema.convert({"flag.a": "yes"})
+        with self.assertRaisesRegex(ValueError, "flag.a"): self.schema.cast("flag.a", "yes")
+
+    def testGetUsesSchema(self):
+        foo = pyproperties.Properties(foo_path)
+        foo.setschema(self.schema)
+        self.assertEqual(0.14, foo.get("numeral.float.1", cast=True))
+        self.assertEqual("3", foo.get("numeral.int", cast=True))
+        self.assertEqual("80-999", foo.get("customer.0.postal_code", cast=True))
+        foo.set("flag.new", "True")
+        self.assertEqual(True, foo.get("flag.new", cast=True))
+        foo.set("other.int", "5")
+        self.assertEqual(5, foo.get("other.int", cast=True))
+        foo.setschema(None)
+        self.assertEqual(3, foo.get("numeral.int", cast=True))
+
+    def testReadWithSchema(self):
+        foo = pyproperties.Properties(foo_path, cast=self.schema)
+        self.assertEqual(0.14, foo.properties["numeral.float.1"])
+        self.assertEqual("3", foo.properties["numeral.int"])
+        self.assertEqual("X", foo.properties["person.name"])
+        self.assertIs(self.schema, foo.getschema())
+        lazy = pyproperties.Properties(foo_path, cast=self.schema, lazy=True)
+        self.assertEqual(foo.properties, dict(lazy.properties))
+        reader = pyproperties.Reader(foo_path, cast=self.schema)
+        streamed = dict([ (key, value) for key, value, comment, hidden, lineno in reader.iterprops() ])
+        self.assertEqual(foo.properties, streamed)
+
+    def testKeysNotInSchemaAreGuessedEverywhere(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "partial.properties")
+            with open(path, "w") as file: file.write("name=8080\nport=8080\nratio=0.25\nflag=True\nlabel=text\n")
+            schema = pyproperties.Schema({"name": str})
+            expected = {"name": "8080", "port": 8080, "ratio": 0.25, "flag": True, "label": "text"}
+            foo = pyproperties.Properties(path, cast=schema)
+            self.assertEqual(expected, foo.properties)
+            self.assertEqual(expected, dict(pyproperties.Properties(path, cast=schema, lazy=True).properties))
+            streamed = pyproperties.Reader(path, cast=schema).iterprops()
+            self.assertEqual(expected, dict([ (key, value) for key, value, comment, hidden, lineno in streamed ]))
+            raw = pyproperties.Properties(path)
+            raw.setschema(schema)
+            self.assertEqual(expected, dict([ (key, raw.get(key, cast=True)) for key in raw.keys() ]))
+            self.assertEqual(expected, raw.castall())
+            self.assertEqual(8080, foo.get("port", cast=True))
+            self.assertEqual("8080", schema.cast("port", "8080"))
+            self.assertEqual(8080, schema.cast("port", "8080", guess=True))
+        finally:
+            shutil.rmtree(directory)
+
+    def testCastAll(self):
+        foo = pyproperties.Properties(foo_path)
+        foo.setschema(self.schema)
+        values = foo.castall()
+        self.assertEqual(0.14, values["numeral.float.1"])
+        self.assertEqual("3", values["numeral.int"])
+        self.assertEqual("X", values["person.name"])
+        self.assertNotIn("customer.0.phone_number.1", values)
+        for key, value in values.items(): self.assertEqual(foo.get(key, cast=True), value)
+
+
 class SetterTest(unittest.TestCase):
     def testSet(self):
         keys =  [
@@ -1348,6 +2397,37 @@ class SetterTest(unittest.TestCase):
         for key, value in contents:
             self.assertEqual(value, foo.get(key))
 
+    def testSetMany(self):
+        foo = pyproperties.Properties()
+        foo.set("a", "$(b)-$(c)")
+        foo.set("b", "B")
+        foo.set("c", "C")
+        foo.set("d", "D")
+        foo.comment("d", "hidden")
+        foo.hide("d")
+        self.assertEqual("B-C", foo.get("a", parse=True))
+        foo.save()
+        foo.set_many([("b", "b"), ("c", "c"), ("d", "d"), ("e.0", "e")])
+        self.assertTrue(foo.unsaved)
+        self.assertEqual(["a", "b", "c", "d", "e.0"], foo.keys())
+        self.assertEqual("b-c", foo.get("a", parse=True))
+        self.assertEqual("", foo.getcomment("d"))
+        self.assertEqual(["e.0"], foo.getkeysof("e"))
+
+    def testSetManyChecksKeysFirst(self):
+        foo = pyproperties.Properties()
+        self.assertRaises(TypeError, foo.set_many, {"a": "A", "some key": "B"})
+        self.assertEqual([], foo.keys())
+        self.assertFalse(foo.unsaved)
+
+    def testSetManyLargeBatch(self):
+        foo = pyproperties.Properties()
+        foo.set("b", "B")
+        foo.hide("b")
+        self.assertEqual(["b"], foo.keys(hidden=True))
+        foo.set_many(dict([ ("key.{0:04}".format(i), str(i)) for i in range(pyproperties.bulk_size + 1) ] + [("b", "b")]))
+        self.assertEqual(["b"] + [ "key.{0:04}".format(i) for i in range(pyproperties.bulk_size + 1) ], foo.keys())
+
     def testAdd(self):
         p = pyproperties.Properties()
         for i in range(3): p.add("foo.*", i)
@@ -1382,6 +2462,20 @@ class RemoverTest(unittest.TestCase):
         foo.removes("foo.*")
         self.assertEqual(["bar.0"], foo.keys())
 
+    def testRemoveMany(self):
+        foo = pyproperties.Properties()
+        foo.set_many({"a": "$(b)", "b": "B", "c": "C", "d": "D"})
+        foo.hide("c")
+        self.assertEqual("B", foo.get("a", parse=True))
+        foo.save()
+        foo.remove_many(["b", "c", "not.there"])
+        self.assertTrue(foo.unsaved)
+        self.assertEqual(["a", "d"], foo.keys(hidden=True))
+        self.assertEqual([], foo.hidden)
+        self.assertRaises(KeyError, foo.get, "a", parse=True)
+        foo.remove_many([ key for key in foo.keys() ] * (pyproperties.bulk_size + 1))
+        self.assertEqual([], foo.keys())
+
 
 class PopperTest(unittest.TestCase):
     def testPop(self):
@@ -1468,6 +2562,43 @@ class GroupingTest(unittest.TestCase):
         self.assertListEqual(sorted(singles), sorted(foo.getsingles()))
 
 
+    def testGetSinglesReturnsIdentifiers(self):
+        foo = pyproperties.Properties()
+        for key in ["language.0", "language.1", "version.3", "customer.0x9.name", "customer.0xa.name"]: foo.set(key, "")
+        self.assertEqual(["customer.*.name", "language.*"], foo.getgroups())
+        self.assertEqual(["customer.0x9.name", "customer.0xa.name", "version.*"], foo.getsingles())
+
+    def testGroupIncludesKeysMatchedByIdentifier(self):
+        foo = pyproperties.Properties()
+        for key in ["customer.0.name", "customer.vip.name", "person.0.name"]: foo.set(key, "")
+        self.assertEqual(["customer.*.name"], foo.getgroups())
+        self.assertEqual(["customer.vip.name", "person.*.name"], foo.getsingles())
+        foo.hide("customer.vip.name")
+        self.assertEqual([], foo.getgroups())
+
+    def testGroupsFollowChanges(self):
+        foo = pyproperties.Properties()
+        foo.set("language.0", "Python")
+        self.assertEqual([], foo.getgroups())
+        foo.set("language.1", "C")
+        self.assertEqual(["language.*"], foo.getgroups())
+        foo.hide("language.1")
+        self.assertEqual([], foo.getgroups())
+        self.assertEqual(["language.*"], foo.getsingles())
+        foo.unhide("language.1")
+        foo.set("language.2", "Lua")
+        foo.remove("language.0")
+        foo.pop("language.1")
+        self.assertEqual([], foo.getgroups())
+        foo.properties["language.3"] = "Go"
+        self.assertEqual(["language.*"], foo.getgroups())
+
+    def testGroupIdentifier(self):
+        self.assertEqual("customer.*.name", pyproperties.Engine.groupidentifier("customer.0x1f.name"))
+        self.assertEqual("a.*.*.b", pyproperties.Engine.groupidentifier("a.-3.0o7.b"))
+        self.assertEqual("a.0b1.x1", pyproperties.Engine.groupidentifier("a.0b1.x1"))
+
+
 class CopyTest(unittest.TestCase):
     def testEquality(self):
         foo = pyproperties.Properties(foo_path)
@@ -1741,6 +2872,217 @@ class ReloadTest(unittest.TestCase):
         self.assertEqual(foo0.origin_hidden, foo1.origin_hidden)
 
 
+class IncrementalReloadTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.main = os.path.join(self.directory, "main.properties")
+        self.included = os.path.join(self.directory, "included.properties")
+        self.write(self.main, "#   comment of a\na=A\nb=B\n#c=C\n__include__.as.inc=included.properties\n")
+        self.write(self.included, "x=X\ny=Y\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, path, text):
+        try: stat = os.stat(path)
+        except OSError: stat = None
+        with open(path, "w") as file: file.write(text)
+        if stat is not None: os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def testFirstIncrementalReloadComparesWithSavedState(self):
+        properties = pyproperties.Properties(self.main)
+        self.write(self.included, "x=X\ny=Z\n")
+        self.assertEqual({"added": [], "removed": [], "modified": ["inc.y"]}, properties.reload(incremental=True))
+        self.assertEqual("Z", properties.get("inc.y"))
+        self.assertTrue(properties.unsaved)
+
+    def testUnchangedFilesAreNotParsed(self):
+        properties = pyproperties.Properties(self.main)
+        properties.reload(incremental=True)
+        tokens = dict(properties._reloadstate.tokencache)
+        properties.set("local", "value")
+        self.assertEqual({"added": [], "removed": [], "modified": []}, properties.reload(incremental=True))
+        self.assertEqual("value", properties.get("local"))
+        self.write(self.included, "x=X\ny=Z\n")
+        properties.reload(incremental=True)
+        main, included = (os.path.realpath(self.main), os.path.realpath(self.included))
+        self.assertIs(tokens[main][1], properties._reloadstate.tokencache[main][1])
+        self.assertIsNot(tokens[included][1], properties._reloadstate.tokencache[included][1])
+
+    def testParsedValuesOfChangedKeysAreDropped(self):
+        self.write(self.main, "a=$(inc.x)\nb=$(inc.y)\n__include__.as.inc=included.properties\n")
+        properties = pyproperties.Properties(self.main)
+        self.assertEqual(("X", "Y"), (properties.get("a", parse=True), properties.get("b", parse=True)))
+        self.write(self.included, "x=X\ny=Z\n")
+        properties.reload(incremental=True)
+        self.assertIn("a", properties._resolved)
+        self.assertEqual("Z", properties.get("b", parse=True))
+
+    def testChangesAreApplied(self):
+        properties = pyproperties.Properties(self.main)
+        properties.reload(incremental=True)
+        properties.set("local", "value")
+        self.write(self.main, "a=A\n#b=B\nc=C\n__include__.as.inc=included.properties\n")
+        self.write(self.included, "x=X\nz=Z\n")
+        changes = properties.reload(incremental=True)
+        self.assertEqual({"added": ["inc.z"], "removed": ["inc.y"], "modified": ["a", "b", "c"]}, changes)
+        self.assertEqual("", properties.getcomment("a"))
+        self.assertIn("b", properties.hidden)
+        self.assertNotIn("c", properties.hidden)
+        self.assertEqual("value", properties.get("local"))
+        self.assertEqual(pyproperties.Properties(self.main).source, properties.source)
+
+    def testChangedIncludeIsSplicedWithoutReadingOtherFiles(self):
+        self.write(self.main, "a=A\n#   comment of x\n__include__.as.inc=included.properties\n__include__.as.other=included.properties\nz=Z\n")
+        properties = pyproperties.Properties(self.main)
+        properties.reload(incremental=True)
+        self.write(self.included, "w=W\nx=X\n#   trailing\n")
+        tokenize = pyproperties.Reader.tokenize
+        pyproperties.Reader.tokenize = None
+        try: changes = properties.reload(incremental=True)
+        finally: pyproperties.Reader.tokenize = tokenize
+        self.assertEqual({"added": ["inc.w", "other.w"], "removed": ["inc.y", "other.y"], "modified": ["inc.x", "z"]}, changes)
+        fresh = pyproperties.Properties(self.main)
+        self.assertEqual((fresh.properties, fresh.propcomments, fresh.source), (properties.properties, properties.propcomments, properties.source))
+        self.assertEqual("comment of x", properties.getcomment("inc.w"))
+
+    def testKeysDefinedInManyFilesAreReloadedFromAllFiles(self):
+        self.write(self.main, "__include__.as.inc=included.properties\ninc.y=main\n")
+        properties = pyproperties.Properties(self.main)
+        properties.reload(incremental=True)
+        self.write(self.included, "x=X\ny=Z\nw=W\n")
+        self.assertEqual({"added": ["inc.w"], "removed": [], "modified": []}, properties.reload(incremental=True))
+        self.assertEqual("main", properties.get("inc.y"))
+
+    def testLazyPropertiesAreReloadedLazily(self):
+        properties = pyproperties.Properties(self.main, lazy=True)
+        properties.reload(incremental=True)
+        self.write(self.included, "x=changed X\ny=Y\n")
+        self.assertEqual({"added": [], "removed": [], "modified": ["inc.x"]}, properties.reload(incremental=True))
+        self.assertFalse(properties.properties.isloaded("inc.x"))
+        self.assertEqual(("changed X", "Y"), (properties.get("inc.x"), properties.get("inc.y")))
+
+    def testRemovedIncludeIsForgotten(self):
+        properties = pyproperties.Properties(self.main)
+        properties.reload(incremental=True)
+        self.write(self.main, "a=A\n")
+        changes = properties.reload(incremental=True)
+        self.assertEqual(["b", "c", "inc.x", "inc.y"], changes["removed"])
+        self.assertEqual([], properties.listincludes())
+        self.assertEqual([os.path.realpath(self.main)], list(properties._reloadstate.tokencache))
+
+
+class WatchTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.paths = [ os.path.join(self.directory, "{0}.properties".format(name)) for name in ["a", "b"] ]
+        for path in self.paths: self.write(path, "key=value\n")
+
+    def tearDown(self):
+        with pyproperties.watcher._lock: pyproperties.watcher._entries.clear()
+        shutil.rmtree(self.directory)
+
+    def write(self, path, text):
+        try: stat = os.stat(path)
+        except OSError: stat = None
+        with open(path, "w") as file: file.write(text)
+        if stat is not None: os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def waitfor(self, condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline: time.sleep(0.01)
+        return condition()
+
+    def testWatchReloadsChangedFile(self):
+        properties = pyproperties.Properties(self.paths[0])
+        changes = []
+        properties.watch(interval=0.01, callback=lambda properties, changeset: changes.append(changeset))
+        self.assertTrue(pyproperties.watcher.watching(properties))
+        self.write(self.paths[0], "key=new\nother=value\n")
+        self.assertTrue(self.waitfor(lambda: changes))
+        self.assertEqual({"added": ["other"], "removed": [], "modified": ["key"]}, changes[0])
+        self.assertEqual("new", properties.get("key"))
+        properties.unwatch()
+        self.assertFalse(pyproperties.watcher.watching(properties))
+
+    def testUnchangedFileIsNotReloaded(self):
+        properties = pyproperties.Properties(self.paths[0])
+        properties.watch(interval=0.01)
+        time.sleep(0.1)
+        self.assertEqual(None, properties._reloadstate)
+        properties.unwatch()
+
+    def testSingleThreadServesManyObjects(self):
+        watched = [ pyproperties.Properties(path) for path in self.paths ]
+        for properties in watched: properties.watch(interval=0.01)
+        threads = [ thread for thread in threading.enumerate() if thread.name == "pyproperties-watcher" ]
+        self.assertEqual(1, len(threads))
+        for path in self.paths: self.write(path, "key=new\n")
+        self.assertTrue(self.waitfor(lambda: all([ properties.get("key") == "new" for properties in watched ])))
+        for properties in watched: properties.unwatch()
+        self.assertTrue(self.waitfor(lambda: pyproperties.watcher._thread is None))
+
+    def testBrokenFileIsTriedAgain(self):
+        self.write(self.paths[0], "key=1\n")
+        properties = pyproperties.Properties(self.paths[0], cast=pyproperties.Schema({"key": int}))
+        changes = []
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            properties.watch(interval=0.01, callback=lambda properties, changeset: changes.append(changeset))
+            self.write(self.paths[0], "key=abc\n")
+            self.assertTrue(self.waitfor(lambda: caught))
+            self.write(self.paths[0], "key=2\n")
+            self.assertTrue(self.waitfor(lambda: changes))
+        self.assertEqual(2, properties.get("key"))
+        self.assertTrue(pyproperties.watcher.watching(properties))
+        properties.unwatch()
+
+    def testFailingCheckDoesNotStopThread(self):
+        def failing(entry): raise RuntimeError("failed")
+        properties = pyproperties.Properties(self.paths[0])
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            pyproperties.watcher._check = failing
+            try:
+                properties.watch(interval=0.01)
+                thread = pyproperties.watcher._thread
+                self.assertTrue(self.waitfor(lambda: len(caught) >= 2))
+            finally:
+                del pyproperties.watcher._check
+        self.assertIn("RuntimeError('failed')", str(caught[0].message))
+        self.assertIs(thread, pyproperties.watcher._thread)
+        self.assertTrue(thread.is_alive())
+        changes = []
+        properties.watch(interval=0.01, callback=lambda properties, changeset: changes.append(changeset))
+        self.write(self.paths[0], "key=new\n")
+        self.assertTrue(self.waitfor(lambda: changes))
+        properties.unwatch()
+        self.assertTrue(self.waitfor(lambda: pyproperties.watcher._thread is None))
+
+    def testStoppedThreadIsForgotten(self):
+        properties = pyproperties.Properties(self.paths[0])
+        properties.watch(interval=0.01)
+        thread = pyproperties.watcher._thread
+        properties.unwatch()
+        self.assertTrue(self.waitfor(lambda: pyproperties.watcher._thread is None))
+        thread.join(1)
+        self.assertFalse(thread.is_alive())
+        changes = []
+        properties.watch(interval=0.01, callback=lambda properties, changeset: changes.append(changeset))
+        self.assertIsNot(thread, pyproperties.watcher._thread)
+        self.write(self.paths[0], "key=new\n")
+        self.assertTrue(self.waitfor(lambda: changes))
+        properties.unwatch()
+
+    def testCollectedObjectsAreForgotten(self):
+        properties = pyproperties.Properties(self.paths[0])
+        properties.watch(interval=0.01)
+        del properties
+        gc.collect()
+        self.assertTrue(self.waitfor(lambda: pyproperties.watcher._thread is None))
+        self.assertEqual({}, pyproperties.watcher._entries)
+
+
 class SaveTest(unittest.TestCase):
     def testSaveProperties(self):
         foo_saved = {"prop.0":"0", "prop.1":"1"}